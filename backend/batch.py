@@ -0,0 +1,195 @@
+import asyncio
+import itertools
+import json
+import os
+import tempfile
+import zipfile
+from typing import Any, AsyncIterator, Awaitable, BinaryIO, Callable, Dict, List, Set, Tuple, Union
+
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "500"))
+BATCH_MAX_FILE_BYTES = int(os.getenv("BATCH_MAX_FILE_BYTES", str(10 * 1024 * 1024)))
+BATCH_MAX_REQUEST_BYTES = int(os.getenv("BATCH_MAX_REQUEST_BYTES", str(100 * 1024 * 1024)))
+# Total size of the PDFs a batch may unpack to, counting zip members as decompressed
+BATCH_MAX_EXPANDED_BYTES = int(os.getenv("BATCH_MAX_EXPANDED_BYTES", str(256 * 1024 * 1024)))
+
+_CHUNK_BYTES = 64 * 1024
+
+
+class BatchError(Exception):
+    """Raised when a batch upload is malformed as a whole (not for a single bad file)."""
+
+
+class _Budget:
+    """Running totals for one batch, checked as bytes are actually written."""
+
+    def __init__(self):
+        self.files = 0
+        self.bytes = 0
+
+    def add_file(self) -> None:
+        self.files += 1
+        if self.files > BATCH_MAX_FILES:
+            raise BatchError(f"Batch exceeds the limit of {BATCH_MAX_FILES} files")
+
+    def add_bytes(self, count: int) -> None:
+        self.bytes += count
+        if self.bytes > BATCH_MAX_EXPANDED_BYTES:
+            raise BatchError(f"Batch expands to more than {BATCH_MAX_EXPANDED_BYTES} bytes")
+
+
+def _copy(source: BinaryIO, directory: str, budget: _Budget) -> Union[str, BatchError]:
+    """Copy a PDF stream to a file in ``directory`` in chunks, counting the bytes really read.
+
+    Returns the path, or the error for a file over ``BATCH_MAX_FILE_BYTES``.
+    Exceeding the batch totals raises ``BatchError``.
+    """
+    fd, path = tempfile.mkstemp(suffix=".pdf", dir=directory)
+    size = 0
+    with os.fdopen(fd, "wb") as out:
+        while True:
+            chunk = source.read(_CHUNK_BYTES)
+            if not chunk:
+                return path
+            size += len(chunk)
+            budget.add_bytes(len(chunk))
+            if size > BATCH_MAX_FILE_BYTES:
+                break
+            out.write(chunk)
+    os.unlink(path)
+    return BatchError("File too large")
+
+
+def _is_zip(filename: str, upload: BinaryIO) -> bool:
+    head = upload.read(4)
+    upload.seek(0)
+    return filename.lower().endswith(".zip") or head == b"PK\x03\x04"
+
+
+def _expand_zip(filename: str, upload: BinaryIO, directory: str, budget: _Budget) -> List[Tuple[str, Any]]:
+    try:
+        archive = zipfile.ZipFile(upload)
+    except zipfile.BadZipFile as e:
+        return [(filename, BatchError(f"Invalid zip archive: {e}"))]
+    items: List[Tuple[str, Any]] = []
+    with archive:
+        members = [
+            info for info in archive.infolist()
+            if not info.is_dir() and not info.filename.startswith("__MACOSX/")
+            and info.filename.lower().endswith(".pdf")
+        ]
+        # Refuse from the central directory before decompressing anything; the
+        # declared sizes are only a first check, _copy counts the real bytes
+        if budget.files + len(members) > BATCH_MAX_FILES:
+            raise BatchError(f"Batch exceeds the limit of {BATCH_MAX_FILES} files")
+        declared = sum(info.file_size for info in members if info.file_size <= BATCH_MAX_FILE_BYTES)
+        if budget.bytes + declared > BATCH_MAX_EXPANDED_BYTES:
+            raise BatchError(f"Batch expands to more than {BATCH_MAX_EXPANDED_BYTES} bytes")
+        for info in members:
+            label = f"{filename}/{info.filename}"
+            budget.add_file()
+            if info.file_size > BATCH_MAX_FILE_BYTES:
+                items.append((label, BatchError("File too large")))
+                continue
+            try:
+                with archive.open(info) as member:
+                    items.append((label, _copy(member, directory, budget)))
+            except BatchError:
+                raise
+            except Exception as e:
+                items.append((label, BatchError(f"Could not read zip member: {e}")))
+    return items
+
+
+def expand_uploads(uploads: List[Tuple[str, BinaryIO]], directory: str) -> List[Tuple[str, Any]]:
+    """Unpack uploaded PDFs and zip archives into files in ``directory``.
+
+    Returns (filename, path-or-error) items. Zip members are named
+    ``archive.zip/member.pdf``; a member that can't be read becomes an item
+    whose payload is the error, so it is reported in the results rather
+    than aborting the batch. Uploads are read from their (spooled) files in
+    chunks and never held in memory whole. ``BatchError`` is raised when the
+    batch exceeds ``BATCH_MAX_FILES`` or ``BATCH_MAX_EXPANDED_BYTES``.
+    """
+    budget = _Budget()
+    items: List[Tuple[str, Any]] = []
+    for filename, upload in uploads:
+        if _is_zip(filename, upload):
+            items.extend(_expand_zip(filename, upload, directory, budget))
+        elif filename.lower().endswith(".pdf"):
+            budget.add_file()
+            items.append((filename, _copy(upload, directory, budget)))
+        else:
+            budget.add_file()
+            items.append((filename, BatchError("Only PDF files are supported")))
+    return items
+
+
+async def cleanup_after(records: AsyncIterator[Dict[str, Any]], cleanup: Callable[[], None]) -> AsyncIterator[Dict[str, Any]]:
+    """Pass ``records`` through, then run ``cleanup`` (also if the client disconnects)."""
+    try:
+        async for record in records:
+            yield record
+    finally:
+        cleanup()
+
+
+async def run_batch(
+    items: List[Tuple[str, Any]],
+    extract: Callable[[str], Awaitable[str]],
+    analyze: Callable[[str], Awaitable[Dict[str, Any]]],
+    concurrency: int = BATCH_CONCURRENCY,
+    extract_concurrency: int = 1,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Extract and analyze every item, yielding one record per item as it finishes.
+
+    At most ``extract_concurrency`` items (the PDF pool's worker count) are
+    extracted and ``concurrency`` analyzed at a time. Items are started as
+    earlier ones finish, so a large archive never has more tasks in flight
+    than the two limits allow. Failures become ``{"status": "error"}`` records.
+    """
+    extracting = asyncio.Semaphore(max(1, extract_concurrency))
+    analyzing = asyncio.Semaphore(max(1, concurrency))
+
+    async def process(index: int, filename: str, payload: Any) -> Dict[str, Any]:
+        record = {"index": index, "filename": filename}
+        try:
+            if isinstance(payload, Exception):
+                raise payload
+            async with extracting:
+                text = await extract(payload)
+            if not text:
+                raise BatchError("No text could be extracted from the PDF")
+            async with analyzing:
+                result = await analyze(text)
+            return {**record, "status": "ok", **result}
+        except Exception as e:
+            return {**record, "status": "error", "error": str(e)}
+
+    pending = iter(enumerate(items))
+    in_flight = max(1, extract_concurrency) + max(1, concurrency)
+    running: Set["asyncio.Future[Dict[str, Any]]"] = set()
+    try:
+        while True:
+            for index, (filename, payload) in itertools.islice(pending, in_flight - len(running)):
+                running.add(asyncio.ensure_future(process(index, filename, payload)))
+            if not running:
+                return
+            done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in running:
+            task.cancel()
+
+
+async def ndjson(records: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    """Serialize records as newline-delimited JSON, ending with a summary line."""
+    succeeded = failed = 0
+    async for record in records:
+        if record["status"] == "ok":
+            succeeded += 1
+        else:
+            failed += 1
+        yield json.dumps(record) + "\n"
+    yield json.dumps({"done": True, "total": succeeded + failed, "succeeded": succeeded, "failed": failed}) + "\n"
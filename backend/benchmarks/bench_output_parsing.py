@@ -0,0 +1,122 @@
+"""Benchmark: legacy Q/A regex and bare json.loads vs. output_parsing.py.
+
+Run from the backend directory:
+
+    python benchmarks/bench_output_parsing.py [--repeat 50]
+
+It first runs both implementations over the recorded model outputs in
+benchmarks/fixtures/llm_outputs.json and reports which ones each parses
+correctly, then times them on outputs of increasing length, including a
+pathological one for the legacy pattern (questions with no answers).
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from output_parsing import OutputValidationError, parse_interview_pairs, parse_links_json  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "llm_outputs.json")
+
+
+# Legacy implementations, as they were in main.py
+
+LEGACY_QA_PATTERN = re.compile(r'Q(\d+):\s*([^A]*?)A\1:\s*([^Q]*?)(?=Q\d+:|$)', re.DOTALL | re.IGNORECASE)
+
+
+def legacy_pairs(content):
+    pairs = []
+    for match in LEGACY_QA_PATTERN.finditer(content):
+        question = match.group(2).strip()
+        answer = match.group(3).strip()
+        if question and answer and len(question) > 5 and len(answer) > 10:
+            pairs.append({"question": question, "answer": answer})
+    if pairs:
+        return pairs[:10]
+    lines = content.split('\n')
+    fallback_pairs = []
+    for i, line in enumerate(lines):
+        if line.strip().startswith('Q') and ':' in line:
+            question = line.split(':', 1)[1].strip()
+            if i + 1 < len(lines) and lines[i + 1].strip().startswith('A') and ':' in lines[i + 1]:
+                answer = lines[i + 1].split(':', 1)[1].strip()
+                if question and answer:
+                    fallback_pairs.append({"question": question, "answer": answer})
+    return fallback_pairs[:10]
+
+
+def legacy_links(content):
+    data = json.loads(content.strip())
+    if "search_links" not in data:
+        raise ValueError("no search_links")
+    return data
+
+
+def new_links(content):
+    return parse_links_json(content)
+
+
+def check_fixtures(fixtures):
+    print(f"{'fixture':<30}{'expected':>10}{'legacy':>10}{'new':>10}")
+    failures = 0
+    for fixture in fixtures:
+        if fixture["kind"] == "interview":
+            expected = fixture["expected_pairs"]
+            old = len(legacy_pairs(fixture["content"]))
+            new = len(parse_interview_pairs(fixture["content"]))
+        else:
+            expected = fixture["expected_links"]
+            old = new = None
+            try:
+                old = len(legacy_links(fixture["content"])["search_links"])
+            except (ValueError, AttributeError):
+                pass
+            try:
+                new = len(new_links(fixture["content"])["search_links"])
+            except OutputValidationError:
+                pass
+        # None means "any result, as long as it doesn't raise" for interviews
+        # (truncated output) and "must be rejected" for links
+        ok = new == expected or (expected is None and fixture["kind"] == "interview")
+        failures += not ok
+        print(f"{fixture['name']:<30}{str(expected):>10}{str(old):>10}{str(new):>10}{'' if ok else '  FAIL'}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with open(FIXTURES, encoding="utf-8") as f:
+        fixtures = json.load(f)
+    failures = check_fixtures(fixtures)
+    print(f"\nfixtures: {'ok' if not failures else f'{failures} failed'}\n")
+
+    interview = next(f["content"] for f in fixtures if f["name"] == "interview_plain")
+    links = next(f["content"] for f in fixtures if f["name"] == "links_pure")
+    cases = []
+    for copies in (1, 10, 100):
+        cases.append((f"interview x{copies}", legacy_pairs, parse_interview_pairs, interview * copies, args.repeat))
+    for count in (100, 300, 1000):
+        # Numbered questions without answers or any letter "a": from every Q
+        # marker the legacy lazy [^A]*? scan runs to the end of the text
+        text = "".join(f"Q{i}: Which tools do you use for problem solving?\n" for i in range(count))
+        # The legacy side is quadratic here, so keep its repeats down
+        cases.append((f"unanswered questions x{count}", legacy_pairs, parse_interview_pairs, text, min(args.repeat, 3)))
+    cases.append(("links JSON", legacy_links, new_links, links, args.repeat))
+
+    print(f"{'case':<34}{'legacy ms':>12}{'new ms':>12}{'speedup':>10}")
+    for name, old, new, text, repeat in cases:
+        old_ms = timeit.timeit(lambda: old(text), number=repeat) * 1000 / repeat
+        new_ms = timeit.timeit(lambda: new(text), number=repeat) * 1000 / repeat
+        print(f"{name:<34}{old_ms:>12.3f}{new_ms:>12.3f}{old_ms / new_ms:>9.1f}x")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Micro-benchmark: legacy per-pattern score/keyword scans vs. scoring.py.
+
+Run from the backend directory:
+
+    python benchmarks/bench_scoring.py [--repeat 200]
+
+It first checks both implementations agree on every generated input, then
+times them on feedback/resume texts of increasing length.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scoring import fallback_keywords, score_extractor  # noqa: E402
+
+
+# Legacy implementations, as they were in main.py
+
+def legacy_scores(ai_feedback):
+    score_map = {"Format": 8, "Content": 7, "Skills": 8, "Impact": 7, "Overall": 7}
+    score_patterns = {
+        "Format": [r"format.*?(\d+)/10", r"structure.*?(\d+)/10", r"layout.*?(\d+)/10"],
+        "Content": [r"content.*?(\d+)/10", r"quality.*?(\d+)/10"],
+        "Skills": [r"skills.*?(\d+)/10", r"technical.*?(\d+)/10"],
+        "Impact": [r"impact.*?(\d+)/10", r"achievement.*?(\d+)/10"],
+        "Overall": [r"overall.*?(\d+)/10", r"total.*?(\d+)/10", r"final.*?(\d+)/10"],
+    }
+    for category, patterns in score_patterns.items():
+        for pattern in patterns:
+            match = re.search(pattern, ai_feedback, re.IGNORECASE)
+            if match:
+                score_map[category] = int(match.group(1))
+                break
+    return score_map
+
+
+def legacy_keywords(text):
+    groups = {
+        "contact": any(k in text.lower() for k in ['email', 'phone', '@', 'linkedin']),
+        "experience": any(k in text.lower() for k in ['experience', 'work', 'job', 'position']),
+        "education": any(k in text.lower() for k in ['education', 'degree', 'university', 'college']),
+        "skills": any(k in text.lower() for k in ['skills', 'programming', 'software', 'technical']),
+        "impact": any(k in text.lower() for k in ['achieved', 'improved', 'increased', 'developed']),
+        "achievements": any(k in text.lower() for k in ['achieved', 'improved', 'increased']),
+    }
+    return frozenset(name for name, present in groups.items() if present)
+
+
+WORDS = (
+    "the candidate resume layout shows strong content and relevant technical "
+    "skills across projects with measurable impact quality achievement overall "
+    "structure final total format team data python cloud delivery stakeholder"
+).split()
+
+
+def feedback_text(rng, lines, with_scores):
+    out = []
+    for _ in range(lines):
+        line = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20)))
+        if with_scores and rng.random() < 0.05:
+            line += f" {rng.randint(1, 10)}/10"
+        out.append(line)
+    return "\n".join(out)
+
+
+def resume_text(rng, words, keywords):
+    filler = [rng.choice(WORDS[:12]) for _ in range(words)]
+    if keywords:
+        for kw in ("Email", "University", "Developed", "Work", "Python programming"):
+            filler.insert(rng.randrange(len(filler) + 1), kw)
+    return " ".join(filler)
+
+
+def check_equivalence(rng):
+    for _ in range(300):
+        text = feedback_text(rng, rng.randint(1, 40), rng.random() < 0.7)
+        assert legacy_scores(text) == score_extractor.extract(text), text
+        text = resume_text(rng, rng.randint(0, 300), rng.random() < 0.5)
+        assert legacy_keywords(text) == fallback_keywords.groups_present(text), text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    check_equivalence(rng)
+    print("equivalence: ok\n")
+
+    print(f"{'case':<38}{'legacy ms':>12}{'new ms':>12}{'speedup':>10}")
+    cases = []
+    for lines in (20, 200, 2000):
+        # Feedback without any N/10: the worst case for lazy .*? patterns
+        text = feedback_text(rng, lines, with_scores=False)
+        cases.append((f"scores, {lines} lines, no scores", legacy_scores, score_extractor.extract, text))
+        text = feedback_text(rng, lines, with_scores=True)
+        cases.append((f"scores, {lines} lines, scattered", legacy_scores, score_extractor.extract, text))
+    for words in (500, 5000, 50000):
+        text = resume_text(rng, words, keywords=False)
+        cases.append((f"keywords, {words} words, none", legacy_keywords, fallback_keywords.groups_present, text))
+        text = resume_text(rng, words, keywords=True)
+        cases.append((f"keywords, {words} words, all", legacy_keywords, fallback_keywords.groups_present, text))
+
+    for name, old, new, text in cases:
+        old_ms = timeit.timeit(lambda: old(text), number=args.repeat) * 1000 / args.repeat
+        new_ms = timeit.timeit(lambda: new(text), number=args.repeat) * 1000 / args.repeat
+        print(f"{name:<38}{old_ms:>12.3f}{new_ms:>12.3f}{old_ms / new_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
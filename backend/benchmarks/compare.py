@@ -0,0 +1,95 @@
+"""Compare two load-test result files and flag regressions.
+
+Run from the backend directory:
+
+    python benchmarks/compare.py BASELINE CANDIDATE [--threshold 10] [--min-ms 5]
+
+BASELINE and CANDIDATE are result files written by benchmarks/load_test.py,
+or their names in benchmarks/results/ (e.g. a commit hash). A row regresses
+when its p50, p95 or p99 latency grows, or its requests per second drop, by
+more than ``threshold`` percent, or when it has more errors. Latency changes
+smaller than ``min-ms`` are treated as noise. Exits with status 1 if
+anything regressed.
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+RESULTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+LATENCY_KEYS = ("p50", "p95", "p99")
+
+
+def load(name: str) -> Dict[str, Any]:
+    path = name if os.path.exists(name) else os.path.join(RESULTS, f"{name}.json")
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _rows(report: Dict[str, Any]) -> Dict[Tuple[str, int], Dict[str, Any]]:
+    return {(row["endpoint"], row["concurrency"]): row for row in report["results"]}
+
+
+def _change(old: float, new: float) -> Optional[float]:
+    return (new - old) / old * 100 if old else None
+
+
+def compare(baseline: Dict[str, Any], candidate: Dict[str, Any], threshold: float,
+            min_ms: float) -> Tuple[List[List[str]], List[str]]:
+    """Table rows for the endpoints both runs measured, and a list of regressions."""
+    old_rows, new_rows = _rows(baseline), _rows(candidate)
+    table: List[List[str]] = []
+    regressions: List[str] = []
+    for key in sorted(old_rows.keys() & new_rows.keys()):
+        old, new = old_rows[key], new_rows[key]
+        label = f"{key[0]} @{key[1]}"
+        cells = [label]
+        for stat in LATENCY_KEYS:
+            before, after = old["latency_ms"][stat], new["latency_ms"][stat]
+            change = _change(before, after)
+            cells.append(f"{before:.1f} -> {after:.1f}" + (f" ({change:+.0f}%)" if change is not None else ""))
+            if change is not None and change > threshold and after - before > min_ms:
+                regressions.append(f"{label}: {stat} {before:.1f} -> {after:.1f} ms ({change:+.0f}%)")
+        change = _change(old["rps"], new["rps"])
+        cells.append(f"{old['rps']:.1f} -> {new['rps']:.1f}" + (f" ({change:+.0f}%)" if change is not None else ""))
+        if change is not None and change < -threshold:
+            regressions.append(f"{label}: rps {old['rps']:.1f} -> {new['rps']:.1f} ({change:+.0f}%)")
+        cells.append(f"{old['errors']} -> {new['errors']}")
+        if new["errors"] > old["errors"]:
+            regressions.append(f"{label}: errors {old['errors']} -> {new['errors']}")
+        table.append(cells)
+    return table, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed change in percent")
+    parser.add_argument("--min-ms", type=float, default=5.0, help="ignore latency changes smaller than this")
+    args = parser.parse_args()
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    print(f"baseline  {baseline['commit']}{' (dirty)' if baseline['dirty'] else ''}  {baseline['timestamp']}")
+    print(f"candidate {candidate['commit']}{' (dirty)' if candidate['dirty'] else ''}  {candidate['timestamp']}")
+    if baseline["config"] != candidate["config"]:
+        print("warning: the runs used different load-test settings", file=sys.stderr)
+
+    table, regressions = compare(baseline, candidate, args.threshold, args.min_ms)
+    header = ["endpoint", *(f"{stat} ms" for stat in LATENCY_KEYS), "rps", "errors"]
+    widths = [max(len(row[i]) for row in [header, *table]) for i in range(len(header))]
+    for row in [header, *table]:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)))
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:g}%:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("\nno regressions")
+
+
+if __name__ == "__main__":
+    main()
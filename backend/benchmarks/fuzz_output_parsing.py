@@ -0,0 +1,118 @@
+"""Fuzz output_parsing.py with mutations of the recorded model outputs.
+
+Run from the backend directory:
+
+    python benchmarks/fuzz_output_parsing.py [--iterations 5000] [--seed 1]
+
+Each iteration mutates a fixture from benchmarks/fixtures/llm_outputs.json
+(truncation, deleted/duplicated spans, stray markers, fences, brackets,
+quotes and case changes) and checks that:
+
+- parsing only ever raises OutputValidationError, and returns well-formed
+  pairs / JSON-serializable values;
+- streaming the text through QAStreamParser in random chunks gives the
+  same pairs as parsing it whole;
+- parse time stays linear (a per-character budget that a backtracking
+  pattern would blow through).
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from output_parsing import (  # noqa: E402
+    MAX_INTERVIEW_PAIRS, OutputValidationError, QAStreamParser, extract_json, parse_interview_pairs,
+)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "llm_outputs.json")
+
+NOISE = ["Q1:", "A1:", "Q12:", "A3:", "**", "```", "```json\n", "{", "}", "[", "]", '"', "\\", ",", ":", "\n",
+         "A", "q", "é", "​", "😀", " ", "\t"]
+
+# Far beyond any real completion, but enough to expose superlinear parsing
+MAX_INPUT_CHARS = 100_000
+
+# Generous per-character limit; a quadratic parser exceeds it on long inputs
+MICROSECONDS_PER_CHAR = 5.0
+
+
+def mutate(rng, text):
+    for _ in range(rng.randint(1, 4)):
+        op = rng.randrange(6)
+        i = rng.randint(0, len(text))
+        j = rng.randint(i, min(len(text), i + 200))
+        if op == 0:
+            text = text[:i]
+        elif op == 1:
+            text = text[:i] + text[j:]
+        elif op == 2:
+            text = text[:j] + text[i:j] * rng.randint(1, 20) + text[j:]
+        elif op == 3:
+            text = text[:i] + rng.choice(NOISE) + text[i:]
+        elif op == 4:
+            text = text[:i] + text[i:j].swapcase() + text[j:]
+        else:
+            text = text * rng.randint(2, 30)
+        text = text[:MAX_INPUT_CHARS]
+    return text
+
+
+def check_pairs(pairs):
+    assert len(pairs) <= MAX_INTERVIEW_PAIRS
+    for pair in pairs:
+        assert set(pair) == {"question", "answer"}
+        assert pair["question"] and pair["answer"]
+
+
+def streamed(rng, text):
+    parser = QAStreamParser()
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, 40)
+        parser.feed(text[position:position + size])
+        position += size
+    parser.close()
+    return parser.pairs
+
+
+def timed(fn, text):
+    start = time.perf_counter()
+    result = fn(text)
+    elapsed = time.perf_counter() - start
+    budget = max(0.005, len(text) * MICROSECONDS_PER_CHAR / 1e6)
+    assert elapsed <= budget, f"{fn.__name__} took {elapsed * 1000:.1f} ms on {len(text)} chars"
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with open(FIXTURES, encoding="utf-8") as f:
+        seeds = [fixture["content"] for fixture in json.load(f)]
+    rng = random.Random(args.seed)
+    rejected = 0
+    for iteration in range(args.iterations):
+        text = mutate(rng, rng.choice(seeds))
+        try:
+            pairs = timed(parse_interview_pairs, text)
+            check_pairs(pairs)
+            assert streamed(rng, text) == pairs, "streamed pairs differ"
+            try:
+                json.dumps(timed(extract_json, text))
+            except OutputValidationError:
+                rejected += 1
+        except Exception:
+            print(f"iteration {iteration} failed on input:\n{text[:2000]!r}\n", file=sys.stderr)
+            raise
+    print(f"{args.iterations} inputs ok ({rejected} rejected as non-JSON)")
+
+
+if __name__ == "__main__":
+    main()
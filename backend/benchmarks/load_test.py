@@ -0,0 +1,357 @@
+"""Load driver: latency percentiles and throughput per endpoint and concurrency level.
+
+Run from the backend directory:
+
+    python benchmarks/load_test.py [--concurrency 1,8,32] [--requests 100] [--endpoints ...]
+        [--base-url http://127.0.0.1:8000] [--identical] [--label name]
+
+Without ``--base-url`` the driver starts its own mock Groq server
+(benchmarks/mock_groq.py, configured with the ``--mock-*`` options) and a
+uvicorn server for ``main:app`` pointed at it, with the client-side rate
+limits disabled, so no API quota is spent. The synthetic PDF corpus is
+generated on first use.
+
+Every request carries a unique job description unless ``--identical`` is
+given, so by default the response cache and request coalescing don't hide
+the upstream path; ``--identical`` measures them instead.
+
+For each endpoint and concurrency level it reports p50/p95/p99 latency,
+time to first byte for streamed endpoints, requests per second and errors,
+and writes everything to ``benchmarks/results/<commit>[-label].json`` for
+``benchmarks/compare.py``.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+import zipfile
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BACKEND = os.path.dirname(HERE)
+CORPUS = os.path.join(HERE, "corpus")
+RESULTS = os.path.join(HERE, "results")
+
+JOB = """Data Engineer - Boston, MA
+Requirements:
+- 3+ years building batch and streaming pipelines in Python and SQL
+- Experience with Airflow, Spark and a cloud data warehouse
+Responsibilities:
+- Design and operate the ingestion platform
+- Partner with analysts on data models and data quality"""
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Linear-interpolated percentile of ``values`` (0 <= q <= 100)."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(values: List[float]) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    ms = [v * 1000 for v in values]
+    return {
+        "p50": round(percentile(ms, 50), 2),
+        "p95": round(percentile(ms, 95), 2),
+        "p99": round(percentile(ms, 99), 2),
+        "mean": round(sum(ms) / len(ms), 2),
+        "max": round(max(ms), 2),
+    }
+
+
+class Context:
+    """Inputs shared by the scenarios: corpus PDFs and a stored resume."""
+
+    def __init__(self, identical: bool):
+        self.identical = identical
+        self.counter = 0
+        self.pdfs: Dict[str, bytes] = {}
+        self.resume_text = ""
+        self.resume_id = ""
+
+    def job(self) -> str:
+        self.counter += 1
+        return JOB if self.identical else f"{JOB}\nJob reference: {self.counter}"
+
+    def query(self) -> Dict[str, str]:
+        return {} if self.identical else {"no_cache": "true"}
+
+
+Result = Tuple[bool, Optional[float]]  # (ok, time to first byte)
+Scenario = Callable[[httpx.AsyncClient, Context], Awaitable[Result]]
+
+
+async def _post_json(client, path, payload, params=None) -> Result:
+    response = await client.post(path, json=payload, params=params)
+    return response.status_code == 200, None
+
+
+async def _post_stream(client, path, payload, params=None) -> Result:
+    start = time.perf_counter()
+    first = None
+    ok = False
+    async with client.stream("POST", path, json=payload, params=params) as response:
+        async for chunk in response.aiter_text():
+            if first is None:
+                first = time.perf_counter() - start
+            if "event: done" in chunk:
+                ok = True
+        ok = ok and response.status_code == 200
+    return ok, first
+
+
+def _upload(path: str, pages: str) -> Scenario:
+    async def run(client, ctx):
+        files = {"file": (f"resume-{pages}.pdf", ctx.pdfs[pages], "application/pdf")}
+        response = await client.post(path, files=files, params=ctx.query())
+        return response.status_code == 200, None
+    return run
+
+
+async def _batch(client, ctx) -> Result:
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        for name, data in ctx.pdfs.items():
+            zf.writestr(f"resume-{name}.pdf", data)
+    files = {"files": ("resumes.zip", archive.getvalue(), "application/zip")}
+    response = await client.post("/batch/upload-resume", files=files, params=ctx.query())
+    lines = [json.loads(line) for line in response.text.splitlines() if line]
+    return response.status_code == 200 and not any("error" in line for line in lines[:-1]), None
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "extract-resume:1p": _upload("/extract-resume", "1p"),
+    "extract-resume:20p": _upload("/extract-resume", "20p"),
+    "upload-resume:2p": _upload("/upload-resume", "2p"),
+    "batch/upload-resume": _batch,
+    "generate-cover-letter": lambda c, x: _post_json(
+        c, "/generate-cover-letter", {"resume_id": x.resume_id, "job": x.job()}, x.query()),
+    "generate-cover-letter/stream": lambda c, x: _post_stream(
+        c, "/generate-cover-letter/stream", {"resume_id": x.resume_id, "job": x.job()}, x.query()),
+    "interview-trainer": lambda c, x: _post_json(
+        c, "/interview-trainer", {"resume_id": x.resume_id, "job": x.job()}, x.query()),
+    "interview-trainer/stream": lambda c, x: _post_stream(
+        c, "/interview-trainer/stream", {"resume_id": x.resume_id, "job": x.job()}, x.query()),
+    "generate-links": lambda c, x: _post_json(c, "/generate-links", {"resume_id": x.resume_id}),
+    "generate-links:refine": lambda c, x: _post_json(
+        c, "/generate-links", {"resume": x.resume_text + ("" if x.identical else f"\n{x.job()}"), "refine": True},
+        x.query()),
+    "match": lambda c, x: _post_json(c, "/match", {"resume_ids": [x.resume_id], "jobs": [x.job() for _ in range(20)]}),
+}
+
+
+async def run_level(client, ctx, scenario: Scenario, concurrency: int, requests: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    first_bytes: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                ok, first = await scenario(client, ctx)
+            except httpx.HTTPError:
+                ok, first = False, None
+            latencies.append(time.perf_counter() - start)
+            if first is not None:
+                first_bytes.append(first)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": summarize(latencies),
+        "ttfb_ms": summarize(first_bytes),
+    }
+
+
+async def prepare(client, ctx) -> None:
+    for pages in ("1p", "2p", "5p", "20p"):
+        with open(os.path.join(CORPUS, f"resume-{pages}.pdf"), "rb") as f:
+            ctx.pdfs[pages] = f.read()
+    response = await client.post("/extract-resume", files={"file": ("resume.pdf", ctx.pdfs["2p"], "application/pdf")})
+    response.raise_for_status()
+    body = response.json()
+    ctx.resume_text, ctx.resume_id = body["text"], body["resume_id"]
+
+
+async def drive(args, base_url: str) -> List[Dict[str, Any]]:
+    ctx = Context(args.identical)
+    limits = httpx.Limits(max_connections=max(args.concurrency) * 2, max_keepalive_connections=max(args.concurrency))
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        await prepare(client, ctx)
+        results = []
+        print(f"{'endpoint':<30}{'conc':>5}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ttfb p50':>10}{'errors':>8}")
+        for name in args.endpoints:
+            scenario = SCENARIOS[name]
+            await scenario(client, ctx)  # warm-up
+            for concurrency in args.concurrency:
+                level = await run_level(client, ctx, scenario, concurrency, max(args.requests, concurrency))
+                level["endpoint"] = name
+                results.append(level)
+                latency, ttfb = level["latency_ms"], level["ttfb_ms"]
+                print(f"{name:<30}{concurrency:>5}{level['rps']:>9.1f}{latency['p50']:>10.1f}{latency['p95']:>10.1f}"
+                      f"{latency['p99']:>10.1f}{(ttfb['p50'] if ttfb else 0):>10.1f}{level['errors']:>8}")
+        return results
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_until_up(url: str, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server for {url} exited with code {process.returncode}")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server for {url} did not start within {timeout:g}s")
+
+
+def spawn_servers(args) -> Tuple[str, List[subprocess.Popen]]:
+    """Start the mock Groq server and the app; returns the app URL and the processes."""
+    mock_port, app_port = _free_port(), _free_port()
+    mock = subprocess.Popen([
+        sys.executable, os.path.join(HERE, "mock_groq.py"), "--port", str(mock_port),
+        "--latency-ms", str(args.mock_latency_ms), "--jitter-ms", str(args.mock_jitter_ms),
+        "--error-rate", str(args.mock_error_rate), "--rate-limit-rate", str(args.mock_rate_limit_rate),
+        "--chunk-delay-ms", str(args.mock_chunk_delay_ms),
+    ])
+    env = {
+        **os.environ,
+        "GROQ_API_KEY": "mock",
+        "GROQ_BASE_URL": f"http://127.0.0.1:{mock_port}/openai/v1/chat/completions",
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+    }
+    if not args.keep_rate_limits:
+        env.update({"LLM_RPM": "0", "LLM_TPM": "0"})
+    app = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(app_port), "--workers", str(args.workers),
+         "--log-level", "warning"],
+        cwd=BACKEND, env=env,
+    )
+    processes = [mock, app]
+    try:
+        _wait_until_up(f"http://127.0.0.1:{mock_port}/stats", mock)
+        _wait_until_up(f"http://127.0.0.1:{app_port}/", app)
+    except Exception:
+        for process in processes:
+            process.terminate()
+        raise
+    return f"http://127.0.0.1:{app_port}", processes
+
+
+def git_revision() -> Tuple[str, bool]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=BACKEND,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", help="test a running server instead of spawning one")
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--requests", type=int, default=100, help="requests per endpoint and concurrency level")
+    parser.add_argument("--endpoints", default=",".join(SCENARIOS), help=f"comma-separated, from: {', '.join(SCENARIOS)}")
+    parser.add_argument("--identical", action="store_true", help="repeat identical requests (measures caching)")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the spawned app")
+    parser.add_argument("--keep-rate-limits", action="store_true", help="keep LLM_RPM/LLM_TPM from the environment")
+    parser.add_argument("--mock-latency-ms", type=float, default=300)
+    parser.add_argument("--mock-jitter-ms", type=float, default=100)
+    parser.add_argument("--mock-error-rate", type=float, default=0.0)
+    parser.add_argument("--mock-rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--mock-chunk-delay-ms", type=float, default=20)
+    parser.add_argument("--label", default="", help="suffix for the results file name")
+    parser.add_argument("--out", default=RESULTS)
+    args = parser.parse_args()
+    args.concurrency = [int(c) for c in args.concurrency.split(",")]
+    args.endpoints = [e for e in args.endpoints.split(",") if e]
+    unknown = [e for e in args.endpoints if e not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(unknown)}")
+
+    if not os.path.exists(os.path.join(CORPUS, "resume-20p.pdf")):
+        subprocess.run([sys.executable, os.path.join(HERE, "make_corpus.py"), "--out", CORPUS], check=True)
+
+    processes: List[subprocess.Popen] = []
+    base_url = args.base_url
+    if base_url is None:
+        base_url, processes = spawn_servers(args)
+    try:
+        results = asyncio.run(drive(args, base_url))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait(timeout=10)
+
+    commit, dirty = git_revision()
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "label": args.label,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {
+            "base_url": args.base_url,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "identical": args.identical,
+            "workers": args.workers,
+            "mock": None if args.base_url else {
+                "latency_ms": args.mock_latency_ms,
+                "jitter_ms": args.mock_jitter_ms,
+                "error_rate": args.mock_error_rate,
+                "rate_limit_rate": args.mock_rate_limit_rate,
+                "chunk_delay_ms": args.mock_chunk_delay_ms,
+            },
+        },
+        "results": results,
+    }
+    os.makedirs(args.out, exist_ok=True)
+    name = commit + ("-dirty" if dirty else "") + (f"-{args.label}" if args.label else "")
+    path = os.path.join(args.out, f"{name}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    print(f"\nresults written to {path}")
+
+
+if __name__ == "__main__":
+    main()
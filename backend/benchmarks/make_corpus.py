@@ -0,0 +1,105 @@
+"""Generate a corpus of synthetic resume PDFs for load tests.
+
+Run from the backend directory:
+
+    python benchmarks/make_corpus.py [--out benchmarks/corpus] [--pages 1,2,5,20] [--seed 7]
+
+Writes one resume per page count (``resume-<pages>p.pdf``) with a
+larger-font name, section headings and bullet points, so both text
+extraction and the layout-based section parser do realistic work. The
+output is deterministic for a given seed; the corpus directory is not
+committed.
+"""
+import argparse
+import os
+import random
+
+import fitz
+
+DEFAULT_OUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+
+FIRST = ["Jane", "Omar", "Lina", "Sam", "Priya", "Diego", "Yusuf", "Mei"]
+LAST = ["Doe", "Haddad", "Nguyen", "Garcia", "Patel", "Khan", "Smith", "Chen"]
+TITLES = ["Data Engineer", "Software Engineer", "Data Analyst", "Backend Developer", "Machine Learning Engineer"]
+CITIES = ["Boston, MA", "Austin, TX", "Amman, Jordan", "Seattle, WA", "Toronto, Canada"]
+COMPANIES = ["Acme Analytics", "Globex", "Initech", "Umbrella Labs", "Stark Data", "Wayne Systems"]
+SKILLS = ["Python", "SQL", "Spark", "Airflow", "AWS", "Docker", "Kubernetes", "PostgreSQL", "Kafka",
+          "pandas", "FastAPI", "Terraform", "dbt", "Snowflake", "React", "TypeScript"]
+VERBS = ["Built", "Designed", "Led", "Improved", "Automated", "Migrated", "Reduced", "Scaled"]
+OBJECTS = ["ETL pipelines", "a reporting platform", "the billing service", "CI/CD workflows",
+           "data-quality checks", "a recommendation model", "the customer dashboard", "event ingestion"]
+
+MARGIN = 54
+LINE = 14
+
+
+class _Writer:
+    def __init__(self, doc):
+        self.doc = doc
+        self.page = None
+        self.y = 0.0
+        self.new_page()
+
+    def new_page(self):
+        self.page = self.doc.new_page()
+        self.y = MARGIN
+
+    def line(self, text, size=10.0, bold=False, gap=0.0):
+        if self.y + size + gap > self.page.rect.height - MARGIN:
+            self.new_page()
+        self.y += gap + size
+        self.page.insert_text((MARGIN, self.y), text, fontsize=size, fontname="hebo" if bold else "helv")
+        self.y += LINE - size + 2
+
+
+def _bullet(rng):
+    return (f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(SKILLS)} and {rng.choice(SKILLS)}, "
+            f"improving throughput by {rng.randint(10, 80)}%")
+
+
+def resume_pdf(pages: int, rng: random.Random) -> bytes:
+    doc = fitz.open()
+    writer = _Writer(doc)
+    writer.line(f"{rng.choice(FIRST)} {rng.choice(LAST)}", size=20, bold=True)
+    writer.line(f"{rng.choice(TITLES)} | {rng.choice(CITIES)} | jane.doe@example.com | +1 617 555 0100")
+    writer.line("Professional Summary", size=13, bold=True, gap=8)
+    writer.line(f"{rng.choice(TITLES)} with {rng.randint(2, 12)} years of experience building data products.")
+    writer.line("Technical Skills", size=13, bold=True, gap=8)
+    writer.line(", ".join(rng.sample(SKILLS, 8)))
+    writer.line("Work Experience", size=13, bold=True, gap=8)
+    while len(doc) < pages or writer.y < writer.page.rect.height / 2:
+        writer.line(f"{rng.choice(TITLES)}, {rng.choice(COMPANIES)} ({rng.randint(2012, 2024)} - present)",
+                    bold=True, gap=6)
+        for _ in range(rng.randint(3, 6)):
+            writer.line(_bullet(rng))
+        if len(doc) > pages:
+            break
+    writer.line("Education", size=13, bold=True, gap=8)
+    writer.line("BSc Computer Science, State University")
+    # Drop any overflow page so every file has exactly ``pages`` pages
+    while len(doc) > pages:
+        doc.delete_page(len(doc) - 1)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    parser.add_argument("--pages", default="1,2,5,20")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    rng = random.Random(args.seed)
+    for pages in (int(p) for p in args.pages.split(",")):
+        path = os.path.join(args.out, f"resume-{pages}p.pdf")
+        data = resume_pdf(pages, rng)
+        with open(path, "wb") as f:
+            f.write(data)
+        print(f"{path}  {len(data) / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Mock OpenAI-compatible chat-completions server for offline load tests.
+
+Run from the backend directory:
+
+    python benchmarks/mock_groq.py [--port 8100] [--latency-ms 300] [--jitter-ms 100]
+        [--error-rate 0.0] [--rate-limit-rate 0.0] [--chunk-delay-ms 20] [--chunk-chars 24]
+
+and point the app at it with
+``GROQ_BASE_URL=http://127.0.0.1:8100/openai/v1/chat/completions``.
+
+Each request waits ``latency`` +/- ``jitter`` (time to first token when
+streaming), then fails with a 500 with probability ``error-rate``, or a 429
+with ``Retry-After: 1`` with probability ``rate-limit-rate``. Otherwise the
+reply is canned output in the shape each endpoint's prompt asks for
+(feedback with scores, a cover letter, ten Q/A pairs, links JSON) with a
+``usage`` block. ``"stream": true`` requests get server-sent event chunks of
+``chunk-chars`` characters every ``chunk-delay-ms``, with usage on the final
+chunk under ``x_groq`` as Groq sends it. ``GET /stats`` reports request
+counts.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, Dict
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+FEEDBACK = """**Formatting & Structure**: The layout is clean with consistent headings. Format: 8/10
+
+**Content Quality**: Achievements are described clearly but could use more metrics. Content: 7/10
+
+**Skills Relevance**: Skills match current market demand for data roles. Skills: 8/10
+
+**Areas for Improvement**:
+1. Quantify the impact of each project. Impact: 6/10
+2. Move the skills section above education.
+3. Tailor the summary to each application.
+
+Overall: 7/10"""
+
+COVER_LETTER = """Dear Hiring Manager,
+
+I am excited to apply for the Data Engineer position. In my current role I designed batch and streaming pipelines in Python and SQL that serve analysts across the business, and I reduced reporting incidents by introducing data-quality checks at every stage.
+
+My experience with Airflow, Spark and cloud warehouses maps directly to the platform you describe, and I enjoy turning messy sources into reliable, well-documented datasets.
+
+I would welcome the chance to discuss how I can help your team deliver trustworthy data faster. Thank you for your consideration."""
+
+INTERVIEW = "\n".join(
+    f"Q{i}: How would you approach challenge number {i} described in the role?\n"
+    f"A{i}: I would start by clarifying requirements, then build a small prototype, measure it and iterate with the team."
+    for i in range(1, 11)
+)
+
+LINKS = json.dumps({
+    "job_title": "Data Engineer",
+    "location": "Boston, MA",
+    "search_links": [
+        {"platform": "LinkedIn", "url": "https://www.linkedin.com/jobs/search/?keywords=Data%20Engineer&location=Boston%2C%20MA"},
+        {"platform": "Indeed", "url": "https://www.indeed.com/jobs?q=Data+Engineer&l=Boston%2C+MA"},
+        {"platform": "Google Jobs", "url": "https://www.google.com/search?q=Data+Engineer+jobs+in+Boston%2C+MA&ibp=htl;jobs"},
+        {"platform": "Upwork", "url": "https://www.upwork.com/freelance-jobs"},
+        {"platform": "Wellfound", "url": "https://wellfound.com/remote"},
+        {"platform": "Glassdoor", "url": "https://www.glassdoor.com/Job/index.htm"},
+        {"platform": "RemoteOK", "url": "https://remoteok.com"},
+        {"platform": "WeWorkRemotely", "url": "https://weworkremotely.com/remote-jobs/search?term=Data+Engineer"},
+    ],
+})
+
+
+def _reply_for(messages) -> str:
+    prompt = " ".join(m.get("content", "") for m in messages).lower()
+    if "interview questions" in prompt:
+        return INTERVIEW
+    if "job search assistant" in prompt:
+        return LINKS
+    if "cover letter" in prompt:
+        return COVER_LETTER
+    return FEEDBACK
+
+
+def create_app(latency_ms: float, jitter_ms: float, error_rate: float, rate_limit_rate: float,
+               chunk_delay_ms: float, chunk_chars: int, seed: int = 0) -> FastAPI:
+    app = FastAPI(title="Mock Groq")
+    rng = random.Random(seed)
+    stats: Dict[str, int] = {"requests": 0, "streams": 0, "errors": 0, "rate_limited": 0}
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body: Dict[str, Any] = await request.json()
+        stats["requests"] += 1
+        await asyncio.sleep(max(0.0, latency_ms + rng.uniform(-jitter_ms, jitter_ms)) / 1000)
+
+        roll = rng.random()
+        if roll < error_rate:
+            stats["errors"] += 1
+            return JSONResponse({"error": {"message": "mock upstream error"}}, status_code=500)
+        if roll < error_rate + rate_limit_rate:
+            stats["rate_limited"] += 1
+            return JSONResponse({"error": {"message": "mock rate limit"}}, status_code=429, headers={"Retry-After": "1"})
+
+        model = body.get("model", "mock")
+        content = _reply_for(body.get("messages", []))
+        prompt_tokens = sum(len(m.get("content", "")) for m in body.get("messages", [])) // 4
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4,
+                 "total_tokens": prompt_tokens + len(content) // 4}
+        created = int(time.time())
+
+        if not body.get("stream"):
+            return {
+                "id": f"mock-{stats['requests']}", "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage,
+            }
+
+        stats["streams"] += 1
+
+        async def events():
+            for start in range(0, len(content), chunk_chars):
+                chunk = {"id": "mock", "object": "chat.completion.chunk", "created": created, "model": model,
+                         "choices": [{"index": 0, "delta": {"content": content[start:start + chunk_chars]}}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(chunk_delay_ms / 1000)
+            final = {"id": "mock", "object": "chat.completion.chunk", "created": created, "model": model,
+                     "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "x_groq": {"usage": usage}}
+            yield f"data: {json.dumps(final)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--jitter-ms", type=float, default=100)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--chunk-delay-ms", type=float, default=20)
+    parser.add_argument("--chunk-chars", type=int, default=24)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    app = create_app(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_rate,
+                     args.chunk_delay_ms, args.chunk_chars, args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from metrics import registry
+
+COALESCED = registry.counter(
+    "coalesced_requests_total", "Callers served by another caller's in-flight completion.", ["scope"],
+)
+
+
+class _SharedFlights:
+    """SQLite-backed leases and results shared by every worker on the host.
+
+    The first worker to insert a lease for a key runs the call; the others
+    poll for its result. Leases expire, so a crashed worker can't block a
+    key forever, and results are kept only long enough for waiters to read.
+    """
+
+    def __init__(self, path: str, result_ttl: float):
+        self.result_ttl = result_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS inflight ("
+                "key TEXT PRIMARY KEY, owner TEXT NOT NULL, started_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, completed_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def acquire(self, key: str, owner: str, lease: float) -> Tuple[bool, float]:
+        """Try to take the lease; returns (acquired, start time of the current lease)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("DELETE FROM inflight WHERE key = ? AND expires_at <= ?", (key, now))
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO inflight (key, owner, started_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, owner, now, now + lease),
+            )
+            self._conn.commit()
+            if cursor.rowcount:
+                return True, now
+            row = self._conn.execute("SELECT started_at FROM inflight WHERE key = ?", (key,)).fetchone()
+            return False, row[0] if row else now
+
+    def poll(self, key: str, since: float) -> Tuple[Optional[str], bool]:
+        """(result completed after ``since`` if any, whether a lease is still held)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM results WHERE key = ? AND completed_at >= ?", (key, since)
+            ).fetchone()
+            if row is not None:
+                return row[0], False
+            held = self._conn.execute(
+                "SELECT 1 FROM inflight WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+            return None, held is not None
+
+    def release(self, key: str, owner: str, value: Optional[str]) -> None:
+        """Publish the result (if the call succeeded) and drop the lease."""
+        now = time.time()
+        with self._lock:
+            if value is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results (key, value, completed_at) VALUES (?, ?, ?)",
+                    (key, value, now),
+                )
+            self._conn.execute("DELETE FROM inflight WHERE key = ? AND owner = ?", (key, owner))
+            self._conn.execute("DELETE FROM results WHERE completed_at < ?", (now - self.result_ttl,))
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SingleFlight:
+    """Collapse concurrent identical calls into one.
+
+    Within a process, callers with the same key await a single shared task.
+    With ``db_path`` set, a SQLite lease extends this across uvicorn workers:
+    one worker calls upstream and the rest wait for the result it publishes.
+    If the leader fails, its lease is released and waiting workers make the
+    call themselves, so errors are never shared across processes.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        lease: float = 120.0,
+        poll_interval: float = 0.05,
+        result_ttl: float = 60.0,
+    ):
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self._flights: Dict[str, "asyncio.Task[str]"] = {}
+        self._shared = _SharedFlights(db_path, result_ttl) if db_path else None
+        self._owner = uuid.uuid4().hex
+
+    @classmethod
+    def from_env(cls) -> "SingleFlight":
+        """Build using the COALESCE_* environment variables."""
+        return cls(
+            db_path=os.getenv("COALESCE_DB") or None,
+            lease=float(os.getenv("COALESCE_LEASE", "120")),
+            poll_interval=float(os.getenv("COALESCE_POLL_INTERVAL", "0.05")),
+        )
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[str]]) -> str:
+        """Return ``fn()``'s result, sharing one call among concurrent callers of ``key``.
+
+        A caller that is cancelled doesn't cancel the shared call for the others.
+        """
+        task = self._flights.get(key)
+        if task is not None:
+            COALESCED.inc(scope="process")
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(self._run(key, fn))
+        self._flights[key] = task
+        task.add_done_callback(lambda _: self._flights.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _run(self, key: str, fn: Callable[[], Awaitable[str]]) -> str:
+        if self._shared is None:
+            return await fn()
+
+        delay = self.poll_interval
+        while True:
+            acquired, since = await asyncio.to_thread(self._shared.acquire, key, self._owner, self.lease)
+            if acquired:
+                break
+            # Another worker has the call in flight: wait for its result
+            while True:
+                await asyncio.sleep(delay)
+                delay = min(delay * 1.5, 1.0)
+                value, held = await asyncio.to_thread(self._shared.poll, key, since)
+                if value is not None:
+                    COALESCED.inc(scope="shared")
+                    return value
+                if not held:
+                    break
+
+        value: Optional[str] = None
+        try:
+            value = await fn()
+            return value
+        finally:
+            await asyncio.to_thread(self._shared.release, key, self._owner, value)
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    def close(self) -> None:
+        if self._shared is not None:
+            self._shared.close()
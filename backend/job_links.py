@@ -0,0 +1,268 @@
+import re
+import urllib.parse
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+JOB_TITLES = [
+    # Software and data
+    "software engineer", "software developer", "senior software engineer", "backend engineer",
+    "backend developer", "frontend engineer", "frontend developer", "full stack developer",
+    "full stack engineer", "web developer", "mobile developer", "ios developer", "android developer",
+    "game developer", "embedded software engineer", "firmware engineer", "devops engineer",
+    "site reliability engineer", "cloud engineer", "cloud architect", "solutions architect",
+    "software architect", "platform engineer", "security engineer", "cybersecurity analyst",
+    "information security analyst", "penetration tester", "network engineer", "network administrator",
+    "systems administrator", "system administrator", "database administrator", "it support specialist",
+    "help desk technician", "qa engineer", "quality assurance engineer", "test engineer",
+    "automation engineer", "data scientist", "data analyst", "data engineer", "machine learning engineer",
+    "ml engineer", "ai engineer", "research scientist", "research engineer", "business intelligence analyst",
+    "bi developer", "analytics engineer", "statistician", "quantitative analyst",
+    "computer vision engineer", "nlp engineer", "blockchain developer", "technical lead",
+    "engineering manager", "cto", "product manager", "technical product manager", "product owner",
+    "program manager", "project manager", "scrum master", "business analyst", "systems analyst",
+    "ux designer", "ui designer", "ui/ux designer", "product designer", "graphic designer",
+    "web designer", "technical writer",
+    # Engineering
+    "mechanical engineer", "electrical engineer", "civil engineer", "chemical engineer",
+    "industrial engineer", "manufacturing engineer", "process engineer", "structural engineer",
+    "biomedical engineer", "aerospace engineer", "environmental engineer", "hardware engineer",
+    "robotics engineer", "quality engineer", "design engineer", "field engineer",
+    # Business
+    "accountant", "financial analyst", "investment analyst", "auditor", "bookkeeper", "controller",
+    "marketing manager", "digital marketing specialist", "marketing coordinator", "marketing specialist",
+    "content writer", "copywriter", "social media manager", "seo specialist", "brand manager",
+    "sales representative", "sales manager", "account executive", "account manager",
+    "business development manager", "customer success manager", "customer service representative",
+    "operations manager", "operations analyst", "supply chain analyst", "logistics coordinator",
+    "procurement specialist", "human resources manager", "hr generalist", "recruiter",
+    "talent acquisition specialist", "office manager", "administrative assistant",
+    "executive assistant", "consultant", "management consultant", "risk analyst", "compliance officer",
+    # Other fields
+    "registered nurse", "nurse", "pharmacist", "physician", "medical assistant", "physical therapist",
+    "dental hygienist", "teacher", "teaching assistant", "professor", "lecturer", "tutor",
+    "research assistant", "lab technician", "laboratory technician", "chemist", "biologist",
+    "architect", "interior designer", "lawyer", "paralegal", "legal assistant", "journalist",
+    "editor", "photographer", "video editor", "animator", "chef", "electrician", "plumber",
+    "mechanic", "technician", "intern", "software engineering intern", "data science intern",
+]
+
+US_STATES = {
+    "AL": "Alabama", "AK": "Alaska", "AZ": "Arizona", "AR": "Arkansas", "CA": "California",
+    "CO": "Colorado", "CT": "Connecticut", "DE": "Delaware", "FL": "Florida", "GA": "Georgia",
+    "HI": "Hawaii", "ID": "Idaho", "IL": "Illinois", "IN": "Indiana", "IA": "Iowa", "KS": "Kansas",
+    "KY": "Kentucky", "LA": "Louisiana", "ME": "Maine", "MD": "Maryland", "MA": "Massachusetts",
+    "MI": "Michigan", "MN": "Minnesota", "MS": "Mississippi", "MO": "Missouri", "MT": "Montana",
+    "NE": "Nebraska", "NV": "Nevada", "NH": "New Hampshire", "NJ": "New Jersey", "NM": "New Mexico",
+    "NY": "New York", "NC": "North Carolina", "ND": "North Dakota", "OH": "Ohio", "OK": "Oklahoma",
+    "OR": "Oregon", "PA": "Pennsylvania", "RI": "Rhode Island", "SC": "South Carolina",
+    "SD": "South Dakota", "TN": "Tennessee", "TX": "Texas", "UT": "Utah", "VT": "Vermont",
+    "VA": "Virginia", "WA": "Washington", "WV": "West Virginia", "WI": "Wisconsin", "WY": "Wyoming",
+    "DC": "District of Columbia",
+}
+
+CITIES = [
+    "New York", "Los Angeles", "Chicago", "Houston", "Phoenix", "Philadelphia", "San Antonio",
+    "San Diego", "Dallas", "San Jose", "Austin", "Jacksonville", "Fort Worth", "Columbus",
+    "Charlotte", "San Francisco", "Indianapolis", "Seattle", "Denver", "Washington", "Boston",
+    "Nashville", "Detroit", "Portland", "Las Vegas", "Memphis", "Louisville", "Baltimore",
+    "Milwaukee", "Albuquerque", "Tucson", "Sacramento", "Atlanta", "Miami", "Raleigh",
+    "Minneapolis", "Pittsburgh", "Cincinnati", "Cleveland", "Orlando", "Tampa", "St. Louis",
+    "Salt Lake City", "Kansas City", "Oakland", "Palo Alto", "Mountain View", "Sunnyvale",
+    "Cambridge", "Ann Arbor", "Boulder", "Irvine", "Santa Clara", "Redmond", "Brooklyn",
+    "Toronto", "Vancouver", "Montreal", "Ottawa", "Calgary", "London", "Manchester", "Edinburgh",
+    "Dublin", "Paris", "Berlin", "Munich", "Hamburg", "Amsterdam", "Rotterdam", "Brussels",
+    "Zurich", "Geneva", "Vienna", "Stockholm", "Copenhagen", "Oslo", "Helsinki", "Madrid",
+    "Barcelona", "Lisbon", "Rome", "Milan", "Warsaw", "Prague", "Budapest", "Athens", "Istanbul",
+    "Dubai", "Abu Dhabi", "Doha", "Riyadh", "Jeddah", "Amman", "Beirut", "Cairo", "Tel Aviv",
+    "Lagos", "Nairobi", "Cape Town", "Johannesburg", "Casablanca", "Mumbai", "Bangalore",
+    "Bengaluru", "Hyderabad", "Chennai", "Pune", "Delhi", "New Delhi", "Gurgaon", "Noida",
+    "Karachi", "Lahore", "Dhaka", "Singapore", "Kuala Lumpur", "Jakarta", "Manila", "Bangkok",
+    "Ho Chi Minh City", "Hanoi", "Hong Kong", "Shanghai", "Beijing", "Shenzhen", "Taipei",
+    "Seoul", "Tokyo", "Osaka", "Sydney", "Melbourne", "Brisbane", "Perth", "Auckland",
+    "Mexico City", "Guadalajara", "Bogota", "Lima", "Santiago", "Buenos Aires", "Sao Paulo",
+    "Rio de Janeiro",
+]
+
+COUNTRIES = [
+    "United States", "USA", "Canada", "United Kingdom", "UK", "Ireland", "Germany", "France",
+    "Netherlands", "Belgium", "Switzerland", "Austria", "Sweden", "Denmark", "Norway", "Finland",
+    "Spain", "Portugal", "Italy", "Poland", "Czech Republic", "Hungary", "Greece", "Turkey",
+    "United Arab Emirates", "UAE", "Qatar", "Saudi Arabia", "Jordan", "Lebanon", "Egypt", "Israel",
+    "Nigeria", "Kenya", "South Africa", "Morocco", "India", "Pakistan", "Bangladesh", "Singapore",
+    "Malaysia", "Indonesia", "Philippines", "Thailand", "Vietnam", "China", "Taiwan", "South Korea",
+    "Japan", "Australia", "New Zealand", "Mexico", "Colombia", "Peru", "Chile", "Argentina", "Brazil",
+]
+
+SKILLS = [
+    "python", "java", "javascript", "typescript", "c++", "c#", "go", "rust", "ruby", "php", "swift",
+    "kotlin", "scala", "r", "matlab", "sql", "nosql", "postgresql", "mysql", "mongodb", "redis",
+    "react", "angular", "vue", "node.js", "django", "flask", "fastapi", "spring", ".net", "html",
+    "css", "aws", "azure", "gcp", "docker", "kubernetes", "terraform", "linux", "git", "ci/cd",
+    "tensorflow", "pytorch", "scikit-learn", "pandas", "numpy", "spark", "hadoop", "airflow",
+    "tableau", "power bi", "excel", "machine learning", "deep learning", "nlp", "computer vision",
+    "data analysis", "statistics", "figma", "photoshop", "autocad", "solidworks", "salesforce",
+    "sap", "jira", "agile", "scrum", "seo", "google analytics",
+]
+
+# Lines whose label says outright what the candidate is or where they are
+_TITLE_LABEL = re.compile(r"^\W*(?:position|title|role|applying for|objective|desired role|current role)\s*[:\-]", re.IGNORECASE)
+_LOCATION_LABEL = re.compile(r"^\W*(?:location|based in|lives in|city|address)\s*[:\-]", re.IGNORECASE)
+_CITY_STATE = re.compile(r"\b([A-Z][a-zA-Z.]+(?: [A-Z][a-zA-Z.]+){0,2}),\s*(" + "|".join(US_STATES) + r")\b")
+_REMOTE = re.compile(r"\bremote\b", re.IGNORECASE)
+_WORD = re.compile(r"[a-z0-9+#./]+(?:[-/][a-z0-9+#.]+)*")
+
+# How much a mention counts for, by the section it appears in
+_SECTION_WEIGHT = {"header": 3.0, "summary": 2.5, "experience": 1.5, "projects": 1.0, "education": 0.8}
+
+
+def _tokens(text: str) -> List[str]:
+    return [token.strip(".") or token for token in _WORD.findall(text.lower())]
+
+
+class Gazetteer:
+    """Phrase dictionary indexed by first token for one-pass n-gram matching."""
+
+    def __init__(self, phrases: List[str], canonical: Optional[Dict[str, str]] = None):
+        self._index: Dict[str, List[Tuple[Tuple[str, ...], str]]] = {}
+        canonical = canonical or {}
+        for phrase in phrases:
+            tokens = tuple(_tokens(phrase))
+            if tokens:
+                self._index.setdefault(tokens[0], []).append((tokens, canonical.get(phrase, phrase)))
+        # Longest phrases first so the most specific match wins at a position
+        for candidates in self._index.values():
+            candidates.sort(key=lambda c: len(c[0]), reverse=True)
+
+    def find(self, tokens: List[str]) -> List[Tuple[int, int, str]]:
+        """(start, end, phrase) for every non-overlapping match, longest first."""
+        found = []
+        i = 0
+        while i < len(tokens):
+            for phrase_tokens, phrase in self._index.get(tokens[i], ()):
+                if tuple(tokens[i:i + len(phrase_tokens)]) == phrase_tokens:
+                    found.append((i, i + len(phrase_tokens), phrase))
+                    i += len(phrase_tokens)
+                    break
+            else:
+                i += 1
+        return found
+
+
+_TITLES = Gazetteer(JOB_TITLES)
+_PLACES = Gazetteer(
+    CITIES + COUNTRIES + list(US_STATES.values()),
+    canonical={"USA": "United States", "UK": "United Kingdom", "UAE": "United Arab Emirates", "Bengaluru": "Bangalore"},
+)
+_SKILLS = Gazetteer(SKILLS)
+_DISPLAY = {phrase.lower(): phrase for phrase in CITIES + COUNTRIES + list(US_STATES.values())}
+
+
+@dataclass
+class JobProfile:
+    job_title: str
+    location: str
+    skills: List[str] = field(default_factory=list)
+    confidence: float = 0.0
+
+
+def _title_case(title: str) -> str:
+    small = {"ios": "iOS", "ui/ux": "UI/UX", "qa": "QA", "ml": "ML", "ai": "AI", "it": "IT", "hr": "HR",
+             "bi": "BI", "nlp": "NLP", "ux": "UX", "ui": "UI", "seo": "SEO", "cto": "CTO"}
+    return " ".join(small.get(word, word.capitalize()) for word in title.split())
+
+
+def _best(scores: Dict[str, float]) -> Tuple[Optional[str], float]:
+    if not scores:
+        return None, 0.0
+    best = max(scores, key=lambda k: (scores[k], len(k)))
+    return best, scores[best] / sum(scores.values())
+
+
+def extract_job_profile(text: str, sections: Optional[Dict[str, str]] = None) -> JobProfile:
+    """Pick the most likely job title, location and top skills from a resume.
+
+    Every line is matched once against the title, place and skill
+    gazetteers. Mentions are weighted by the section they appear in (when
+    ``sections`` from the resume store is available), by how early the line
+    is, and heavily when the line is labelled ("Title:", "Location:").
+    """
+    line_weights: List[Tuple[str, float]] = []
+    if sections:
+        for name, body in sections.items():
+            weight = _SECTION_WEIGHT.get(name, 0.5)
+            line_weights.extend((line, weight) for line in body.split("\n"))
+    else:
+        line_weights = [(line, 1.0) for line in text.split("\n")]
+
+    title_scores: Dict[str, float] = {}
+    place_scores: Dict[str, float] = {}
+    skill_scores: Dict[str, float] = {}
+    remote = 0.0
+    for number, (line, weight) in enumerate(line_weights):
+        weight *= 1.0 + 2.0 / (1 + number / 5)  # earlier lines count more
+        tokens = _tokens(line)
+        title_weight = weight * (10 if _TITLE_LABEL.match(line) else 1)
+        for _, _, title in _TITLES.find(tokens):
+            title_scores[title] = title_scores.get(title, 0.0) + title_weight * (1 + 0.2 * title.count(" "))
+
+        place_weight = weight * (10 if _LOCATION_LABEL.match(line) else 1)
+        for city, state in _CITY_STATE.findall(line):
+            place = f"{city}, {state}"
+            place_scores[place] = place_scores.get(place, 0.0) + place_weight * 2
+        previous_end = -1
+        previous_place = None
+        for start, end, place in _PLACES.find(tokens):
+            place = _DISPLAY.get(place.lower(), place)
+            if start == previous_end:
+                # "Amman, Jordan": a city directly followed by its region
+                place_scores[f"{previous_place}, {place}"] = place_scores.pop(previous_place, 0.0) + place_weight * 2
+            place_scores[place] = place_scores.get(place, 0.0) + place_weight
+            previous_end, previous_place = end, place
+        if _REMOTE.search(line):
+            remote += place_weight * 0.5
+
+        for _, _, skill in _SKILLS.find(tokens):
+            skill_scores[skill] = skill_scores.get(skill, 0.0) + 1
+
+    title, title_confidence = _best(title_scores)
+    place, _ = _best(place_scores)
+    if place is None or (remote and remote >= place_scores[place]):
+        place = "remote"
+
+    skills = sorted(skill_scores, key=lambda s: (-skill_scores[s], s))[:10]
+    return JobProfile(
+        job_title=_title_case(title) if title else "Software Engineer",
+        location=place,
+        skills=skills,
+        confidence=round(title_confidence, 3),
+    )
+
+
+def build_search_links(job_title: str, location: str) -> List[Dict[str, str]]:
+    """Search URLs for each supported platform, following the platform rules
+    used in the LLM prompt (fixed URLs for Glassdoor, RemoteOK, Wellfound and
+    Upwork)."""
+    title = urllib.parse.quote_plus(job_title)
+    place = urllib.parse.quote_plus(location)
+    return [
+        {"platform": "LinkedIn", "url": f"https://www.linkedin.com/jobs/search/?keywords={title}&location={place}"},
+        {"platform": "Indeed", "url": f"https://www.indeed.com/jobs?q={title}&l={place}"},
+        {"platform": "Google Jobs", "url": f"https://www.google.com/search?q={title}+jobs+{place}"},
+        {"platform": "Glassdoor", "url": "https://www.glassdoor.com/Job/index.htm"},
+        {"platform": "WeWorkRemotely", "url": f"https://weworkremotely.com/remote-jobs/search?term={title}"},
+        {"platform": "RemoteOK", "url": "https://remoteok.com"},
+        {"platform": "Wellfound", "url": "https://wellfound.com/remote"},
+        {"platform": "Upwork", "url": "https://www.upwork.com/freelance-jobs"},
+    ]
+
+
+def generate_job_links(text: str, sections: Optional[Dict[str, str]] = None) -> Dict[str, object]:
+    """Local /generate-links response: extracted profile plus search links."""
+    profile = extract_job_profile(text, sections)
+    return {
+        "job_title": profile.job_title,
+        "location": profile.location,
+        "skills": profile.skills,
+        "confidence": profile.confidence,
+        "search_links": build_search_links(profile.job_title, profile.location),
+    }
@@ -0,0 +1,390 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+from cache import make_cache_key
+from metrics import current_endpoint, registry
+from storage import connect, data_path
+
+logger = logging.getLogger("app.jobs")
+
+JOBS_FINISHED = registry.counter(
+    "jobs_finished_total", "Background jobs by outcome (succeeded, failed, retried).", ["kind", "status"],
+)
+JOB_WAIT = registry.histogram("job_queue_wait_seconds", "Time jobs spend queued before a worker starts them.", ["kind"])
+JOB_RUN = registry.histogram("job_run_seconds", "Time a worker spends running a job.", ["kind"])
+
+FINISHED = ("succeeded", "failed")
+
+Handler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class JobQueueFull(Exception):
+    """Too many jobs are queued or running to accept another."""
+
+
+class _JobStore:
+    """SQLite table of jobs, shared by every worker process using the same file.
+
+    A job is claimed by flipping it from ``queued`` to ``running`` under a
+    lease; a worker that dies mid-job leaves the lease to expire, and the
+    next claim puts the job back in the queue (or fails it once it has used
+    up its attempts).
+    """
+
+    _COLUMNS = ("id, kind, status, payload, result, error, attempts, created_at, started_at, "
+                "finished_at, expires_at")
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = connect(path)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, kind TEXT NOT NULL, dedup_key TEXT NOT NULL UNIQUE, "
+                "status TEXT NOT NULL, payload TEXT NOT NULL, result TEXT, error TEXT, "
+                "attempts INTEGER NOT NULL DEFAULT 0, owner TEXT, lease_expires_at REAL, "
+                "available_at REAL NOT NULL, created_at REAL NOT NULL, started_at REAL, "
+                "finished_at REAL, expires_at REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, available_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_expiry ON jobs (expires_at)")
+            self._conn.commit()
+
+    def submit(self, kind: str, key: str, payload: str, fresh: bool, max_pending: int) -> Tuple[str, bool]:
+        """Insert a job unless one with the same key is pending or (unless ``fresh``) done."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, status, expires_at FROM jobs WHERE dedup_key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                job_id, status, expires_at = row
+                if status not in FINISHED or (status == "succeeded" and not fresh and expires_at > now):
+                    return job_id, False
+                self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            pending = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchone()[0]
+            if pending >= max_pending:
+                self._conn.commit()
+                raise JobQueueFull(f"{pending} jobs are already pending; try again later")
+            job_id = uuid.uuid4().hex
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO jobs (id, kind, dedup_key, status, payload, available_at, created_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, kind, key, payload, now, now),
+            )
+            self._conn.commit()
+            if cursor.rowcount:
+                return job_id, True
+            # Another process inserted the same job between our check and insert
+            return self._conn.execute("SELECT id FROM jobs WHERE dedup_key = ?", (key,)).fetchone()[0], False
+
+    def claim(self, owner: str, lease: float, max_attempts: int, retention: float) -> Optional[Dict[str, Any]]:
+        """Take the oldest runnable job, first recovering jobs whose lease expired."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', error = 'worker lost the job too many times', owner = NULL, "
+                "finished_at = ?, expires_at = ? "
+                "WHERE status = 'running' AND lease_expires_at <= ? AND attempts >= ?",
+                (now, now + retention, now, max_attempts),
+            )
+            self._conn.execute(
+                "UPDATE jobs SET status = 'queued', owner = NULL WHERE status = 'running' AND lease_expires_at <= ?",
+                (now,),
+            )
+            while True:
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE status = 'queued' AND available_at <= ? "
+                    "ORDER BY available_at LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    self._conn.commit()
+                    return None
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET status = 'running', owner = ?, attempts = attempts + 1, started_at = ?, "
+                    "lease_expires_at = ? WHERE id = ? AND status = 'queued'",
+                    (owner, now, now + lease, row[0]),
+                )
+                self._conn.commit()
+                if cursor.rowcount:
+                    return self._get(row[0])
+
+    def finish(self, job_id: str, owner: str, result: Optional[str], error: Optional[str], retention: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, owner = NULL, finished_at = ?, expires_at = ? "
+                "WHERE id = ? AND owner = ?",
+                ("failed" if error is not None else "succeeded", result, error, now, now + retention, job_id, owner),
+            )
+            self._conn.commit()
+
+    def retry(self, job_id: str, owner: str, delay: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'queued', owner = NULL, available_at = ? WHERE id = ? AND owner = ?",
+                (time.time() + delay, job_id, owner),
+            )
+            self._conn.commit()
+
+    def release(self, owner: str) -> int:
+        """Put this owner's running jobs back in the queue without using up an attempt."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'queued', owner = NULL, attempts = attempts - 1 "
+                "WHERE status = 'running' AND owner = ?",
+                (owner,),
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def purge(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM jobs WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._get(job_id)
+
+    def _get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute(f"SELECT {self._COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(zip([c.strip() for c in self._COLUMNS.split(",")], row))
+        if job["expires_at"] is not None and job["expires_at"] <= time.time():
+            return None
+        return job
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _public(job: Dict[str, Any]) -> Dict[str, Any]:
+    """The job as returned by the API: payload omitted, result decoded."""
+    body: Dict[str, Any] = {
+        "job_id": job["id"],
+        "type": job["kind"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+    }
+    for field in ("created_at", "started_at", "finished_at", "expires_at"):
+        body[field] = round(job[field], 3) if job[field] is not None else None
+    if job["status"] == "succeeded":
+        body["result"] = json.loads(job["result"])
+    elif job["status"] == "failed":
+        body["error"] = job["error"]
+    return body
+
+
+class JobQueue:
+    """Persistent background job queue with a pool of asyncio workers.
+
+    Jobs live in a SQLite file, so they survive restarts and can be polled
+    from any uvicorn worker on the host. Submitting the same inputs again
+    returns the existing job while it is pending or its result is retained.
+    The database is opened on first use, so the file is only created once
+    the queue is started or a job is submitted.
+    Handlers are registered per job kind; a handler raising one of its
+    ``retry_on`` errors is requeued after the error's ``retry_after`` (up to
+    ``max_attempts``), any other error fails the job.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        workers: int = 2,
+        retention: float = 86400.0,
+        lease: float = 300.0,
+        max_attempts: int = 3,
+        max_pending: int = 1000,
+        poll_interval: float = 1.0,
+    ):
+        self.workers = workers
+        self.retention = retention
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.max_pending = max_pending
+        self.poll_interval = poll_interval
+        self.db_path = db_path
+        self._db: Optional[_JobStore] = None
+        self._db_lock = threading.Lock()
+        self._owner = uuid.uuid4().hex
+        self._handlers: Dict[str, Tuple[Handler, Tuple[Type[BaseException], ...]]] = {}
+        self._tasks: List["asyncio.Task[None]"] = []
+        self._wakeup = asyncio.Event()
+        # Long-poll waiters per job, woken when this process finishes it
+        self._finished: Dict[str, List[asyncio.Event]] = {}
+        self._next_purge = 0.0
+
+    @classmethod
+    def from_env(cls) -> "JobQueue":
+        """Build using the JOBS_* environment variables."""
+        return cls(
+            db_path=os.getenv("JOBS_DB") or data_path("jobs.sqlite3"),
+            workers=int(os.getenv("JOBS_WORKERS", "2")),
+            retention=float(os.getenv("JOBS_RETENTION", "86400")),
+            lease=float(os.getenv("JOBS_LEASE", "300")),
+            max_attempts=int(os.getenv("JOBS_MAX_ATTEMPTS", "3")),
+            max_pending=int(os.getenv("JOBS_MAX_PENDING", "1000")),
+            poll_interval=float(os.getenv("JOBS_POLL_INTERVAL", "1")),
+        )
+
+    @property
+    def _store(self) -> _JobStore:
+        # Also reached from worker threads (e.g. stats), hence the lock
+        with self._db_lock:
+            if self._db is None:
+                self._db = _JobStore(self.db_path)
+            return self._db
+
+    def register(self, kind: str, handler: Handler, retry_on: Sequence[Type[BaseException]] = ()) -> None:
+        self._handlers[kind] = (handler, tuple(retry_on))
+
+    async def submit(self, kind: str, inputs: Sequence[str], payload: Dict[str, Any],
+                     fresh: bool = False) -> Tuple[Dict[str, Any], bool]:
+        """Queue a job keyed on ``inputs``; returns (job, whether it was newly created).
+
+        With ``fresh`` a finished job for the same inputs is replaced rather
+        than returned; a pending one is still shared.
+        """
+        if kind not in self._handlers:
+            raise KeyError(f"no handler registered for job kind {kind!r}")
+        key = make_cache_key(kind, "job", inputs)
+        job_id, created = await asyncio.to_thread(
+            self._store.submit, kind, key, json.dumps(payload), fresh, self.max_pending
+        )
+        if created:
+            self._wakeup.set()
+        return _public(await asyncio.to_thread(self._store.get, job_id)), created
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = await asyncio.to_thread(self._store.get, job_id)
+        return _public(job) if job is not None else None
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """Long-poll: return the job once it has finished, or as it stands after ``timeout`` seconds.
+
+        Jobs run by this process wake the waiter immediately; jobs run by
+        another worker process are noticed within ``poll_interval``.
+        """
+        deadline = time.monotonic() + timeout
+        event = asyncio.Event()
+        self._finished.setdefault(job_id, []).append(event)
+        try:
+            while True:
+                job = await self.get(job_id)
+                remaining = deadline - time.monotonic()
+                if job is None or job["status"] in FINISHED or remaining <= 0:
+                    return job
+                try:
+                    await asyncio.wait_for(event.wait(), min(remaining, self.poll_interval))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            waiters = self._finished.get(job_id)
+            if waiters is not None and event in waiters:
+                waiters.remove(event)
+                if not waiters:
+                    del self._finished[job_id]
+
+    def start(self) -> None:
+        """Start the worker pool on the running event loop."""
+        if not self._tasks:
+            self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Stop the workers and hand their unfinished jobs back to the queue."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        released = await asyncio.to_thread(self._store.release, self._owner)
+        if released:
+            logger.info("requeued unfinished jobs on shutdown", extra={"jobs": released})
+
+    def close(self) -> None:
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> Dict[str, Any]:
+        counts = self._store.counts()
+        return {
+            "workers": len(self._tasks),
+            "queued": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "succeeded": counts.get("succeeded", 0),
+            "failed": counts.get("failed", 0),
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                job = await asyncio.to_thread(
+                    self._store.claim, self._owner, self.lease, self.max_attempts, self.retention
+                )
+            except sqlite3.Error:
+                logger.exception("claiming a job failed")
+                job = None
+            if job is not None:
+                await self._run(job)
+                continue
+            if time.monotonic() >= self._next_purge:
+                self._next_purge = time.monotonic() + 60.0
+                await asyncio.to_thread(self._store.purge)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        kind = job["kind"]
+        JOB_WAIT.observe(max(0.0, job["started_at"] - job["created_at"]), kind=kind)
+        handler, retry_on = self._handlers.get(kind, (None, ()))
+        token = current_endpoint.set(f"/{kind}")
+        start = time.perf_counter()
+        result: Optional[str] = None
+        error: Optional[str] = None
+        try:
+            if handler is None:
+                raise KeyError(f"no handler registered for job kind {kind!r}")
+            result = json.dumps(await handler(json.loads(job["payload"])))
+        except retry_on as e:
+            if job["attempts"] < self.max_attempts:
+                delay = float(getattr(e, "retry_after", None) or 1.0)
+                logger.warning("job deferred", extra={"job_id": job["id"], "kind": kind, "delay": delay, "error": str(e)})
+                await asyncio.to_thread(self._store.retry, job["id"], self._owner, delay)
+                JOBS_FINISHED.inc(kind=kind, status="retried")
+                return
+            error = str(e)
+        except Exception as e:
+            logger.exception("job failed", extra={"job_id": job["id"], "kind": kind})
+            error = str(e) or type(e).__name__
+        finally:
+            JOB_RUN.observe(time.perf_counter() - start, kind=kind)
+            current_endpoint.reset(token)
+        await asyncio.to_thread(self._store.finish, job["id"], self._owner, result, error, self.retention)
+        JOBS_FINISHED.inc(kind=kind, status="failed" if error is not None else "succeeded")
+        for event in self._finished.pop(job["id"], ()):
+            event.set()
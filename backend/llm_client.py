@@ -0,0 +1,233 @@
+import asyncio
+import json
+import os
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from metrics import LLM_RESPONSES, LLM_TOKENS, observe_stage
+
+
+class LLMError(Exception):
+    """Raised when the chat-completions API returns an error or an unusable body."""
+
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        """True for rate limits, server errors and transport failures."""
+        return self.status_code is None or self.status_code == 429 or self.status_code >= 500
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds form only)."""
+    try:
+        return max(0.0, float(response.headers["retry-after"]))
+    except (KeyError, ValueError):
+        return None
+
+
+def _record_usage(model: str, usage: Optional[Dict[str, Any]]) -> None:
+    if usage:
+        LLM_TOKENS.inc(usage.get("prompt_tokens", 0), model=model, kind="prompt")
+        LLM_TOKENS.inc(usage.get("completion_tokens", 0), model=model, kind="completion")
+
+
+class LLMClient:
+    """Shared async client for an OpenAI-compatible chat-completions API.
+
+    A single ``httpx.AsyncClient`` keeps a keep-alive connection pool open for
+    the lifetime of the app, and a semaphore caps how many completions are in
+    flight at once so a burst of requests can't open unbounded connections.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str],
+        max_connections: int = 50,
+        max_keepalive: int = 20,
+        max_concurrency: int = 32,
+        timeout: float = 60.0,
+        connect_timeout: float = 5.0,
+    ):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client: Optional[httpx.AsyncClient] = None
+        self.in_flight = 0
+
+    @classmethod
+    def from_env(cls, base_url: str, api_key: Optional[str]) -> "LLMClient":
+        """Build a client using the LLM_* environment variables for tuning."""
+        return cls(
+            base_url,
+            api_key,
+            max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "50")),
+            max_keepalive=int(os.getenv("LLM_MAX_KEEPALIVE", "20")),
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "32")),
+            timeout=float(os.getenv("LLM_TIMEOUT", "60")),
+            connect_timeout=float(os.getenv("LLM_CONNECT_TIMEOUT", "5")),
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                limits=self._limits,
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                },
+            )
+        return self._client
+
+    def _timeout(self, timeout: Optional[float]) -> httpx.Timeout:
+        return httpx.Timeout(
+            timeout if timeout is not None else self.timeout,
+            connect=self.connect_timeout,
+        )
+
+    async def chat_completion(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        timeout: Optional[float] = None,
+        **params: Any,
+    ) -> Dict[str, Any]:
+        """Run one chat completion and return the decoded JSON body.
+
+        Raises ``LLMError`` for transport failures, non-200 responses and
+        bodies without any ``choices``; ``status_code`` is only set for the
+        non-200 case.
+        """
+        payload = {"model": model, "messages": messages, **params}
+
+        async with self._semaphore:
+            self.in_flight += 1
+            start = time.perf_counter()
+            try:
+                response = await self.client.post(
+                    self.base_url, json=payload, timeout=self._timeout(timeout)
+                )
+            except httpx.TimeoutException as e:
+                LLM_RESPONSES.inc(model=model, status="timeout")
+                raise LLMError(f"LLM request timed out: {e}") from e
+            except httpx.HTTPError as e:
+                LLM_RESPONSES.inc(model=model, status="error")
+                raise LLMError(f"LLM request failed: {e}") from e
+            finally:
+                self.in_flight -= 1
+                observe_stage("llm", time.perf_counter() - start)
+
+        LLM_RESPONSES.inc(model=model, status=response.status_code)
+        if response.status_code != 200:
+            raise LLMError(
+                f"LLM API error {response.status_code}: {response.text[:500]}",
+                status_code=response.status_code,
+                retry_after=_retry_after(response),
+            )
+
+        try:
+            data = response.json()
+        except ValueError as e:
+            raise LLMError("LLM API returned invalid JSON") from e
+
+        if "choices" not in data or not data["choices"]:
+            raise LLMError(str(data.get("error", "LLM response missing 'choices'")))
+        _record_usage(model, data.get("usage"))
+        return data
+
+    async def complete(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        timeout: Optional[float] = None,
+        **params: Any,
+    ) -> str:
+        """Run one chat completion and return the first choice's message content."""
+        data = await self.chat_completion(model, messages, timeout=timeout, **params)
+        return data["choices"][0]["message"]["content"]
+
+    async def stream_complete(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        timeout: Optional[float] = None,
+        **params: Any,
+    ) -> AsyncIterator[str]:
+        """Run a chat completion with ``stream: true`` and yield content deltas
+        as they arrive from the server-sent event stream."""
+        payload = {"model": model, "messages": messages, "stream": True, **params}
+
+        async with self._semaphore:
+            self.in_flight += 1
+            start = time.perf_counter()
+            try:
+                async with self.client.stream(
+                    "POST", self.base_url, json=payload, timeout=self._timeout(timeout)
+                ) as response:
+                    LLM_RESPONSES.inc(model=model, status=response.status_code)
+                    if response.status_code != 200:
+                        body = (await response.aread()).decode("utf-8", "replace")
+                        raise LLMError(
+                            f"LLM API error {response.status_code}: {body[:500]}",
+                            status_code=response.status_code,
+                            retry_after=_retry_after(response),
+                        )
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[5:].strip()
+                        if data == "[DONE]":
+                            break
+                        try:
+                            chunk = json.loads(data)
+                        except ValueError as e:
+                            raise LLMError("LLM stream returned invalid JSON") from e
+                        if "error" in chunk:
+                            raise LLMError(str(chunk["error"]))
+                        # Groq reports usage on the final chunk under x_groq
+                        _record_usage(model, chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage"))
+                        for choice in chunk.get("choices", []):
+                            delta = (choice.get("delta") or {}).get("content")
+                            if delta:
+                                yield delta
+            except httpx.TimeoutException as e:
+                LLM_RESPONSES.inc(model=model, status="timeout")
+                raise LLMError(f"LLM request timed out: {e}") from e
+            except httpx.HTTPError as e:
+                LLM_RESPONSES.inc(model=model, status="error")
+                raise LLMError(f"LLM request failed: {e}") from e
+            finally:
+                self.in_flight -= 1
+                observe_stage("llm", time.perf_counter() - start)
+
+    async def warm(self) -> None:
+        """Open a pooled connection (DNS, TCP, TLS) to the API host ahead of the first call.
+
+        Sends a ``HEAD`` to the completions URL; whatever status comes back,
+        the connection stays in the keep-alive pool.
+        """
+        await self.client.head(self.base_url, timeout=self._timeout(self.connect_timeout * 2))
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
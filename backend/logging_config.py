@@ -0,0 +1,83 @@
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+from typing import Optional
+
+# Attributes every LogRecord has; anything else came in through ``extra=``
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formats records as one JSON object or ``key=value`` line per event.
+
+    Fields passed with ``extra={...}`` are emitted alongside the standard
+    timestamp, level, logger and message.
+    """
+
+    def __init__(self, json_output: bool = False):
+        super().__init__()
+        self.json_output = json_output
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        fields.update({key: value for key, value in vars(record).items() if key not in _RESERVED})
+        if record.exc_info:
+            fields["exc"] = self.formatException(record.exc_info)
+        if self.json_output:
+            return json.dumps(fields, default=str)
+        return " ".join(f"{key}={json.dumps(value, default=str)}" for key, value in fields.items())
+
+
+_TRACEBACKS = logging.Formatter()
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Formats the traceback into an ``exc`` field before the record is queued.
+
+    The stock ``prepare`` folds it into ``msg`` and drops ``exc_info``, so the
+    listener's formatter could no longer emit it as a separate field.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if record.exc_info:
+            record.exc = _TRACEBACKS.formatException(record.exc_info)
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        return record
+
+
+def configure_logging(level: Optional[str] = None, fmt: Optional[str] = None) -> logging.handlers.QueueListener:
+    """Route the ``app`` loggers through a queue so request handlers never block on I/O.
+
+    Handlers only enqueue records; a ``QueueListener`` thread formats and
+    writes them to stderr. Configured by LOG_LEVEL (default INFO) and
+    LOG_FORMAT (``text`` or ``json``). Returns the started listener, which
+    should be stopped at shutdown to flush pending records.
+    """
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    fmt = (fmt or os.getenv("LOG_FORMAT", "text")).lower()
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(StructuredFormatter(json_output=fmt == "json"))
+    listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+
+    logger = logging.getLogger("app")
+    logger.handlers = [_QueueHandler(log_queue)]
+    logger.setLevel(level)
+    logger.propagate = False
+    listener.start()
+    return listener
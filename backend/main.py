@@ -1,65 +1,440 @@
-from fastapi import FastAPI, File, UploadFile, Body, HTTPException
+import time
+
+# Taken before the imports below so GET /startup can report what they cost
+STARTED = time.perf_counter()
+
+from fastapi import APIRouter, FastAPI, File, UploadFile, Body, HTTPException, Depends, Request, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-import fitz
+from fastapi.responses import JSONResponse, StreamingResponse
+import asyncio
+import atexit
+import importlib
+import json
+import logging
 import os
-import requests
 import re
-from typing import Dict, Any
+import tempfile
+from contextlib import asynccontextmanager
+from typing import Dict, Any, AsyncIterator, Callable, List, Optional, Tuple, Union
 from dotenv import load_dotenv
 
-# Load environment variables
+# Load environment variables (before the local modules read their configuration)
 load_dotenv()
 
-app = FastAPI(title="AI Job & Resume Coach API", version="1.0.0")
-
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        "http://localhost:5173", 
-        "https://ai-job-resume-coach.vercel.app",
-        "https://*.vercel.app"  # Allow all Vercel preview deployments
-    ],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+from batch import BATCH_CONCURRENCY, BATCH_MAX_REQUEST_BYTES, BatchError, cleanup_after, expand_uploads, ndjson, run_batch
+from cache import ResponseCache, make_cache_key
+from coalesce import SingleFlight
+from job_links import generate_job_links
+from jobs import JobQueue, JobQueueFull
+from llm_client import LLMClient, LLMError
+from logging_config import configure_logging
+from matching import MATCH_MAX_DOCUMENTS, MATCH_MAX_KEYWORDS, match
+from metrics import MetricsMiddleware, registry, time_stage, timed
+from model_router import ModelRouter
+from output_parsing import OutputValidationError, QAStreamParser, parse_interview_pairs, parse_links_json, require_interview_pairs
+from pdf_extract import PDFExtractor
+from prompt_budget import PromptBudget, token_usage
+from resilience import CircuitOpenError, Resilience, hedge
+from resume_parser import parse_resume
+from result_store import RESULT_TYPES, ResultStore
+from resume_store import ResumeDocument, ResumeStore, estimate_tokens
+from scheduler import RateLimitScheduler, SchedulerTimeout
+from scoring import fallback_keywords, score_extractor
+from startup import StartupTimer
+from uploads import UPLOAD_MAX_BYTES, UPLOAD_TMP_DIR, MemoryTracker, UploadError, UploadLimitMiddleware, process_peak_rss, spooled_pdf
+
+# Leveled logging through a background queue listener; LOG_LEVEL / LOG_FORMAT
+log_listener = configure_logging()
+atexit.register(log_listener.stop)
+logger = logging.getLogger("app")
+
+# Startup phases and background pre-warm timings, reported at GET /startup
+startup = StartupTimer(STARTED)
+startup.mark("imports")
+
+# Routes are registered here and mounted on the app by create_app()
+api = APIRouter()
 
 # Global variables for API configuration
 GROQ_API_KEY = os.getenv('GROQ_API_KEY')
-GROQ_BASE_URL = "https://api.groq.com/openai/v1/chat/completions"
-MODEL = "llama3-70b-8192"
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1/chat/completions")
+
+# Per-endpoint model tiers (MODEL_ROUTES); small models first where output can be validated
+router = ModelRouter.from_env()
+
+# Shared async client; keeps a pooled keep-alive connection to Groq
+llm = LLMClient.from_env(GROQ_BASE_URL, GROQ_API_KEY)
+
+# Completions keyed on (endpoint, model, prompt); optional SQLite tier via RESPONSE_CACHE_DB
+response_cache = ResponseCache.from_env()
+
+# Per-endpoint deadlines and retries plus a circuit breaker shared by all LLM calls
+resilience = Resilience.from_env()
+
+# Client-side RPM/TPM budget for the shared API key; interactive calls are served before batch work
+scheduler = RateLimitScheduler.from_env()
+
+# Completion tokens reserved per call until the API reports actual usage
+COMPLETION_TOKEN_RESERVE = int(os.getenv("LLM_COMPLETION_TOKENS", "800"))
+
+# Errors meaning "upstream can't take this call right now" rather than "the call failed"
+UPSTREAM_UNAVAILABLE = (CircuitOpenError, SchedulerTimeout)
+
+# If set, /upload-resume answers with the local analysis when the LLM takes longer than this
+ANALYZE_HEDGE_MS = float(os.getenv("ANALYZE_HEDGE_MS", "0"))
+
+# Identical concurrent prompts share one upstream call; across workers via COALESCE_DB
+single_flight = SingleFlight.from_env()
+
+# PyMuPDF runs in a bounded process pool so parsing never blocks the event loop
+pdf_extractor = PDFExtractor.from_env()
+
+# Token budgets applied to resume/job text before it is interpolated into prompts
+prompt_budget = PromptBudget.from_env()
+
+# Resume sections each prompt actually uses; resume analysis reviews the whole document
+COVER_LETTER_SECTIONS = ("header", "summary", "experience", "projects", "skills")
+INTERVIEW_SECTIONS = ("summary", "experience", "projects", "skills", "education")
+JOB_LINKS_SECTIONS = ("header", "summary", "experience", "education", "skills")
+
+# Extract-once resume sessions: follow-up endpoints accept a resume_id instead of the text
+resume_store = ResumeStore.from_env()
+
+# Every analysis, cover letter and Q&A set, per resume and job description; served at /history
+result_store = ResultStore.from_env()
+
+# SQLite-backed queue for ?background=true generations, polled via /jobs/{job_id}
+job_queue = JobQueue.from_env()
+
+# The stores and caches above belong to the process rather than to an app, so
+# they are closed at exit; a restarted lifespan (e.g. a second TestClient) reuses them
+atexit.register(response_cache.close)
+atexit.register(single_flight.close)
+atexit.register(result_store.close)
+atexit.register(job_queue.close)
+
+# Longest a GET /jobs/{job_id}?wait= long-poll may block, in seconds
+JOBS_MAX_WAIT = float(os.getenv("JOBS_MAX_WAIT", "30"))
+
+# Live state sampled at scrape time
+registry.gauge("llm_in_flight", "Chat completions currently awaiting the upstream API.", callback=lambda: llm.in_flight)
+registry.gauge("llm_circuit_open", "1 while the LLM circuit breaker is open or half-open.",
+               callback=lambda: int(resilience.breaker.state != "closed"))
+registry.gauge("llm_queue_depth", "LLM calls waiting for rate-limit budget.",
+               callback=lambda: sum(scheduler.queue_depth().values()))
+registry.gauge("process_peak_rss_bytes", "Lifetime peak resident memory of this worker.", callback=process_peak_rss)
+registry.gauge("response_cache_hits", "Response cache hits (memory and disk).", callback=lambda: response_cache.stats()["hits"])
+registry.gauge("response_cache_misses", "Response cache misses.", callback=lambda: response_cache.stats()["misses"])
+registry.gauge("response_cache_hit_ratio", "Response cache hits / lookups.", callback=lambda: response_cache.stats()["hit_rate"])
+registry.gauge("response_cache_bytes", "Bytes held by the in-memory response cache.", callback=lambda: response_cache.stats()["bytes"])
+registry.gauge("resume_sessions", "Resume sessions held in memory.", callback=lambda: resume_store.stats()["documents"])
+
+# Comma-separated steps to warm in the background at startup: llm, pdf, match
+PREWARM = [name.strip() for name in os.getenv("PREWARM", "").split(",") if name.strip()]
+
+PREWARM_STEPS: Dict[str, Callable[[], Any]] = {
+    # Connection pool to Groq: DNS, TCP and TLS before the first completion
+    "llm": llm.warm,
+    # PDF worker processes with PyMuPDF loaded
+    "pdf": pdf_extractor.warm,
+    # NumPy for /match
+    "match": lambda: asyncio.to_thread(importlib.import_module, "numpy"),
+}
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    """Start background workers and pre-warming; the app serves as soon as this yields.
+
+    Shutdown stops what is tied to the event loop or outlives requests - job
+    workers, the Groq connection pool and PDF worker processes - all of which
+    start again on the next lifespan.
+    """
+    startup.mark("server")
+    job_queue.start()
+    steps = []
+    for name in PREWARM:
+        if name not in PREWARM_STEPS:
+            logger.warning("unknown PREWARM step ignored", extra={"step": name})
+        elif name == "llm" and not GROQ_API_KEY:
+            logger.info("skipping llm pre-warm without GROQ_API_KEY")
+        else:
+            steps.append(name)
 
-@app.get("/")
+    async def prewarm():
+        # One step at a time so warming never competes with the first requests for the CPU
+        for name in steps:
+            await startup.warm(name, PREWARM_STEPS[name])
+
+    warmup = asyncio.ensure_future(prewarm())
+    startup.mark("lifespan")
+    startup.ready()
+    logger.info("startup complete", extra={"ready_seconds": startup.ready_seconds, **startup.phases})
+    try:
+        yield
+    finally:
+        warmup.cancel()
+        await job_queue.stop()
+        await llm.aclose()
+        pdf_extractor.shutdown()
+
+def cache_bypass(request: Request, no_cache: bool = False) -> bool:
+    """Per-request cache bypass via ?no_cache=true or a Cache-Control: no-cache header."""
+    return no_cache or "no-cache" in request.headers.get("cache-control", "").lower()
+
+async def cached_completion(
+    endpoint: str,
+    messages: list,
+    bypass_cache: bool = False,
+    policy: Optional[str] = None,
+    model: Optional[str] = None,
+) -> str:
+    """Return the completion for these messages, serving repeats from the response cache.
+
+    Concurrent misses for the same prompt are coalesced into one upstream
+    call, made under the resilience ``policy`` (the endpoint's by default)
+    on ``model`` (the endpoint's first tier by default). Bypassed requests
+    still refresh the stored entry; failures are never cached.
+    """
+    model = model or router.models(endpoint)[0]
+    key = make_cache_key(endpoint, model, [m["content"] for m in messages])
+    if not bypass_cache:
+        cached = await response_cache.get(key)
+        if cached is not None:
+            return cached
+
+    async def fetch() -> str:
+        name = policy or endpoint
+        deadline = _queue_deadline(name)
+        content = await resilience.call(name, lambda: scheduled_complete(endpoint, name, model, messages, deadline))
+        await response_cache.set(key, content)
+        return content
+
+    return await single_flight.do(key, fetch)
+
+async def routed_completion(
+    endpoint: str,
+    messages: list,
+    validate: Callable[[str], Any],
+    bypass_cache: bool = False,
+    policy: Optional[str] = None,
+) -> Tuple[str, str]:
+    """Completion from the endpoint's cheapest model whose output passes ``validate``.
+
+    ``validate`` raises OutputValidationError for unusable output. Returns
+    (content, model). The last tier's output is returned even if it fails
+    validation, leaving the caller's own fallback handling in charge.
+    """
+    models = router.models(endpoint)
+    for model in models:
+        content = await cached_completion(endpoint, messages, bypass_cache, policy, model)
+        if model == models[-1]:
+            return content, model
+        try:
+            validate(content)
+            return content, model
+        except OutputValidationError as e:
+            router.escalated(endpoint, model)
+            logger.info(
+                "output failed validation, escalating",
+                extra={"endpoint": endpoint, "model": model, "reason": e.reason, "error": str(e)},
+            )
+
+def _queue_deadline(policy: str) -> float:
+    """Latest time a call may leave the scheduler queue, just inside the policy deadline."""
+    return time.monotonic() + resilience.policy(policy).deadline - 0.1
+
+def _prompt_tokens(messages: list) -> int:
+    return sum(estimate_tokens(m["content"]) for m in messages)
+
+def _reservation(messages: list) -> int:
+    return _prompt_tokens(messages) + COMPLETION_TOKEN_RESERVE
+
+async def scheduled_complete(
+    endpoint: str, policy: str, model: str, messages: list, deadline: Optional[float] = None
+) -> str:
+    """One completion, sent once the rate-limit scheduler grants budget for it."""
+    priority = "batch" if policy == "batch" else "interactive"
+    async with scheduler.slot(model, _reservation(messages), priority, deadline) as slot:
+        start = time.perf_counter()
+        data = await llm.chat_completion(model, messages)
+        usage = data.get("usage") or {}
+        router.observe(endpoint, model, time.perf_counter() - start, usage)
+        if "total_tokens" in usage:
+            slot.usage(usage["total_tokens"])
+        return data["choices"][0]["message"]["content"]
+
+async def scheduled_stream(
+    endpoint: str, model: str, messages: list, deadline: Optional[float] = None
+) -> AsyncIterator[str]:
+    """Streaming counterpart of scheduled_complete; settles on the prompt and streamed text's estimate."""
+    async with scheduler.slot(model, _reservation(messages), "interactive", deadline) as slot:
+        start = time.perf_counter()
+        parts = []
+        async for delta in llm.stream_complete(model, messages):
+            parts.append(delta)
+            yield delta
+        router.observe(endpoint, model, time.perf_counter() - start)
+        slot.usage(_prompt_tokens(messages) + estimate_tokens("".join(parts)))
+
+async def stream_completion(endpoint: str, messages: list, bypass_cache: bool = False) -> AsyncIterator[str]:
+    """Streaming counterpart of cached_completion: yields content deltas.
+
+    Streams use the endpoint's last model tier, since output that has
+    already been sent can't be escalated. A cache hit is yielded as a
+    single chunk; a completed stream is stored under the same key the
+    non-streaming endpoint uses for that model.
+    """
+    model = router.stream_model(endpoint)
+    key = make_cache_key(endpoint, model, [m["content"] for m in messages])
+    if not bypass_cache:
+        cached = await response_cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+    parts = []
+    deadline = _queue_deadline(endpoint)
+    async for delta in resilience.stream(endpoint, lambda: scheduled_stream(endpoint, model, messages, deadline)):
+        parts.append(delta)
+        yield delta
+    await response_cache.set(key, "".join(parts))
+
+def _resume_from_payload(payload: dict) -> Tuple[str, Optional[ResumeDocument]]:
+    """Resume text from an inline ``resume`` or a ``resume_id`` session.
+
+    Returns the text and, for sessions, the stored document with its
+    precomputed derived data.
+    """
+    resume_id = payload.get("resume_id")
+    if resume_id:
+        document = resume_store.get(resume_id)
+        if document is None:
+            raise HTTPException(status_code=404, detail="Unknown or expired resume_id; upload the resume again")
+        return document.text, document
+    return payload.get("resume", "").strip(), None
+
+def _unavailable(error: LLMError) -> HTTPException:
+    """503 for an LLM-backed endpoint with no local fallback while upstream is unavailable."""
+    return HTTPException(
+        status_code=503,
+        detail=str(error),
+        headers={"Retry-After": str(int(error.retry_after or 1))},
+    )
+
+async def _remember(result_type: str, resume: str, job: str, result: Dict[str, Any]) -> None:
+    """Save a generated result to the history store; a failed write is logged, not raised."""
+    try:
+        await asyncio.to_thread(result_store.record, result_type, resume, job, result)
+    except Exception as e:
+        logger.warning("could not save result history", extra={"type": result_type, "error": str(e)})
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@api.get("/")
 async def root():
     """Health check endpoint"""
     return {"message": "🚀 Transform your career with AI-powered resume feedback, personalized cover letters, interview preparation, and job matching - all in one platform!"}
 
-@app.head("/")
+@api.head("/")
 async def head_root():
     return
 
-async def extract_text_from_pdf(contents: bytes) -> str:
-    """Extract text content from PDF file."""
-    try:
-        doc = fitz.open(stream=contents, filetype="pdf")
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        doc.close()
-        return text.strip()
-    except Exception as e:
-        raise Exception(f"Failed to read PDF: {str(e)}")
+@api.get("/resumes/{resume_id}")
+async def get_resume(resume_id: str):
+    """Derived data for a stored resume session."""
+    document = resume_store.get(resume_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired resume_id")
+    return document.summary()
 
-async def analyze_resume(text: str) -> Dict[str, Any]:
-    """Analyze resume and provide structured feedback with scores."""
-    
-    try:
-        # Fallback implementation when API is not available
-        if not GROQ_API_KEY:
-            return _generate_fallback_analysis(text)
-                
-        prompt = f"""Analyze this resume and provide structured, actionable feedback using this format:
+@api.get("/metrics")
+async def metrics():
+    """Prometheus text-format metrics."""
+    return Response(registry.render(), media_type=registry.content_type)
+
+@api.get("/scheduler/stats")
+async def scheduler_stats():
+    """Rate-limit scheduler queue depth, wait times and remaining budget."""
+    return scheduler.stats()
+
+@api.get("/models/stats")
+async def model_stats():
+    """Model routing table and per-model call counts, latency and estimated cost."""
+    return router.stats()
+
+@api.get("/cache/stats")
+async def cache_stats():
+    """Response cache hit/miss counters."""
+    return response_cache.stats()
+
+@api.get("/history")
+async def get_history(
+    resume_id: str,
+    result_type: Optional[str] = Query(None, alias="type"),
+    job_hash: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[int] = None,
+):
+    """Stored results for a resume, newest first, read locally without calling the LLM.
+
+    Filter by ``type`` (analysis, cover-letter, interview) and/or a
+    ``job_hash`` from an earlier item; pass ``next_cursor`` back as
+    ``cursor`` for the next page.
+    """
+    if result_type is not None and result_type not in RESULT_TYPES:
+        raise HTTPException(status_code=400, detail=f"type must be one of: {', '.join(RESULT_TYPES)}")
+    items, next_cursor = await asyncio.to_thread(
+        result_store.history, resume_id, result_type, job_hash, limit, cursor
+    )
+    return {"resume_id": resume_id, "items": items, "next_cursor": next_cursor}
+
+@api.get("/history/stats")
+async def history_stats():
+    """Stored result counts by type, distinct resumes and database size."""
+    return await asyncio.to_thread(result_store.stats)
+
+@api.get("/startup")
+async def startup_timings():
+    """Startup timing breakdown and the state of background pre-warming."""
+    return startup.report()
+
+@api.get("/jobs/stats")
+async def jobs_stats():
+    """Background job counts by status."""
+    return await asyncio.to_thread(job_queue.stats)
+
+@api.get("/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = Query(0, ge=0)):
+    """Status of a background job, with its ``result`` once it has succeeded.
+
+    ``?wait=N`` long-polls: the response is held until the job finishes or
+    ``N`` seconds pass (capped at ``JOBS_MAX_WAIT``).
+    """
+    if wait:
+        job = await job_queue.wait(job_id, min(wait, JOBS_MAX_WAIT))
+    else:
+        job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job_id")
+    return job
+
+@timed("pdf")
+async def extract_text_from_pdf(source: Union[bytes, str]) -> str:
+    """Extract text content from a PDF given as bytes or a file path."""
+    return await pdf_extractor.extract_text(source)
+
+@timed("pdf")
+async def extract_layout_from_pdf(source: Union[bytes, str]) -> Tuple[str, List[Any]]:
+    """Extract the text of a PDF plus the per-line font data used to find its sections."""
+    return await pdf_extractor.extract_layout(source)
+
+@timed("prompt")
+def _analyze_resume_messages(text: str) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+    """Build the chat messages for resume analysis, plus their token usage."""
+    resume, = prompt_budget.fit(text)
+    prompt = f"""Analyze this resume and provide structured, actionable feedback using this format:
 
 **Formatting & Structure**: Evaluate layout, organization, and professional appearance. Comment on readability, spacing, font consistency, and overall visual hierarchy.
 
@@ -72,62 +447,49 @@ async def analyze_resume(text: str) -> Dict[str, Any]:
 Provide detailed, constructive feedback for each section. Do NOT include numerical scores in your response - focus on qualitative analysis and specific improvement suggestions.
 
 Resume:
-{text}
+{resume.text}
 """
 
-        headers = {
-            "Authorization": f"Bearer {GROQ_API_KEY}",
-            "Content-Type": "application/json"
-        }
-
-        payload = {
-            "model": MODEL,
-            "messages": [
-                {"role": "system", "content": "You are a professional resume reviewer who provides structured, detailed feedback. Use the exact section headers provided. Do NOT include numerical scores or ratings in your response - provide qualitative analysis only. Be specific and actionable in your recommendations."},
-                {"role": "user", "content": prompt}
-            ]
-        }
-
-        response = requests.post(GROQ_BASE_URL, headers=headers, json=payload)
-        data = response.json()
-        
-        if "choices" not in data or not data["choices"]:
-            # If API fails, use fallback
+    messages = [
+        {"role": "system", "content": "You are a professional resume reviewer who provides structured, detailed feedback. Use the exact section headers provided. Do NOT include numerical scores or ratings in your response - provide qualitative analysis only. Be specific and actionable in your recommendations."},
+        {"role": "user", "content": prompt}
+    ]
+    return messages, token_usage(messages, [resume])
+
+async def analyze_resume_with_llm(text: str, bypass_cache: bool = False, policy: str = "upload-resume") -> Dict[str, Any]:
+    """LLM resume analysis without the local fallback; raises LLMError on upstream failure.
+
+    Only these results go to the history store, so a local fallback never
+    replaces a model analysis there; a hedged call that finishes late is
+    still saved.
+    """
+    messages, usage = _analyze_resume_messages(text)
+    ai_feedback = await cached_completion("upload-resume", messages, bypass_cache, policy)
+    with time_stage("parse"):
+        scores = score_extractor.extract(ai_feedback)
+    result = {"feedback": ai_feedback, "scores": scores, "token_usage": usage}
+    await _remember("analysis", text, "", result)
+    return result
+
+async def analyze_resume(text: str, bypass_cache: bool = False) -> Dict[str, Any]:
+    """Analyze resume and provide structured feedback with scores."""
+    
+    try:
+        # Fallback implementation when API is not available
+        if not GROQ_API_KEY:
             return _generate_fallback_analysis(text)
-            
-        ai_feedback = data["choices"][0]["message"]["content"]
-        
-        # Generate scores for visualization
-        score_map = {
-            "Format": 8,
-            "Content": 7,
-            "Skills": 8,
-            "Impact": 7,
-            "Overall": 7
-        }
-
-        # Try to extract scores from feedback if they exist
-        score_patterns = {
-            "Format": [r"format.*?(\d+)/10", r"structure.*?(\d+)/10", r"layout.*?(\d+)/10"],
-            "Content": [r"content.*?(\d+)/10", r"quality.*?(\d+)/10"],
-            "Skills": [r"skills.*?(\d+)/10", r"technical.*?(\d+)/10"],
-            "Impact": [r"impact.*?(\d+)/10", r"achievement.*?(\d+)/10"],
-            "Overall": [r"overall.*?(\d+)/10", r"total.*?(\d+)/10", r"final.*?(\d+)/10"]
-        }
-
-        for category, patterns in score_patterns.items():
-            for pattern in patterns:
-                match = re.search(pattern, ai_feedback, re.IGNORECASE)
-                if match:
-                    try:
-                        score_map[category] = int(match.group(1))
-                        break
-                    except:
-                        continue
-
-        return {"feedback": ai_feedback, "scores": score_map}
+
+        if ANALYZE_HEDGE_MS > 0:
+            return await hedge(
+                "upload-resume",
+                analyze_resume_with_llm(text, bypass_cache),
+                lambda: _generate_fallback_analysis(text),
+                ANALYZE_HEDGE_MS / 1000,
+            )
+        return await analyze_resume_with_llm(text, bypass_cache)
     except Exception as e:
         # If any error occurs, fall back to basic analysis
+        logger.warning("resume analysis failed, using local fallback", extra={"error": str(e)})
         return _generate_fallback_analysis(text)
 
 def _generate_fallback_analysis(text: str) -> Dict[str, Any]:
@@ -135,17 +497,28 @@ def _generate_fallback_analysis(text: str) -> Dict[str, Any]:
     
     # Basic text analysis
     word_count = len(text.split())
-    has_contact = any(keyword in text.lower() for keyword in ['email', 'phone', '@', 'linkedin'])
-    has_experience = any(keyword in text.lower() for keyword in ['experience', 'work', 'job', 'position'])
-    has_education = any(keyword in text.lower() for keyword in ['education', 'degree', 'university', 'college'])
-    has_skills = any(keyword in text.lower() for keyword in ['skills', 'programming', 'software', 'technical'])
+    index = parse_resume(text)
+    if index.structured:
+        # Each signal is looked for only in the sections that carry it
+        has_contact = "email" in index.contact or "phone" in index.contact or \
+            "contact" in fallback_keywords.groups_present(index.sections.get("header", ""))
+        has_experience = "experience" in index.sections
+        has_education = "education" in index.sections
+        has_skills = "skills" in index.sections
+        present = fallback_keywords.groups_present(index.text_of(("summary", "experience", "projects", "awards")))
+    else:
+        present = fallback_keywords.groups_present(text)
+        has_contact = "contact" in present
+        has_experience = "experience" in present
+        has_education = "education" in present
+        has_skills = "skills" in present
     
     # Generate scores based on content analysis
     scores = {
         "Format": 8 if word_count > 200 else 6,
         "Content": 8 if has_experience and has_education else 6,
         "Skills": 8 if has_skills else 5,
-        "Impact": 7 if any(keyword in text.lower() for keyword in ['achieved', 'improved', 'increased', 'developed']) else 5,
+        "Impact": 7 if "impact" in present else 5,
         "Overall": 7
     }
     
@@ -160,7 +533,7 @@ def _generate_fallback_analysis(text: str) -> Dict[str, Any]:
 
 **Areas for Improvement:**
 - {'Skills section looks good' if has_skills else 'Add a dedicated skills section with relevant technical and soft skills'}
-- {'Good use of action words and achievements' if any(keyword in text.lower() for keyword in ['achieved', 'improved', 'increased']) else 'Include more quantifiable achievements and action words'}
+- {'Good use of action words and achievements' if "achievements" in present else 'Include more quantifiable achievements and action words'}
 - Consider using bullet points for better readability
 - Ensure consistent formatting throughout the document
 
@@ -176,8 +549,10 @@ Your resume has a solid foundation. Focus on adding more specific achievements a
 
     return {"feedback": feedback, "scores": scores}
 
-async def generate_cover_letter(resume: str, job_description: str) -> str:
-    """Generate a professional cover letter based on resume and job description."""
+@timed("prompt")
+def _cover_letter_messages(resume_text: str, job_text: str) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+    """Build the chat messages for cover letter generation, plus their token usage."""
+    resume, job_description = prompt_budget.fit(resume_text, job_text, COVER_LETTER_SECTIONS)
     prompt = f"""You're a professional cover letter writer. Create a compelling, concise cover letter that:
 
 1. **Opening**: Start with "Dear Hiring Manager," followed by a strong introduction mentioning the specific position
@@ -196,236 +571,359 @@ async def generate_cover_letter(resume: str, job_description: str) -> str:
 - Do NOT include any introductory text like "Here is a cover letter..." - start directly with the cover letter content
 
 Resume:
-{resume}
+{resume.text}
 
 Job Description:
-{job_description}
+{job_description.text}
 
 Write a professional cover letter that gets straight to the point and demonstrates clear value alignment. Start directly with "Dear Hiring Manager," without any introductory phrases."""
 
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json"
-    }
+    messages = [
+        {"role": "system", "content": "You are a professional cover letter writer. Write cover letters that start directly with the content - no introductory phrases like 'Here is a cover letter' or similar. Format your response cleanly without excessive spacing. Focus on professional experience only, avoid mentioning certificates or credentials."},
+        {"role": "user", "content": prompt}
+    ]
+    return messages, token_usage(messages, [resume, job_description])
 
-    payload = {
-        "model": MODEL,
-        "messages": [
-            {"role": "system", "content": "You are a professional cover letter writer. Write cover letters that start directly with the content - no introductory phrases like 'Here is a cover letter' or similar. Format your response cleanly without excessive spacing. Focus on professional experience only, avoid mentioning certificates or credentials."},
-            {"role": "user", "content": prompt}
-        ]
-    }
+@timed("parse")
+def _clean_cover_letter(cover_letter: str) -> str:
+    """Clean up extra spaces and line breaks."""
+    cover_letter = re.sub(r'\n\s*\n\s*\n', '\n\n', cover_letter)
+    cover_letter = re.sub(r'[ \t]+', ' ', cover_letter)
+    return cover_letter.strip()
+
+async def generate_cover_letter(resume: str, job_description: str, bypass_cache: bool = False) -> Dict[str, Any]:
+    """Generate a professional cover letter based on resume and job description."""
+    messages, usage = _cover_letter_messages(resume, job_description)
 
     try:
-        response = requests.post(GROQ_BASE_URL, headers=headers, json=payload)
-        data = response.json()
-        
-        if "choices" in data and data["choices"]:
-            cover_letter = data["choices"][0]["message"]["content"]
-            # Clean up extra spaces and line breaks
-            cover_letter = re.sub(r'\n\s*\n\s*\n', '\n\n', cover_letter)
-            cover_letter = re.sub(r'[ \t]+', ' ', cover_letter)
-            cover_letter = cover_letter.strip()
-            return cover_letter
-        else:
-            raise Exception(data.get("error", "LLM response missing 'choices'"))
+        cover_letter = await cached_completion("generate-cover-letter", messages, bypass_cache)
+        result = {"letter": _clean_cover_letter(cover_letter), "token_usage": usage}
+        await _remember("cover-letter", resume, job_description, result)
+        return result
+    except UPSTREAM_UNAVAILABLE:
+        raise
     except Exception as e:
         raise Exception(f"Failed to generate cover letter: {str(e)}")
 
+@timed("prompt")
+def _interview_messages(resume_text: str, job_text: str) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+    """Build the chat messages for interview Q&A generation, plus their token usage."""
+    resume, job = prompt_budget.fit(resume_text, job_text, INTERVIEW_SECTIONS)
+    prompt = f"""Create 10 interview questions with answers. Generate 5 questions based on the resume and 5 questions based on the job description.
+
+Format each question and answer like this:
+Q1: How do you handle challenges when working with incomplete data sets?
+A1: Based on my experience in data analysis projects, I approach incomplete data by...
+
+Continue this pattern through Q10 and A10.
+
+**Resume-Based Questions (Q1-Q5):** Create insightful behavioral and technical questions that explore the candidate's actual experience. Analyze their projects, skills, and background to ask about:
+- Specific challenges they likely faced in their listed projects or roles
+- How they applied the technologies/skills mentioned in their resume
+- Problem-solving approaches related to their field of expertise
+- Leadership or collaboration experiences based on their background
+- Learning and adaptation in areas they've worked in
+
+**Job Description-Based Questions (Q6-Q10):** Create questions that test fit for this specific role. Based on the job requirements, ask about:
+- How they would approach key responsibilities mentioned in the job description
+- Their experience with specific tools, technologies, or methodologies required
+- How they would handle challenges unique to this role or industry
+- Their strategy for meeting specific objectives outlined in the job posting
+- How they would contribute to team goals and company mission as described
+
+Make each question specific and relevant. Avoid generic questions. The answers should demonstrate how the candidate's background directly prepares them for both the challenges they've faced and the role they're applying for.
+
+Resume:
+{resume.text}
+
+Job Description:
+{job.text}"""
+
+    messages = [
+        {"role": "system", "content": "You are an interview coach. Generate interview questions and answers using the Q#:/A#: format. Be clear and direct."},
+        {"role": "user", "content": prompt}
+    ]
+    return messages, token_usage(messages, [resume, job])
+
+@timed("parse")
+def _parse_interview_pairs(content: str) -> List[Dict[str, str]]:
+    """Parse Q#:/A#: pairs from a completion."""
+    pairs = parse_interview_pairs(content)
+    logger.debug("parsed interview pairs", extra={"pairs": len(pairs)})
+    return pairs
+
+# Interview completions with fewer Q#/A# pairs than this are retried on the next model tier
+INTERVIEW_MIN_PAIRS = int(os.getenv("INTERVIEW_MIN_PAIRS", "8"))
+
+def _enough_interview_pairs(content: str) -> List[Dict[str, str]]:
+    return require_interview_pairs(content, INTERVIEW_MIN_PAIRS)
+
+async def generate_interview(resume: str, job_description: str, bypass_cache: bool = False) -> Dict[str, Any]:
+    """Generate interview Q&A pairs based on resume and job description."""
+    messages, usage = _interview_messages(resume, job_description)
+    content, model = await routed_completion(
+        "interview-trainer", messages, _enough_interview_pairs, bypass_cache
+    )
+    logger.debug("interview trainer completion", extra={"content_chars": len(content)})
+
+    pairs = _parse_interview_pairs(content)
+    if not pairs:
+        raise Exception("Could not parse interview questions from AI response")
+    result = {"pairs": pairs, "model": model, "token_usage": usage}
+    await _remember("interview", resume, job_description, result)
+    return result
+
+# Background job kinds; upstream-unavailable errors requeue the job after Retry-After
+job_queue.register(
+    "generate-cover-letter",
+    lambda p: generate_cover_letter(p["resume"], p["job"], p["bypass_cache"]),
+    retry_on=UPSTREAM_UNAVAILABLE,
+)
+job_queue.register(
+    "interview-trainer",
+    lambda p: generate_interview(p["resume"], p["job"], p["bypass_cache"]),
+    retry_on=UPSTREAM_UNAVAILABLE,
+)
+
+async def _submit_job(kind: str, resume: str, job: str, bypass_cache: bool) -> JSONResponse:
+    """Queue a generation and answer 202 with the job to poll."""
+    try:
+        record, _ = await job_queue.submit(
+            kind, [resume, job], {"resume": resume, "job": job, "bypass_cache": bypass_cache}, fresh=bypass_cache
+        )
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    return JSONResponse(record, status_code=202, headers={"Location": f"/jobs/{record['job_id']}"})
+
 # Endpoints
-@app.post("/upload-resume")
-async def upload_resume(file: UploadFile = File(...)):
+@api.post("/upload-resume")
+async def upload_resume(response: Response, file: UploadFile = File(...), bypass_cache: bool = Depends(cache_bypass)):
     """Upload and analyze resume."""
-    if not file.filename.endswith('.pdf'):
-        raise HTTPException(status_code=400, detail="Only PDF files are supported")
-    
+    memory = MemoryTracker("upload-resume")
     try:
-        contents = await file.read()
-        text = await extract_text_from_pdf(contents)
-        result = await analyze_resume(text)
-        return {"feedback": result["feedback"], "scores": result["scores"]}
+        async with spooled_pdf(file) as path:
+            memory.sample()
+            text, layout = await extract_layout_from_pdf(path)
+        memory.sample()
+        document = resume_store.add(text, layout)
+        result = await analyze_resume(text, bypass_cache)
+        body = {"feedback": result["feedback"], "scores": result["scores"], "resume_id": document.resume_id}
+        if "token_usage" in result:
+            body["token_usage"] = result["token_usage"]
+        return body
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
-        print(f"Error in upload_resume: {str(e)}")
+        logger.exception("upload_resume failed")
         raise HTTPException(status_code=500, detail=f"Failed to process resume: {str(e)}")
+    finally:
+        response.headers["X-Peak-RSS-Growth"] = str(memory.report())
 
-@app.post("/extract-resume")
-async def extract_resume(file: UploadFile = File(...)):
-    """Extract text from resume PDF."""
-    if not file.filename.endswith('.pdf'):
-        raise HTTPException(status_code=400, detail="Only PDF files are supported")
-    
+@api.post("/batch/upload-resume")
+async def batch_upload_resume(
+    files: List[UploadFile] = File(...),
+    concurrency: int = Query(BATCH_CONCURRENCY, ge=1, le=32),
+    bypass_cache: bool = Depends(cache_bypass),
+):
+    """Analyze many resumes (PDFs and/or zip archives of PDFs) in one request.
+
+    Streams one NDJSON record per file as soon as it finishes, in completion
+    order, followed by a summary line. Rate-limited LLM calls are retried
+    with backoff; a file that still fails gets an error record.
+    """
+    # The multipart parser has already spooled each file; unpack them to disk
+    # one chunk at a time rather than reading whole uploads into memory
+    spool = tempfile.TemporaryDirectory(prefix="batch-", dir=UPLOAD_TMP_DIR)
+    uploads = [(file.filename or "upload", file.file) for file in files]
+    try:
+        items = await asyncio.to_thread(expand_uploads, uploads, spool.name)
+    except BatchError as e:
+        spool.cleanup()
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception:
+        spool.cleanup()
+        raise
+
+    async def analyze(text: str) -> Dict[str, Any]:
+        if not GROQ_API_KEY:
+            return _generate_fallback_analysis(text)
+        return await analyze_resume_with_llm(text, bypass_cache, policy="batch")
+
+    records = cleanup_after(
+        run_batch(items, extract_text_from_pdf, analyze, concurrency, pdf_extractor.workers), spool.cleanup
+    )
+    return StreamingResponse(ndjson(records), media_type="application/x-ndjson")
+
+@api.post("/extract-resume")
+async def extract_resume(response: Response, file: UploadFile = File(...)):
+    """Extract text from resume PDF and open a resume session for follow-up calls."""
+    memory = MemoryTracker("extract-resume")
     try:
-        contents = await file.read()
-        text = await extract_text_from_pdf(contents)
-        return {"text": text, "score": []}
+        async with spooled_pdf(file) as path:
+            memory.sample()
+            text, layout = await extract_layout_from_pdf(path)
+        document = resume_store.add(text, layout)
+        return {"text": text, "score": [], **document.summary()}
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        response.headers["X-Peak-RSS-Growth"] = str(memory.report())
 
-@app.post("/generate-cover-letter")
-async def generate_cover_letter_endpoint(payload: dict = Body(...)):
-    """Generate cover letter based on resume and job description."""
+@api.post("/generate-cover-letter")
+async def generate_cover_letter_endpoint(
+    payload: dict = Body(...), background: bool = False, bypass_cache: bool = Depends(cache_bypass)
+):
+    """Generate cover letter based on resume and job description.
+
+    With ``?background=true`` the letter is generated by a background job
+    instead: the response is ``202`` with a ``job_id`` to poll at
+    ``/jobs/{job_id}``.
+    """
     try:
-        resume = payload.get("resume", "").strip()
+        resume, _ = _resume_from_payload(payload)
         job = payload.get("job", "").strip()
         
         if not resume or not job:
             raise HTTPException(status_code=400, detail="Missing resume or job description")
         
-        letter = await generate_cover_letter(resume, job)
-        return {"letter": letter}
+        if background:
+            return await _submit_job("generate-cover-letter", resume, job, bypass_cache)
+        return await generate_cover_letter(resume, job, bypass_cache)
+    except HTTPException:
+        raise
+    except UPSTREAM_UNAVAILABLE as e:
+        raise _unavailable(e)
     except Exception as e:
-        print(f"Error in generate_cover_letter: {str(e)}")
+        logger.exception("generate_cover_letter failed")
         raise HTTPException(status_code=500, detail=f"Failed to generate cover letter: {str(e)}")
 
-@app.post("/interview-trainer")
-async def interview_trainer(payload: dict = Body(...)):
-    """Generate interview questions and answers based on resume and job description."""
+@api.post("/interview-trainer")
+async def interview_trainer(
+    payload: dict = Body(...), background: bool = False, bypass_cache: bool = Depends(cache_bypass)
+):
+    """Generate interview questions and answers based on resume and job description.
+
+    Accepts ``?background=true`` like ``/generate-cover-letter``.
+    """
     try:
-        print(f"🔧 Interview trainer called with payload keys: {list(payload.keys())}")
-        resume = payload.get("resume", "").strip()
+        resume, _ = _resume_from_payload(payload)
         job = payload.get("job", "").strip()
-        
-        print(f"🔧 Resume length: {len(resume)}, Job length: {len(job)}")
+        logger.debug("interview trainer request", extra={"resume_chars": len(resume), "job_chars": len(job)})
         
         if not resume or not job:
-            print(f"🔧 Missing data - Resume: {bool(resume)}, Job: {bool(job)}")
             raise HTTPException(status_code=400, detail="Missing resume or job description")
         
         # Check if GROQ API key is available
         if not GROQ_API_KEY:
-            print(f"🔧 GROQ API key not found!")
+            logger.error("GROQ_API_KEY is not configured")
             raise HTTPException(status_code=500, detail="GROQ API key not configured")
         
-        prompt = f"""Create 10 interview questions with answers. Generate 5 questions based on the resume and 5 questions based on the job description.
-
-Format each question and answer like this:
-Q1: How do you handle challenges when working with incomplete data sets?
-A1: Based on my experience in data analysis projects, I approach incomplete data by...
-
-Continue this pattern through Q10 and A10.
-
-**Resume-Based Questions (Q1-Q5):** Create insightful behavioral and technical questions that explore the candidate's actual experience. Analyze their projects, skills, and background to ask about:
-- Specific challenges they likely faced in their listed projects or roles
-- How they applied the technologies/skills mentioned in their resume
-- Problem-solving approaches related to their field of expertise
-- Leadership or collaboration experiences based on their background
-- Learning and adaptation in areas they've worked in
-
-**Job Description-Based Questions (Q6-Q10):** Create questions that test fit for this specific role. Based on the job requirements, ask about:
-- How they would approach key responsibilities mentioned in the job description
-- Their experience with specific tools, technologies, or methodologies required
-- How they would handle challenges unique to this role or industry
-- Their strategy for meeting specific objectives outlined in the job posting
-- How they would contribute to team goals and company mission as described
-
-Make each question specific and relevant. Avoid generic questions. The answers should demonstrate how the candidate's background directly prepares them for both the challenges they've faced and the role they're applying for.
-
-Resume:
-{resume}
+        if background:
+            return await _submit_job("interview-trainer", resume, job, bypass_cache)
 
-Job Description:
-{job}"""
-
-        headers = {
-            "Authorization": f"Bearer {GROQ_API_KEY}",
-            "Content-Type": "application/json"
-        }
-
-        payload_ai = {
-            "model": MODEL,
-            "messages": [
-                {"role": "system", "content": "You are an interview coach. Generate interview questions and answers using the Q#:/A#: format. Be clear and direct."},
-                {"role": "user", "content": prompt}
-            ]
-        }
-
-        print(f"🔧 Making API call to GROQ...")
-        response = requests.post(GROQ_BASE_URL, headers=headers, json=payload_ai)
-        print(f"🔧 GROQ API response status: {response.status_code}")
-        
-        if response.status_code != 200:
-            print(f"🔧 GROQ API error: {response.text}")
-            raise HTTPException(status_code=500, detail=f"GROQ API error: {response.status_code}")
-        
-        data = response.json()
-        print(f"🔧 GROQ API response keys: {list(data.keys())}")
-        
-        if "choices" in data and data["choices"]:
-            content = data["choices"][0]["message"]["content"]
-            print(f"🔧 AI response length: {len(content)}")
-            print(f"🔧 First 500 chars: {content[:500]}...")
-            
-            # Parse using the specific Q#:/A#: format
-            pairs = []
-            import re
-            
-            # Find all Q#: and A#: patterns
-            qa_pattern = r'Q(\d+):\s*([^A]*?)A\1:\s*([^Q]*?)(?=Q\d+:|$)'
-            matches = re.findall(qa_pattern, content, re.DOTALL | re.IGNORECASE)
-            
-            print(f"🔧 Found {len(matches)} Q/A matches")
-            
-            for match in matches:
-                question_num, question, answer = match
-                question = question.strip()
-                answer = answer.strip()
-                
-                if question and answer and len(question) > 5 and len(answer) > 10:
-                    pairs.append({
-                        "question": question,
-                        "answer": answer
-                    })
-                    print(f"🔧 Added Q{question_num}: {question[:50]}...")
-            
-            print(f"🔧 Successfully parsed {len(pairs)} question-answer pairs")
-            
-            # If we have at least some pairs, return them
-            if len(pairs) >= 1:
-                return {"pairs": pairs[:10]}  # Return max 10 pairs
-            else:
-                print(f"🔧 No pairs found. Raw content: {content}")
-                # Simple fallback - just extract any text that looks like questions and answers
-                lines = content.split('\n')
-                fallback_pairs = []
-                
-                for i, line in enumerate(lines):
-                    if line.strip().startswith('Q') and ':' in line:
-                        question = line.split(':', 1)[1].strip()
-                        # Look for the corresponding answer
-                        if i + 1 < len(lines) and lines[i + 1].strip().startswith('A') and ':' in lines[i + 1]:
-                            answer = lines[i + 1].split(':', 1)[1].strip()
-                            if question and answer:
-                                fallback_pairs.append({
-                                    "question": question,
-                                    "answer": answer
-                                })
-                
-                if fallback_pairs:
-                    return {"pairs": fallback_pairs[:10]}
-                else:
-                    raise Exception("Could not parse interview questions from AI response")
-        else:
-            print(f"🔧 No choices in API response: {data}")
-            raise Exception("Failed to get AI response for interview questions")
+        try:
+            return await generate_interview(resume, job, bypass_cache)
+        except UPSTREAM_UNAVAILABLE as e:
+            raise _unavailable(e)
+        except LLMError as e:
+            logger.warning("interview trainer LLM call failed", extra={"error": str(e), "status": e.status_code})
+            if e.status_code is not None:
+                raise HTTPException(status_code=500, detail=f"GROQ API error: {e.status_code}")
+            raise
             
     except HTTPException:
         # Re-raise HTTP exceptions as-is
         raise
     except Exception as e:
-        print(f"🔧 Error in interview_trainer: {str(e)}")
+        logger.exception("interview_trainer failed")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/generate-links")
-async def generate_links(payload: dict = Body(...)):
-    """Generate job search links based on resume."""
-    try:
-        resume = payload.get("resume", "").strip()
-        
-        if not resume:
-            raise HTTPException(status_code=400, detail="Resume content is required")
-        
-        # Extract skills and job titles for better job matching
-        prompt = f"""You are an expert job search assistant.
+def _stream_inputs(payload: dict):
+    """Validate a streaming request before the response starts."""
+    resume, _ = _resume_from_payload(payload)
+    job = payload.get("job", "").strip()
+    if not resume or not job:
+        raise HTTPException(status_code=400, detail="Missing resume or job description")
+    if not GROQ_API_KEY:
+        raise HTTPException(status_code=500, detail="GROQ API key not configured")
+    return resume, job
+
+def _sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@api.post("/generate-cover-letter/stream")
+async def generate_cover_letter_stream(payload: dict = Body(...), bypass_cache: bool = Depends(cache_bypass)):
+    """Stream a cover letter as Server-Sent Events.
+
+    Emits ``token`` events with each ``delta``, then one ``done`` event with
+    the cleaned ``letter`` (or an ``error`` event with ``detail``).
+    """
+    resume, job = _stream_inputs(payload)
+    messages, usage = _cover_letter_messages(resume, job)
+
+    async def events():
+        parts = []
+        try:
+            async for delta in stream_completion("generate-cover-letter", messages, bypass_cache):
+                parts.append(delta)
+                yield _sse("token", {"delta": delta})
+            result = {"letter": _clean_cover_letter("".join(parts)), "token_usage": usage}
+            await _remember("cover-letter", resume, job, result)
+            yield _sse("done", result)
+        except Exception as e:
+            logger.exception("generate_cover_letter_stream failed")
+            yield _sse("error", {"detail": f"Failed to generate cover letter: {str(e)}"})
+
+    return _sse_response(events())
+
+@api.post("/interview-trainer/stream")
+async def interview_trainer_stream(payload: dict = Body(...), bypass_cache: bool = Depends(cache_bypass)):
+    """Stream interview Q&A pairs as Server-Sent Events.
+
+    Each ``pair`` event is sent as soon as a Q#/A# block is complete, i.e.
+    once the next ``Q#:`` marker has arrived; the final pair is sent when
+    the stream ends, followed by a ``done`` event with all ``pairs`` (or an
+    ``error`` event with ``detail``).
+    """
+    resume, job = _stream_inputs(payload)
+    messages, usage = _interview_messages(resume, job)
+
+    async def events():
+        parser = QAStreamParser()
+        sent = 0
+        try:
+            async for delta in stream_completion("interview-trainer", messages, bypass_cache):
+                for pair in parser.feed(delta):
+                    yield _sse("pair", {"index": sent, **pair})
+                    sent += 1
+            for pair in parser.close():
+                yield _sse("pair", {"index": sent, **pair})
+                sent += 1
+
+            pairs = parser.pairs
+            if not pairs:
+                raise Exception("Could not parse interview questions from AI response")
+            result = {"pairs": pairs, "token_usage": usage}
+            await _remember("interview", resume, job, result)
+            yield _sse("done", result)
+        except Exception as e:
+            logger.exception("interview_trainer_stream failed")
+            yield _sse("error", {"detail": str(e)})
+
+    return _sse_response(events())
+
+@timed("prompt")
+def _job_links_messages(resume_text: str) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+    """Build the chat messages for job search link generation, plus their token usage."""
+    resume, = prompt_budget.fit(resume_text, sections=JOB_LINKS_SECTIONS)
+    # Extract skills and job titles for better job matching
+    prompt = f"""You are an expert job search assistant.
 
 Your task is to:
 1. Extract from the resume:
@@ -469,99 +967,148 @@ Your task is to:
 }}
 
 Resume:
-{resume}"""
+{resume.text}"""
 
-        headers = {
-            "Authorization": f"Bearer {GROQ_API_KEY}",
-            "Content-Type": "application/json"
-        }
+    messages = [
+        {"role": "system", "content": "You are an expert job search assistant. Return only valid JSON format with search links."},
+        {"role": "user", "content": prompt}
+    ]
+    return messages, token_usage(messages, [resume])
+
+@api.post("/generate-links")
+async def generate_links(payload: dict = Body(...), bypass_cache: bool = Depends(cache_bypass)):
+    """Generate job search links based on resume.
+
+    The job title and location are extracted locally by default. Send
+    ``"refine": true`` to have the LLM pick them instead; the local result
+    is used if that call fails or returns unusable JSON.
+    """
+    try:
+        resume, document = _resume_from_payload(payload)
+        
+        if not resume:
+            raise HTTPException(status_code=400, detail="Resume content is required")
+        
+        index = document.index if document is not None else parse_resume(resume)
+        local = generate_job_links(index.normalized, index.sections)
+        local["source"] = "local"
 
-        payload_ai = {
-            "model": MODEL,
-            "messages": [
-                {"role": "system", "content": "You are an expert job search assistant. Return only valid JSON format with search links."},
-                {"role": "user", "content": prompt}
-            ]
-        }
+        if not payload.get("refine"):
+            return local
 
+        messages, usage = _job_links_messages(resume)
         try:
-            print(f"🔧 Making API call for job search...")
-            response = requests.post(GROQ_BASE_URL, headers=headers, json=payload_ai)
-            data = response.json()
-            
-            if "choices" in data and data["choices"]:
-                ai_response = data["choices"][0]["message"]["content"].strip()
-                print(f"🔧 AI job search response: {ai_response[:200]}...")
-                
-                # Try to parse the AI response as JSON
-                try:
-                    import json
-                    ai_json = json.loads(ai_response)
-                    if "search_links" in ai_json:
-                        return ai_json
-                except Exception as parse_error:
-                    print(f"🔧 Failed to parse AI JSON: {parse_error}")
-                    
-                # If JSON parsing fails, extract job title manually and create links
-                import urllib.parse
-                
-                # Extract job title using simple NLP (first relevant noun phrase)
-
-                # Try to find job titles using common patterns
-                job_title_matches = re.findall(r'(?:Position|Title|Role|Applying for|Objective)[:\- ]+([A-Za-z ]+)', resume, re.IGNORECASE)
-                if job_title_matches:
-                    job_title = job_title_matches[0].strip()
-                else:
-                    # Fallback: find first capitalized phrase that looks like a job title
-                    possible_titles = re.findall(r'\b([A-Z][a-z]+(?: [A-Z][a-z]+){0,2})\b', resume)
-                    job_title = possible_titles[0] if possible_titles else "software engineer"
-
-                # Extract location if present
-                location_matches = re.findall(r'(?:Location|Based in|Lives in|City|Address)[:\- ]+([A-Za-z, ]+)', resume, re.IGNORECASE)
-                location = location_matches[0].strip() if location_matches else "remote"
-                # URL encode for safety
-                job_title_encoded = urllib.parse.quote_plus(job_title)
-                location_encoded = urllib.parse.quote_plus(location)
-                job_title_hyphenated = job_title.replace(' ', '-').lower()
-                
-                # Create search links with extracted job title
-                search_links = [
-                    {"platform": "LinkedIn", "url": f"https://www.linkedin.com/jobs/search/?keywords={job_title_encoded}&location={location_encoded}"},
-                    {"platform": "Indeed", "url": f"https://www.indeed.com/jobs?q={job_title_encoded}&l={location_encoded}"},
-                    {"platform": "Google Jobs", "url": f"https://www.google.com/search?q={job_title_encoded}+jobs+{location_encoded}"},
-                    {"platform": "Glassdoor", "url": f"https://www.glassdoor.com/Job/jobs.htm?sc.keyword={job_title_encoded}"},
-                    {"platform": "WeWorkRemotely", "url": f"https://weworkremotely.com/remote-jobs/search?term={job_title_encoded}"},
-                    {"platform": "RemoteOK", "url": f"https://remoteok.io/?search={job_title_encoded}"},
-                    {"platform": "Wellfound", "url": f"https://wellfound.com/role/{job_title_hyphenated}"},
-                    {"platform": "Upwork", "url": f"https://www.upwork.com/freelance-jobs/search/?q={job_title_encoded}"}
-                ]
-                
-                return {
-                    "job_title": job_title,
-                    "location": location,
-                    "skills": ["extracted from resume"],
-                    "search_links": search_links
-                }
-            
+            ai_response, model = await routed_completion("generate-links", messages, parse_links_json, bypass_cache)
+            with time_stage("parse"):
+                ai_json = parse_links_json(ai_response)
+            ai_json["source"] = "llm"
+            ai_json["model"] = model
+            ai_json["token_usage"] = usage
+            return ai_json
+        except OutputValidationError as e:
+            logger.warning("job link refinement returned unusable output, using local links",
+                           extra={"reason": e.reason, "error": str(e)})
         except Exception as e:
-            print(f"🔧 Error in job search API call: {str(e)}")
-            # Fallback if AI call fails
-            search_links = [
-                {"platform": "LinkedIn", "url": "https://www.linkedin.com/jobs/search/?keywords=software%20engineer"},
-                {"platform": "Indeed", "url": "https://www.indeed.com/jobs?q=software+engineer"},
-                {"platform": "Google Jobs", "url": "https://www.google.com/search?q=software+engineer+jobs"},
-                {"platform": "Glassdoor", "url": "https://www.glassdoor.com/Job/jobs.htm?sc.keyword=software%20engineer"}
-            ]
-            return {
-                "job_title": "software engineer",
-                "location": "remote",
-                "skills": ["programming", "software development"], 
-                "search_links": search_links
-            }
+            logger.warning("job link refinement failed, using local links", extra={"error": str(e)})
+        return local
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _match_documents(payload: dict, plural: str, singular: str, ids: Optional[str] = None) -> List[str]:
+    """Texts for one side of a /match request from a list, a single text or stored resume ids."""
+    texts = [text for text in payload.get(plural) or [] if isinstance(text, str)]
+    if isinstance(payload.get(singular), str):
+        texts.append(payload[singular])
+    for resume_id in (payload.get(ids) or []) if ids else []:
+        document = resume_store.get(resume_id)
+        if document is None:
+            raise HTTPException(status_code=404, detail=f"Unknown or expired resume_id: {resume_id}")
+        texts.append(document.text)
+    texts = [text.strip() for text in texts if text.strip()]
+    if not texts:
+        raise HTTPException(status_code=400, detail=f"At least one entry in '{plural}' is required")
+    if len(texts) > MATCH_MAX_DOCUMENTS:
+        raise HTTPException(status_code=413, detail=f"At most {MATCH_MAX_DOCUMENTS} {plural} per request")
+    return texts
+
+def _int_field(payload: dict, name: str, default: int, maximum: int) -> int:
+    """An integer option of a JSON body, 0..``maximum``; anything else is a 400."""
+    value = payload.get(name, default)
+    if isinstance(value, bool) or not isinstance(value, int) or not 0 <= value <= maximum:
+        raise HTTPException(status_code=400, detail=f"'{name}' must be an integer from 0 to {maximum}")
+    return value
+
+@api.post("/match")
+async def match_resumes(payload: dict = Body(...)):
+    """Rank resumes against job descriptions locally, without calling the LLM.
+
+    Resumes come from ``resumes`` (texts), ``resume``, and/or ``resume_ids``;
+    job descriptions from ``jobs`` or ``job_description``. Every pair is
+    scored in batched sparse matrix products and the pairs are returned best
+    first (``top_k``, default 100), with the job's top keywords split into
+    matched and missing. The full score matrix is always included.
+    """
+    resumes = _match_documents(payload, "resumes", "resume", "resume_ids")
+    jobs = _match_documents(payload, "jobs", "job_description")
+    method = payload.get("method", "tfidf")
+    if method not in ("tfidf", "bm25"):
+        raise HTTPException(status_code=400, detail="method must be 'tfidf' or 'bm25'")
+    top_k = _int_field(payload, "top_k", 100, MATCH_MAX_DOCUMENTS ** 2)
+    keywords = _int_field(payload, "keywords", 15, MATCH_MAX_KEYWORDS)
+
+    with time_stage("match"):
+        # NumPy releases the GIL for the heavy parts, so large requests don't stall the loop
+        result = await asyncio.to_thread(match, resumes, jobs, method, keywords)
+    return {
+        "method": result.method,
+        "resumes": len(resumes),
+        "jobs": len(jobs),
+        "scores": [[round(float(score), 4) for score in row] for row in result.scores],
+        "matches": result.ranked(top_k),
+    }
+
+def create_app() -> FastAPI:
+    """Build the ASGI app: middleware, the routes above and the startup/shutdown lifespan.
+
+    The services the routes use are module-level, so this supports one app
+    per process; it may be started and stopped more than once.
+    """
+    application = FastAPI(title="AI Job & Resume Coach API", version="1.0.0", lifespan=lifespan)
+
+    # Reject oversized uploads from Content-Length before the multipart body is read;
+    # added first so it runs inside CORS and its 413s carry the CORS headers
+    application.add_middleware(UploadLimitMiddleware, limits={
+        "/upload-resume": UPLOAD_MAX_BYTES,
+        "/extract-resume": UPLOAD_MAX_BYTES,
+        "/batch/upload-resume": BATCH_MAX_REQUEST_BYTES,
+    })
+
+    # Configure CORS
+    application.add_middleware(
+        CORSMiddleware,
+        allow_origins=[
+            "http://localhost:5173", 
+            "https://ai-job-resume-coach.vercel.app",
+            "https://*.vercel.app"  # Allow all Vercel preview deployments
+        ],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Per-endpoint latency histograms, exposed with the other metrics at /metrics
+    application.add_middleware(MetricsMiddleware)
+
+    application.include_router(api)
+    return application
+
+# Module-level app for uvicorn (Procfile: main:app)
+app = create_app()
+startup.mark("setup")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
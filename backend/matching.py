@@ -0,0 +1,271 @@
+import os
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+# NumPy is imported on first use so it isn't paid for at app startup
+if TYPE_CHECKING:
+    import numpy as np
+
+MATCH_MAX_DOCUMENTS = int(os.getenv("MATCH_MAX_DOCUMENTS", "500"))
+
+# Most keywords a /match request may ask for per job
+MATCH_MAX_KEYWORDS = 100
+
+# Words, keeping tech spellings such as c++, c#, node.js and ci/cd together
+_TERM = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[./-][a-z0-9+#]+)*")
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each etc few for from further had has have
+having he her here hers herself him himself his how i if in into is it its itself just me more most my
+myself no nor not now of off on once only or other our ours ourselves out over own same she should so
+some such than that the their theirs them themselves then there these they this those through to too
+under until up very was we were what when where which while who whom why will with would you your
+yours yourself yourselves
+able ability across candidate candidates company etc including looking new per plus preferred required
+requirements responsibilities role strong team use using well within work working year years
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase terms with stopwords, single characters and pure numbers removed."""
+    return [
+        term for term in _TERM.findall(text.lower())
+        if term not in STOPWORDS and len(term) > 1 and not term.isdigit()
+    ]
+
+
+# Dense scratch space for one block of shared terms in a score product
+_BLOCK_BYTES = 16 * 1024 * 1024
+
+
+class _Corpus:
+    """Sparse term counts for a set of documents over a shared vocabulary.
+
+    Only the nonzero counts are kept, as parallel ``rows``/``cols``/``counts``
+    arrays; most terms appear in few documents, so a dense documents x
+    vocabulary matrix would be almost all zeros.
+    """
+
+    def __init__(self, documents: Sequence[str]):
+        import numpy as np
+
+        self.vocabulary: Dict[str, int] = {}
+        rows, cols, counts = [], [], []
+        for row, text in enumerate(documents):
+            doc_counts: Dict[int, int] = {}
+            for term in tokenize(text):
+                index = self.vocabulary.setdefault(term, len(self.vocabulary))
+                doc_counts[index] = doc_counts.get(index, 0) + 1
+            rows.extend([row] * len(doc_counts))
+            cols.extend(doc_counts)
+            counts.extend(doc_counts.values())
+        self.documents = len(documents)
+        self.rows = np.array(rows, dtype=np.int64)
+        self.cols = np.array(cols, dtype=np.int64)
+        self.counts = np.array(counts, dtype=np.float32)
+        self.terms = np.array(sorted(self.vocabulary, key=self.vocabulary.get) or [""], dtype=object)
+
+    def idf(self) -> "np.ndarray":
+        """Smoothed inverse document frequency, ``ln((1 + n) / (1 + df)) + 1``."""
+        import numpy as np
+
+        df = np.bincount(self.cols, minlength=max(1, len(self.vocabulary)))
+        return (np.log((1 + self.documents) / (1 + df)) + 1).astype(np.float32)
+
+    def split(self, row: int) -> Tuple["_Entries", "_Entries"]:
+        """The nonzeros of the rows before ``row`` and of those from it on, renumbered from 0."""
+        before = self.rows < row
+        after = ~before
+        return (
+            _Entries(self.rows[before], self.cols[before], self.counts[before]),
+            _Entries(self.rows[after] - row, self.cols[after], self.counts[after]),
+        )
+
+
+@dataclass
+class _Entries:
+    """Nonzeros of a sparse matrix as (row, column, value) triplets."""
+
+    rows: "np.ndarray"
+    cols: "np.ndarray"
+    values: "np.ndarray"
+
+    def with_values(self, values: "np.ndarray") -> "_Entries":
+        return _Entries(self.rows, self.cols, values.astype("float32"))
+
+    def row_sums(self, values: "np.ndarray", n: int) -> "np.ndarray":
+        import numpy as np
+
+        return np.bincount(self.rows, values, minlength=n).astype(np.float32)
+
+    def l2_normalized(self, n: int) -> "_Entries":
+        import numpy as np
+
+        norms = np.sqrt(self.row_sums(self.values * self.values, n))
+        return self.with_values(self.values / np.where(norms == 0, 1, norms)[self.rows])
+
+
+def _product(left: _Entries, n_left: int, right: _Entries, n_right: int) -> "np.ndarray":
+    """``left @ right.T`` as a dense n_left x n_right array.
+
+    Only columns both sides use contribute, and those are densified a block
+    at a time, so memory is bounded by ``_BLOCK_BYTES`` rather than by the
+    vocabulary size.
+    """
+    import numpy as np
+
+    scores = np.zeros((n_left, n_right), dtype=np.float32)
+    shared = np.intersect1d(left.cols, right.cols)
+    if not len(shared) or not n_left or not n_right:
+        return scores
+
+    def by_shared(entries: _Entries) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        # Each nonzero's position in ``shared``; nonzeros in unshared columns are dropped
+        index = np.searchsorted(shared, entries.cols)
+        keep = shared[np.minimum(index, len(shared) - 1)] == entries.cols
+        order = np.argsort(index[keep], kind="stable")
+        return entries.rows[keep][order], index[keep][order], entries.values[keep][order]
+
+    left_rows, left_cols, left_values = by_shared(left)
+    right_rows, right_cols, right_values = by_shared(right)
+    block = max(1, _BLOCK_BYTES // (4 * (n_left + n_right)))
+    for lo in range(0, len(shared), block):
+        hi = min(lo + block, len(shared))
+        width = hi - lo
+        a = np.zeros((n_left, width), dtype=np.float32)
+        i, j = np.searchsorted(left_cols, (lo, hi))
+        a[left_rows[i:j], left_cols[i:j] - lo] = left_values[i:j]
+        b = np.zeros((n_right, width), dtype=np.float32)
+        i, j = np.searchsorted(right_cols, (lo, hi))
+        b[right_rows[i:j], right_cols[i:j] - lo] = right_values[i:j]
+        scores += a @ b.T
+    return scores
+
+
+def _top_terms(entries: _Entries, n: int, keywords: int) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Each row's ``keywords`` highest-valued columns (ties by column) and which of them are real.
+
+    Rows with fewer nonzeros are padded with column 0, marked invalid.
+    """
+    import numpy as np
+
+    terms = np.zeros((n, keywords), dtype=np.int64)
+    valid = np.zeros((n, keywords), dtype=bool)
+    if not keywords or not len(entries.rows):
+        return terms, valid
+    order = np.lexsort((entries.cols, -entries.values, entries.rows))
+    rows = entries.rows[order]
+    starts = np.searchsorted(rows, np.arange(n))
+    rank = np.arange(len(rows)) - starts[rows]
+    keep = (rank < keywords) & (entries.values[order] > 0)
+    terms[rows[keep], rank[keep]] = entries.cols[order][keep]
+    valid[rows[keep], rank[keep]] = True
+    return terms, valid
+
+
+def _contains(entries: _Entries, n: int, vocabulary: int, terms: "np.ndarray") -> "np.ndarray":
+    """rows x terms.shape: whether each row has a nonzero in each of ``terms``' columns."""
+    import numpy as np
+
+    if not len(entries.rows):
+        return np.zeros((n, *terms.shape), dtype=bool)
+    keys = np.sort(entries.rows * vocabulary + entries.cols)
+    wanted = np.arange(n).reshape(-1, *([1] * terms.ndim)) * vocabulary + terms
+    found = np.searchsorted(keys, wanted)
+    return keys[np.minimum(found, len(keys) - 1)] == wanted
+
+
+@dataclass
+class MatchResult:
+    method: str
+    scores: "np.ndarray"  # resumes x jobs
+    terms: "np.ndarray"  # vocabulary, by column
+    keyword_terms: "np.ndarray"  # jobs x keywords, column indexes
+    keyword_present: "np.ndarray"  # resumes x jobs x keywords
+    keyword_valid: "np.ndarray"  # jobs x keywords, False for padding past the job's terms
+
+    def keywords(self, resume: int, job: int) -> Tuple[List[str], List[str]]:
+        """The job's top keywords that the resume does and doesn't contain."""
+        terms = self.keyword_terms[job]
+        present = self.keyword_present[resume, job]
+        valid = self.keyword_valid[job]
+        return list(self.terms[terms[present & valid]]), list(self.terms[terms[~present & valid]])
+
+    def ranked(self, top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """(resume, job) pairs, best first; keywords are only built for the pairs returned."""
+        import numpy as np
+
+        order = np.argsort(-self.scores, axis=None, kind="stable")
+        if top_k is not None:
+            order = order[:top_k]
+        pairs = []
+        for resume, job in zip(*np.unravel_index(order, self.scores.shape)):
+            matched, missing = self.keywords(resume, job)
+            pairs.append({
+                "resume": int(resume),
+                "job": int(job),
+                "score": round(float(self.scores[resume, job]), 4),
+                "matched_keywords": matched,
+                "missing_keywords": missing,
+            })
+        return pairs
+
+
+def match(
+    resumes: Sequence[str],
+    jobs: Sequence[str],
+    method: str = "tfidf",
+    keywords: int = 15,
+    k1: float = 1.5,
+    b: float = 0.75,
+) -> MatchResult:
+    """Score every resume against every job description in one sparse matrix product.
+
+    Both sides share one vocabulary and IDF computed over all the documents
+    given. ``tfidf`` scores are cosine similarities of sublinear TF-IDF
+    vectors (0..1). ``bm25`` treats each job description as a query over
+    the resumes, scaled so that an average-length resume mentioning every
+    query term once scores 1 (clipped to 0..1). Keywords are each job's
+    ``keywords`` highest-weighted terms, split by whether the resume
+    contains them.
+    """
+    if method not in ("tfidf", "bm25"):
+        raise ValueError("method must be 'tfidf' or 'bm25'")
+    import numpy as np
+
+    corpus = _Corpus(list(resumes) + list(jobs))
+    n_resumes, n_jobs = len(resumes), len(jobs)
+    resume_counts, job_counts = corpus.split(n_resumes)
+    idf = corpus.idf()
+
+    # Job term weights double as the keyword ranking for both methods
+    job_weights = job_counts.with_values((1 + np.log(job_counts.values)) * idf[job_counts.cols]).l2_normalized(n_jobs)
+
+    if method == "tfidf":
+        resume_weights = resume_counts.with_values(
+            (1 + np.log(resume_counts.values)) * idf[resume_counts.cols]
+        ).l2_normalized(n_resumes)
+        scores = _product(resume_weights, n_resumes, job_weights, n_jobs)
+    else:
+        lengths = resume_counts.row_sums(resume_counts.values, n_resumes)
+        avg_length = max(float(lengths.mean()), 1.0) if n_resumes else 1.0
+        tf = resume_counts.values
+        saturation = tf * (k1 + 1) / (tf + k1 * (1 - b + b * lengths[resume_counts.rows] / avg_length))
+        query = job_counts.with_values(np.ones_like(job_counts.values))
+        scores = _product(resume_counts.with_values(saturation * idf[resume_counts.cols]), n_resumes, query, n_jobs)
+        # Scale so a resume of average length mentioning every query term once
+        # scores 1; more mentions can push past that, so clip
+        best = job_counts.row_sums(idf[job_counts.cols], n_jobs)
+        scores = np.clip(scores / np.where(best == 0, 1, best), 0.0, 1.0)
+
+    top_terms, valid = _top_terms(job_weights, n_jobs, keywords)
+    return MatchResult(
+        method,
+        scores.astype(np.float64),
+        corpus.terms,
+        top_terms,
+        _contains(resume_counts, n_resumes, max(1, len(corpus.vocabulary)), top_terms),
+        valid,
+    )
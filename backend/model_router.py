@@ -0,0 +1,104 @@
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+from metrics import registry
+
+SMALL_MODEL = os.getenv("LLM_SMALL_MODEL", "llama3-8b-8192")
+LARGE_MODEL = os.getenv("LLM_LARGE_MODEL", "llama3-70b-8192")
+
+# Endpoint -> models to try in order. Output that fails the endpoint's
+# validation is retried on the next tier.
+DEFAULT_ROUTES = {
+    "generate-links": [SMALL_MODEL, LARGE_MODEL],
+    "upload-resume": [LARGE_MODEL],
+    "generate-cover-letter": [LARGE_MODEL],
+    "interview-trainer": [LARGE_MODEL],
+}
+
+# USD per million (input, output) tokens
+DEFAULT_PRICES = {
+    "llama3-8b-8192": (0.05, 0.08),
+    "llama-3.1-8b-instant": (0.05, 0.08),
+    "llama3-70b-8192": (0.59, 0.79),
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+}
+
+MODEL_LATENCY = registry.histogram(
+    "llm_model_duration_seconds", "Upstream completion latency per model.", ["model"],
+)
+MODEL_COST = registry.counter(
+    "llm_cost_usd_total", "Estimated spend per model from reported token usage.", ["model"],
+)
+MODEL_CALLS = registry.counter("llm_model_calls_total", "Completions per endpoint and model.", ["endpoint", "model"])
+ESCALATIONS = registry.counter(
+    "llm_escalations_total", "Outputs that failed validation and were retried on a larger model.",
+    ["endpoint", "model"],
+)
+
+
+def _json_env(name: str) -> Dict[str, Any]:
+    value = os.getenv(name)
+    return json.loads(value) if value else {}
+
+
+class ModelRouter:
+    """Per-endpoint model tiers with escalation, plus per-model latency and cost accounting.
+
+    Routes and prices can be overridden with the MODEL_ROUTES and
+    MODEL_PRICES environment variables (JSON), e.g.
+    ``MODEL_ROUTES='{"interview-trainer": ["llama3-8b-8192", "llama3-70b-8192"]}'``.
+    """
+
+    def __init__(self, routes: Optional[Dict[str, List[str]]] = None, prices: Optional[Dict[str, Any]] = None,
+                 default_model: str = LARGE_MODEL):
+        self.routes = {**DEFAULT_ROUTES, **(routes or {})}
+        self.prices = {**DEFAULT_PRICES, **{model: tuple(price) for model, price in (prices or {}).items()}}
+        self.default_model = default_model
+        self.calls: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        return cls(routes=_json_env("MODEL_ROUTES"), prices=_json_env("MODEL_PRICES"))
+
+    def models(self, endpoint: str) -> List[str]:
+        """Models to try for ``endpoint``, cheapest first."""
+        return self.routes.get(endpoint) or [self.default_model]
+
+    def stream_model(self, endpoint: str) -> str:
+        """Model for a streamed response, which can't be escalated once output is sent."""
+        return self.models(endpoint)[-1]
+
+    def escalated(self, endpoint: str, model: str) -> None:
+        ESCALATIONS.inc(endpoint=endpoint, model=model)
+
+    def observe(self, endpoint: str, model: str, seconds: float, usage: Optional[Dict[str, Any]] = None) -> None:
+        """Record one completion's latency and, if usage was reported, its cost."""
+        MODEL_CALLS.inc(endpoint=endpoint, model=model)
+        MODEL_LATENCY.observe(seconds, model=model)
+        stats = self.calls.setdefault(model, {"calls": 0, "seconds": 0.0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0})
+        stats["calls"] += 1
+        stats["seconds"] += seconds
+        if usage:
+            prompt = usage.get("prompt_tokens", 0)
+            completion = usage.get("completion_tokens", 0)
+            input_price, output_price = self.prices.get(model, (0.0, 0.0))
+            cost = (prompt * input_price + completion * output_price) / 1_000_000
+            stats["prompt_tokens"] += prompt
+            stats["completion_tokens"] += completion
+            stats["cost_usd"] += cost
+            MODEL_COST.inc(cost, model=model)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "routes": self.routes,
+            "models": {
+                model: {
+                    **stats,
+                    "seconds": round(stats["seconds"], 3),
+                    "avg_seconds": round(stats["seconds"] / stats["calls"], 3) if stats["calls"] else 0.0,
+                    "cost_usd": round(stats["cost_usd"], 6),
+                }
+                for model, stats in self.calls.items()
+            },
+        }
@@ -0,0 +1,279 @@
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from metrics import current_endpoint, registry
+
+MAX_INTERVIEW_PAIRS = 10
+
+INVALID_OUTPUTS = registry.counter(
+    "llm_output_invalid_total", "Completions whose output failed parsing or validation.", ["endpoint", "reason"],
+)
+
+
+class OutputValidationError(ValueError):
+    """A completion that can't be parsed into the expected shape.
+
+    ``reason`` is a short machine-readable code (``too_few_pairs``,
+    ``no_json``, ...) for logs and metrics; callers typically retry on a
+    larger model or fall back to a local result.
+    """
+
+    def __init__(self, message: str, reason: str):
+        super().__init__(message)
+        self.reason = reason
+        INVALID_OUTPUTS.inc(endpoint=current_endpoint.get(), reason=reason)
+
+
+# Interview Q&A
+
+# "Q3:", "A3:", "**Q3:**", "q3 :". A leading character class lets the regex
+# engine skip ahead to candidate letters; the word boundary before the
+# letter is checked in Python, and markdown emphasis is stripped from the
+# texts afterwards.
+_QA_MARKER = re.compile(r"[QqAa](\d{1,3})[ \t]*:")
+_STRIP = " \t\r\n*"
+
+
+def _qa_pair(question: str, answer: str) -> Optional[Dict[str, str]]:
+    """A pair, or None if either side is too short to be useful."""
+    question = question.strip(_STRIP)
+    answer = answer.strip(_STRIP)
+    if len(question) > 5 and len(answer) > 10:
+        return {"question": question, "answer": answer}
+    return None
+
+
+# How far back from the end of the text an incomplete marker may start
+_MARKER_LOOKBACK = 16
+
+
+class _QATokenizer:
+    """Splits Q#/A# output into (question, answer) texts in one pass over its markers.
+
+    Markers are located with ``finditer`` and walked in order: a ``Q<n>:``
+    opens a question, the next ``A<n>:`` with the same number ends it and
+    opens the answer, and the following ``Q`` marker (of any number) closes
+    the block. Stray or mismatched ``A`` markers are treated as text. The
+    state is kept between calls, so text can be appended and ``scan``
+    resumes where it stopped instead of rescanning; after each scan the
+    text before the open block is dropped, so ``content`` only holds the
+    block still being read.
+    """
+
+    def __init__(self, content: str = ""):
+        self.content = content
+        self._pending: List[str] = []
+        self._position = 0
+        self._number: Optional[str] = None  # of the open question
+        self._q_end = self._a_start = self._a_end = -1
+
+    def append(self, text: str) -> None:
+        """Queue ``text``; it is joined onto ``content`` once, by the next ``scan``."""
+        self._pending.append(text)
+
+    def scan(self) -> List[Tuple[str, str]]:
+        """Blocks closed since the last call."""
+        if self._pending:
+            self.content += "".join(self._pending)
+            self._pending.clear()
+        content = self.content
+        blocks = []
+        for marker in _QA_MARKER.finditer(content, self._position):
+            position = marker.start()
+            self._position = marker.end()
+            if position and content[position - 1].isalnum():
+                continue
+            if content[position] in "Qq":
+                if self._a_end >= 0:
+                    blocks.append((content[self._q_end:self._a_start], content[self._a_end:position]))
+                self._number, self._q_end, self._a_end = marker.group(1), marker.end(), -1
+            elif self._number is not None and self._a_end < 0 and marker.group(1) == self._number:
+                self._a_start, self._a_end = position, marker.end()
+        # Text before this can't hold the start of a marker that is still arriving
+        self._position = max(self._position, len(content) - _MARKER_LOOKBACK)
+        self._discard()
+        return blocks
+
+    def _discard(self) -> None:
+        """Drop text no block can still need, keeping one character for the word-boundary check."""
+        keep = self._position if self._number is None else min(self._position, self._q_end)
+        cut = max(0, keep - 1)
+        if cut:
+            self.content = self.content[cut:]
+            self._position -= cut
+            self._q_end, self._a_start, self._a_end = (
+                index - cut if index >= 0 else index for index in (self._q_end, self._a_start, self._a_end)
+            )
+
+    def trailing(self) -> Optional[Tuple[str, str]]:
+        """The last block, if its answer has started; it runs to the end of the text."""
+        if self._a_end < 0:
+            return None
+        return self.content[self._q_end:self._a_start], self.content[self._a_end:]
+
+
+def _line_pairs(content: str) -> List[Dict[str, str]]:
+    """Fallback for unnumbered output: a line starting with Q followed by one starting with A."""
+    lines = [line.strip() for line in content.split("\n")]
+    pairs = []
+    for line, following in zip(lines, lines[1:]):
+        if line[:1] in "Qq" and ":" in line and following[:1] in "Aa" and ":" in following:
+            question = line.split(":", 1)[1].strip(_STRIP)
+            answer = following.split(":", 1)[1].strip(_STRIP)
+            if question and answer:
+                pairs.append({"question": question, "answer": answer})
+    return pairs
+
+
+def parse_interview_pairs(content: str, limit: int = MAX_INTERVIEW_PAIRS) -> List[Dict[str, str]]:
+    """Q#:/A# pairs from a completion, falling back to a line-based scan."""
+    tokenizer = _QATokenizer(content)
+    blocks = tokenizer.scan()
+    trailing = tokenizer.trailing()
+    if trailing:
+        blocks.append(trailing)
+    pairs = [pair for pair in (_qa_pair(q, a) for q, a in blocks) if pair]
+    return (pairs or _line_pairs(content))[:limit]
+
+
+def require_interview_pairs(content: str, minimum: int) -> List[Dict[str, str]]:
+    """``parse_interview_pairs``, raising OutputValidationError below ``minimum`` pairs."""
+    pairs = parse_interview_pairs(content)
+    if len(pairs) < minimum:
+        raise OutputValidationError(f"Expected at least {minimum} Q/A pairs, got {len(pairs)}", "too_few_pairs")
+    return pairs
+
+
+class QAStreamParser:
+    """Incremental Q&A parsing for streamed completions.
+
+    ``feed`` returns the pairs completed by a delta - a pair is complete
+    once the next ``Q<n>:`` marker has arrived - and ``close`` returns the
+    last one. Deltas are buffered as a list and each part of the text is
+    scanned once, so the total work is linear in the output length.
+    """
+
+    def __init__(self, limit: int = MAX_INTERVIEW_PAIRS):
+        self.limit = limit
+        self.pairs: List[Dict[str, str]] = []
+        self._parts: List[str] = []
+        self._tokenizer = _QATokenizer()
+
+    @property
+    def buffer(self) -> str:
+        """All text fed so far."""
+        return "".join(self._parts)
+
+    def _emit(self, blocks: List[Tuple[str, str]]) -> List[Dict[str, str]]:
+        new = []
+        for question, answer in blocks:
+            pair = _qa_pair(question, answer)
+            if pair and len(self.pairs) < self.limit:
+                self.pairs.append(pair)
+                new.append(pair)
+        return new
+
+    def feed(self, delta: str) -> List[Dict[str, str]]:
+        self._parts.append(delta)
+        self._tokenizer.append(delta)
+        # A block can only close when a new marker (ending in ":") arrives
+        if ":" not in delta:
+            return []
+        return self._emit(self._tokenizer.scan())
+
+    def close(self) -> List[Dict[str, str]]:
+        blocks = self._tokenizer.scan()
+        trailing = self._tokenizer.trailing()
+        new = self._emit(blocks + ([trailing] if trailing else []))
+        if not self.pairs:
+            new = _line_pairs(self.buffer)[:self.limit]
+            self.pairs.extend(new)
+        return new
+
+
+# JSON
+
+_FENCE = re.compile(r"```[a-zA-Z]*\s*\n?(.*?)```", re.DOTALL)
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+_MAX_CANDIDATES = 16
+
+
+_JSON_SPECIAL = re.compile(r'["\\{}\[\]]')
+
+
+def _balanced_end(text: str, start: int) -> Optional[int]:
+    """Index just past the bracket that closes ``text[start]``, skipping strings."""
+    depth = 0
+    in_string = False
+    escaped_at = -1
+    for match in _JSON_SPECIAL.finditer(text, start):
+        i = match.start()
+        c = text[i]
+        if in_string:
+            if c == "\\" and escaped_at != i:
+                escaped_at = i + 1
+            elif c == '"' and escaped_at != i:
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c in "{[":
+            depth += 1
+        elif c in "}]":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return None
+
+
+def _loads(candidate: str) -> Any:
+    try:
+        return json.loads(candidate)
+    except ValueError:
+        # Models often leave a trailing comma; only tried once a strict parse fails
+        return json.loads(_TRAILING_COMMA.sub(r"\1", candidate))
+
+
+def extract_json(content: str) -> Any:
+    """The JSON value in a completion, tolerating fences and surrounding prose.
+
+    Tries the whole text, then the contents of any code fence, then each
+    balanced ``{...}``/``[...]`` span in order, allowing trailing commas.
+    Raises OutputValidationError if none parses.
+    """
+    text = content.strip()
+    candidates = [text] + [fenced.strip() for fenced in _FENCE.findall(text)]
+    for candidate in candidates:
+        try:
+            return _loads(candidate)
+        except ValueError:
+            pass
+
+    position = 0
+    for _ in range(_MAX_CANDIDATES):
+        starts = [i for i in (text.find("{", position), text.find("[", position)) if i >= 0]
+        if not starts:
+            break
+        start = min(starts)
+        end = _balanced_end(text, start)
+        if end is not None:
+            try:
+                return _loads(text[start:end])
+            except ValueError:
+                pass
+        position = start + 1
+    raise OutputValidationError("No valid JSON found in model output", "no_json")
+
+
+def parse_links_json(content: str) -> Dict[str, Any]:
+    """The job links object in a completion, validated to have usable ``search_links``."""
+    data = extract_json(content)
+    if not isinstance(data, dict):
+        raise OutputValidationError("Expected a JSON object", "not_object")
+    links = data.get("search_links")
+    if not isinstance(links, list) or not links:
+        raise OutputValidationError("Missing search_links", "missing_search_links")
+    for link in links:
+        if not isinstance(link, dict) or not isinstance(link.get("url"), str) or not link["url"].startswith("http"):
+            raise OutputValidationError(f"Invalid search link: {link!r}"[:200], "invalid_link")
+    return data
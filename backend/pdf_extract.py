@@ -0,0 +1,273 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple, Union
+
+
+class PDFExtractionError(Exception):
+    """Raised when a PDF can't be parsed or its extraction exceeds the time limit."""
+
+
+# A PDF is passed to the workers either as bytes or as the path of a file on
+# disk. Paths are preferred: PyMuPDF reads the file itself, so the document
+# is neither copied into the server process nor pickled to every task.
+Source = Union[bytes, str]
+
+# One text line with its largest font size and whether all of it is bold:
+# the layout hints resume_parser uses to find section headings.
+LayoutLine = Tuple[str, float, bool]
+
+# PyMuPDF span flag for bold text
+_BOLD = 16
+
+# How long past its timeout a document may run before its worker is presumed
+# stuck inside PyMuPDF (where the worker's own deadline check can't reach)
+_STUCK_GRACE = 5.0
+
+
+# Worker-side functions. These run in the pool processes, so they must stay
+# top-level and picklable, and they import PyMuPDF lazily.
+
+def _import_pymupdf() -> None:
+    """Pool initializer: load PyMuPDF when a worker starts rather than in its first task."""
+    import fitz  # noqa: F401
+
+
+def _worker_pid() -> int:
+    return os.getpid()
+
+
+def _open(source: Source):
+    import fitz
+
+    if isinstance(source, str):
+        return fitz.open(source, filetype="pdf")
+    return fitz.open(stream=source, filetype="pdf")
+
+
+def _page_layout(page) -> Tuple[str, List[LayoutLine]]:
+    """Text and layout lines of one page, read from a single ``dict`` extraction.
+
+    The text is assembled the way ``page.get_text()`` lays it out: one line
+    per PDF line, each followed by a newline.
+    """
+    text = []
+    lines: List[LayoutLine] = []
+    for block in page.get_text("dict")["blocks"]:
+        for line in block.get("lines", ()):
+            spans = [span for span in line["spans"] if span["text"]]
+            content = "".join(span["text"] for span in spans)
+            text.append(content + "\n")
+            if content.strip():
+                lines.append((
+                    content.strip(),
+                    round(max(span["size"] for span in spans), 1),
+                    all(span["flags"] & _BOLD for span in spans if span["text"].strip()),
+                ))
+    return "".join(text), lines
+
+
+def _check_deadline(deadline: float) -> None:
+    if time.time() > deadline:
+        raise TimeoutError()
+
+
+def _extract_pages(doc, start: int, stop: int, layout: bool,
+                   deadline: float) -> Union[str, Tuple[str, List[LayoutLine]]]:
+    text = []
+    lines: List[LayoutLine] = []
+    for i in range(start, stop):
+        _check_deadline(deadline)
+        if not layout:
+            text.append(doc[i].get_text())
+            continue
+        page_text, page_lines = _page_layout(doc[i])
+        text.append(page_text)
+        lines.extend(page_lines)
+    return ("".join(text), lines) if layout else "".join(text)
+
+
+def _extract_range(source: Source, start: int, stop: int, layout: bool, deadline: float):
+    """Extract and join the text (and, with ``layout``, the layout lines) of pages [start, stop)."""
+    doc = _open(source)
+    try:
+        return _extract_pages(doc, start, min(stop, doc.page_count), layout, deadline)
+    finally:
+        doc.close()
+
+
+def _extract_document(source: Source, max_pages: int, parallel_threshold: int, layout: bool, deadline: float):
+    """Extract small documents outright; for large ones return the page count
+    so the caller can fan the page ranges out across the pool."""
+    doc = _open(source)
+    try:
+        page_count = min(doc.page_count, max_pages)
+        if page_count > parallel_threshold:
+            return page_count
+        return _extract_pages(doc, 0, page_count, layout, deadline)
+    finally:
+        doc.close()
+
+
+def _discard_result(task: "asyncio.Future") -> None:
+    """Retrieve an abandoned task's outcome so it isn't logged as never retrieved."""
+    if not task.cancelled():
+        task.exception()
+
+
+def _page_ranges(page_count: int, pages_per_task: int) -> List[Tuple[int, int]]:
+    return [
+        (start, min(start + pages_per_task, page_count))
+        for start in range(0, page_count, pages_per_task)
+    ]
+
+
+class PDFExtractor:
+    """Runs PyMuPDF text extraction on a bounded worker-process pool.
+
+    Small documents are extracted in one task; documents above
+    ``parallel_threshold`` pages are split into ranges of ``pages_per_task``
+    pages that are extracted concurrently and joined in order.
+
+    At most ``workers`` documents are extracted at a time, and each one's
+    ``timeout`` starts when it gets its turn, so time spent waiting behind
+    other uploads doesn't count against it. The workers check the deadline
+    between pages and give up on their own; only a document still running
+    ``_STUCK_GRACE`` seconds later, i.e. stuck inside PyMuPDF, gets the
+    pool's processes killed and replaced. Other documents caught in that
+    are retried once on the new pool.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_pages: int = 50,
+        parallel_threshold: int = 8,
+        pages_per_task: int = 4,
+        timeout: float = 20.0,
+    ):
+        self.workers = max(1, workers)
+        self.max_pages = max_pages
+        self.parallel_threshold = parallel_threshold
+        self.pages_per_task = max(1, pages_per_task)
+        self.timeout = timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def from_env(cls) -> "PDFExtractor":
+        """Build an extractor using the PDF_* environment variables."""
+        return cls(
+            workers=int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1)))),
+            max_pages=int(os.getenv("PDF_MAX_PAGES", "50")),
+            parallel_threshold=int(os.getenv("PDF_PARALLEL_THRESHOLD", "8")),
+            pages_per_task=int(os.getenv("PDF_PAGES_PER_TASK", "4")),
+            timeout=float(os.getenv("PDF_TIMEOUT", "20")),
+        )
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn rather than fork: the server process has a running event
+            # loop and helper threads that must not be duplicated.
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_import_pymupdf,
+            )
+        return self._pool
+
+    @property
+    def slots(self) -> asyncio.Semaphore:
+        """One slot per worker; a semaphore belongs to the event loop it was first used on."""
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots, self._slots_loop = asyncio.Semaphore(self.workers), loop
+        return self._slots
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, fn, *args)
+
+    async def _extract(self, source: Source, layout: bool, deadline: float):
+        result = await self._run(
+            _extract_document, source, self.max_pages, self.parallel_threshold, layout, deadline
+        )
+        if not isinstance(result, int):
+            return result
+
+        parts = await asyncio.gather(*(
+            self._run(_extract_range, source, start, stop, layout, deadline)
+            for start, stop in _page_ranges(result, self.pages_per_task)
+        ))
+        if not layout:
+            return "".join(parts)
+        return "".join(text for text, _ in parts), [line for _, lines in parts for line in lines]
+
+    async def _extract_with_limits(self, source: Source, layout: bool):
+        async with self.slots:
+            return await self._extract_in_slot(source, layout)
+
+    async def _extract_in_slot(self, source: Source, layout: bool):
+        exceeded = PDFExtractionError(f"Failed to read PDF: extraction exceeded {self.timeout:g}s")
+        for attempt in range(2):
+            pool = self.pool
+            task = asyncio.ensure_future(self._extract(source, layout, time.time() + self.timeout))
+            try:
+                done, _ = await asyncio.wait({task}, timeout=self.timeout + _STUCK_GRACE)
+            except asyncio.CancelledError:
+                task.cancel()
+                raise
+            if not done:
+                # The worker never reached a deadline check. Killing the
+                # processes fails its futures (and any sharing the pool) with
+                # BrokenProcessPool rather than cancelling them.
+                task.add_done_callback(_discard_result)
+                self._recycle(pool)
+                raise exceeded
+            try:
+                return task.result()
+            except TimeoutError:
+                raise exceeded
+            except BrokenProcessPool:
+                # Another document's timeout (or a crash) took the pool down
+                # under us; retry once on a fresh pool.
+                self._recycle(pool)
+                if attempt:
+                    raise PDFExtractionError("Failed to read PDF: extraction worker crashed")
+            except Exception as e:
+                raise PDFExtractionError(f"Failed to read PDF: {str(e)}") from e
+
+    async def extract_text(self, source: Source) -> str:
+        """Extract the text of a PDF (bytes or a file path), raising
+        ``PDFExtractionError`` on failure."""
+        text = await self._extract_with_limits(source, layout=False)
+        return text.strip()
+
+    async def extract_layout(self, source: Source) -> Tuple[str, List[LayoutLine]]:
+        """Like ``extract_text``, but also return each line's font size and
+        weight, gathered in the same pass over the document."""
+        text, lines = await self._extract_with_limits(source, layout=True)
+        return text.strip(), lines
+
+    async def warm(self) -> int:
+        """Start the worker processes ahead of the first upload; returns how many answered."""
+        pids = await asyncio.gather(*(self._run(_worker_pid) for _ in range(self.workers)))
+        return len(set(pids))
+
+    def _recycle(self, pool: ProcessPoolExecutor) -> None:
+        """Kill and drop ``pool``, unless another caller has already replaced it."""
+        if self._pool is not pool:
+            return
+        self._pool = None
+        for process in list(getattr(pool, "_processes", {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,177 @@
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from metrics import PROMPT_TOKENS_SAVED, current_endpoint
+from resume_parser import heading_lookup, normalize_text, parse_resume, split_sections
+from resume_store import estimate_tokens
+
+# Resume sections in the order they are kept when a resume is over budget
+RESUME_SECTION_PRIORITY = [
+    "header", "summary", "experience", "skills", "projects", "education",
+    "certifications", "awards", "publications", "languages", "volunteer", "interests",
+]
+
+JOB_SECTION_HEADINGS = {
+    "requirements": ["requirements", "qualifications", "minimum qualifications", "required qualifications",
+                     "what you bring", "what we're looking for", "who you are", "must have", "skills"],
+    "responsibilities": ["responsibilities", "key responsibilities", "what you'll do", "what you will do",
+                         "the role", "role", "duties", "your role", "job description"],
+    "preferred": ["preferred qualifications", "nice to have", "bonus points", "preferred", "pluses"],
+    "about": ["about us", "about the company", "who we are", "our mission", "company overview"],
+    "benefits": ["benefits", "perks", "what we offer", "compensation", "perks and benefits"],
+}
+JOB_SECTION_PRIORITY = ["header", "requirements", "responsibilities", "preferred", "about", "benefits"]
+_JOB_HEADINGS = heading_lookup(JOB_SECTION_HEADINGS)
+
+# Lines that carry no signal for the model: job-board chrome, legal
+# boilerplate and PDF page furniture.
+_BOILERPLATE = re.compile(
+    r"equal opportunity employer|without regard to (race|age|gender)|reasonable accommodation"
+    r"|^apply( now| for this job)?$|^easy apply$|^save( job)?$|^share( this job)?$|^report( this)? job$"
+    r"|we use cookies|cookie (policy|settings|preferences)|privacy policy|terms of (use|service)|all rights reserved"
+    r"|^page \d+( of \d+)?$|^\d+ ?/ ?\d+$|references (are )?available upon request"
+    r"|^(show|see) (more|less)$|^posted \d+ (hours?|days?|weeks?) ago$|\d+ applicants?$",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class BudgetedText:
+    text: str
+    original_tokens: int
+    tokens: int
+
+    @property
+    def saved(self) -> int:
+        return self.original_tokens - self.tokens
+
+
+def _dedupe_lines(text: str) -> str:
+    """Drop boilerplate lines and repeats of a line already seen."""
+    seen = set()
+    kept = []
+    for line in text.split("\n"):
+        key = line.lower()
+        if not line or key in seen or _BOILERPLATE.search(line):
+            continue
+        seen.add(key)
+        kept.append(line)
+    return "\n".join(kept)
+
+
+def _truncate_lines(text: str, max_tokens: int) -> str:
+    """Keep whole lines from the top until the budget is used up."""
+    kept = []
+    used = 0
+    for line in text.split("\n"):
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            # A single oversized line still gets cut to fit, by characters
+            if not kept and max_tokens > 0:
+                kept.append(line[: max_tokens * 4])
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept)
+
+
+def fit_text(text: str, max_tokens: int, kind: str = "resume") -> BudgetedText:
+    """Deterministically compress ``text`` to roughly ``max_tokens`` tokens.
+
+    Text within budget is returned unchanged. Otherwise whitespace is
+    collapsed, boilerplate and duplicate lines are dropped, and if that is
+    not enough the text is split into sections (resume or job description
+    headings, per ``kind``) that are kept in priority order; a section that
+    doesn't fit is cut at a line boundary. Kept sections stay in document
+    order.
+    """
+    original = estimate_tokens(text)
+    if original <= max_tokens:
+        return BudgetedText(text, original, original)
+
+    compact = _dedupe_lines(normalize_text(text))
+    tokens = estimate_tokens(compact)
+    if tokens <= max_tokens:
+        return BudgetedText(compact, original, tokens)
+
+    if kind == "job":
+        sections = split_sections(compact, _JOB_HEADINGS)
+        priority = JOB_SECTION_PRIORITY
+    else:
+        sections = split_sections(compact)
+        priority = RESUME_SECTION_PRIORITY
+    order = list(sections)
+    ranked = sorted(order, key=lambda name: priority.index(name) if name in priority else len(priority))
+
+    bodies = {
+        name: ("" if name == "header" else f"{name.title()}:\n") + sections[name] for name in ranked
+    }
+    costs = {name: estimate_tokens(body) + 1 for name, body in bodies.items()}
+
+    kept: Dict[str, str] = {}
+    remaining = max_tokens
+    for position, name in enumerate(ranked):
+        if costs[name] <= remaining:
+            kept[name] = bodies[name]
+            remaining -= costs[name]
+            continue
+        # Truncate, but leave some room so lower-priority sections aren't
+        # all squeezed out by one long section.
+        reserve = min(sum(costs[later] for later in ranked[position + 1:]), max_tokens // 4)
+        truncated = _truncate_lines(bodies[name], remaining - reserve)
+        if "\n" in truncated or name == "header":
+            kept[name] = truncated
+            remaining -= estimate_tokens(truncated) + 1
+
+    result = "\n".join(kept[name] for name in order if name in kept)
+    return BudgetedText(result, original, estimate_tokens(result))
+
+
+class PromptBudget:
+    """Per-input token budgets for the prompt builders.
+
+    The defaults leave room in llama3-70b's 8192-token context for the
+    prompt template and a full-length answer.
+    """
+
+    def __init__(self, resume_tokens: int = 3000, job_tokens: int = 1500):
+        self.resume_tokens = resume_tokens
+        self.job_tokens = job_tokens
+
+    @classmethod
+    def from_env(cls) -> "PromptBudget":
+        """Build budgets using the PROMPT_*_TOKENS environment variables."""
+        return cls(
+            resume_tokens=int(os.getenv("PROMPT_RESUME_TOKENS", "3000")),
+            job_tokens=int(os.getenv("PROMPT_JOB_TOKENS", "1500")),
+        )
+
+    def fit(self, resume: str, job: Optional[str] = None, sections: Optional[Sequence[str]] = None) -> List[BudgetedText]:
+        """Fit the resume (and job description, if given) into their budgets.
+
+        With ``sections`` only those resume sections are sent; the tokens of
+        the rest count as saved.
+        """
+        if sections is None:
+            fitted = [fit_text(resume, self.resume_tokens, "resume")]
+        else:
+            selected = fit_text(parse_resume(resume).select(sections), self.resume_tokens, "resume")
+            selected.original_tokens = max(selected.original_tokens, estimate_tokens(resume))
+            fitted = [selected]
+        if job is not None:
+            fitted.append(fit_text(job, self.job_tokens, "job"))
+        return fitted
+
+
+def token_usage(messages: List[Dict[str, str]], inputs: List[BudgetedText]) -> Dict[str, Any]:
+    """Token accounting reported alongside LLM-backed responses."""
+    saved = sum(i.saved for i in inputs)
+    PROMPT_TOKENS_SAVED.inc(saved, endpoint=current_endpoint.get())
+    return {
+        "prompt_tokens_estimated": sum(estimate_tokens(m["content"]) for m in messages),
+        "input_tokens_original": sum(i.original_tokens for i in inputs),
+        "input_tokens": sum(i.tokens for i in inputs),
+        "tokens_saved": saved,
+    }
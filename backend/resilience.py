@@ -0,0 +1,261 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, TypeVar
+
+from llm_client import LLMError
+from metrics import registry
+
+logger = logging.getLogger("app.resilience")
+
+T = TypeVar("T")
+
+RETRIES = registry.counter("llm_retries_total", "LLM call retries by policy.", ["policy"])
+SHORT_CIRCUITED = registry.counter(
+    "llm_short_circuited_total", "Calls rejected without contacting upstream because the circuit was open.", ["policy"],
+)
+HEDGED = registry.counter(
+    "llm_hedged_total", "Requests answered by the local fallback because the LLM was slower than the hedge delay.",
+    ["endpoint"],
+)
+
+
+class CircuitOpenError(LLMError):
+    """Raised instead of calling upstream while the circuit breaker is open."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("LLM upstream is unavailable; try again shortly", retry_after=retry_after)
+
+    @property
+    def retryable(self) -> bool:
+        return False
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` retryable failures in a row the circuit
+    opens and calls fail fast for ``reset_timeout`` seconds. Then a single
+    trial call is let through (half-open): success closes the circuit,
+    failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        """Raise ``CircuitOpenError`` unless a call may go upstream now."""
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return
+        remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+        raise CircuitOpenError(retry_after=max(1.0, remaining))
+
+    def record_success(self) -> None:
+        if self.opened_at is not None:
+            logger.info("circuit closed")
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def abandon(self) -> None:
+        """Forget a trial call that was cancelled before it produced an outcome."""
+        self._trial_in_flight = False
+
+    def record_failure(self, error: Exception) -> None:
+        if isinstance(error, LLMError) and not error.retryable:
+            # The request itself was bad (4xx); upstream is healthy
+            self._trial_in_flight = False
+            return
+        self.failures += 1
+        if self._trial_in_flight or self.failures >= self.failure_threshold:
+            if self.state == "closed":
+                logger.warning("circuit opened", extra={"failures": self.failures, "error": str(error)})
+            self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+
+@dataclass
+class RetryPolicy:
+    max_retries: int = 2
+    deadline: float = 60.0
+    base_delay: float = 0.5
+    max_delay: float = 10.0
+
+
+def _policy_env(name: str, setting: str, default: float) -> float:
+    """RESILIENCE_<POLICY>_<SETTING>, e.g. RESILIENCE_BATCH_MAX_RETRIES."""
+    key = f"RESILIENCE_{name.upper().replace('-', '_')}_{setting}"
+    return float(os.getenv(key, str(default)))
+
+
+# Interactive endpoints fail fast; batch work waits out rate limits
+DEFAULT_POLICIES = {
+    "upload-resume": RetryPolicy(max_retries=1, deadline=45.0),
+    "generate-cover-letter": RetryPolicy(max_retries=2, deadline=60.0),
+    "interview-trainer": RetryPolicy(max_retries=2, deadline=60.0),
+    "generate-links": RetryPolicy(max_retries=1, deadline=20.0),
+    "batch": RetryPolicy(
+        max_retries=int(os.getenv("BATCH_MAX_RETRIES", "5")), deadline=300.0, base_delay=1.0, max_delay=30.0,
+    ),
+}
+
+
+class Resilience:
+    """Deadlines, bounded retries and a shared circuit breaker for LLM calls.
+
+    Each call runs under a named policy: the whole call, retries included,
+    must finish within the policy's deadline. Retryable errors (transport
+    failures, 429, 5xx) are retried, honouring Retry-After when it fits in
+    the remaining time and otherwise backing off exponentially with full
+    jitter. Every attempt goes through one circuit breaker, so while
+    upstream is down calls fail immediately with ``CircuitOpenError`` and
+    callers can switch to their local fallbacks.
+    """
+
+    def __init__(self, breaker: CircuitBreaker, policies: Optional[Dict[str, RetryPolicy]] = None):
+        self.breaker = breaker
+        self.policies = dict(DEFAULT_POLICIES if policies is None else policies)
+        self.default_policy = RetryPolicy()
+
+    @classmethod
+    def from_env(cls) -> "Resilience":
+        """Build using CIRCUIT_* and RESILIENCE_<POLICY>_* environment variables."""
+        breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")),
+            reset_timeout=float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30")),
+        )
+        policies = {
+            name: RetryPolicy(
+                max_retries=int(_policy_env(name, "MAX_RETRIES", policy.max_retries)),
+                deadline=_policy_env(name, "DEADLINE", policy.deadline),
+                base_delay=policy.base_delay,
+                max_delay=policy.max_delay,
+            )
+            for name, policy in DEFAULT_POLICIES.items()
+        }
+        return cls(breaker, policies)
+
+    def policy(self, name: str) -> RetryPolicy:
+        return self.policies.get(name, self.default_policy)
+
+    def _backoff(self, error: LLMError, attempt: int, policy: RetryPolicy, remaining: float) -> Optional[float]:
+        """Delay before the next attempt, or None if it can't fit in the deadline."""
+        delay = error.retry_after
+        if delay is None:
+            delay = random.uniform(0, min(policy.max_delay, policy.base_delay * 2 ** attempt))
+        return delay if delay < remaining else None
+
+    async def call(self, name: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await ``fn()`` under policy ``name``; raises the last ``LLMError``."""
+        policy = self.policy(name)
+        deadline = time.monotonic() + policy.deadline
+        attempt = 0
+        while True:
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                SHORT_CIRCUITED.inc(policy=name)
+                raise
+            remaining = deadline - time.monotonic()
+            try:
+                result = await asyncio.wait_for(fn(), remaining)
+            except asyncio.TimeoutError:
+                error = LLMError(f"LLM call exceeded the {policy.deadline:g}s deadline")
+                self.breaker.record_failure(error)
+                raise error from None
+            except LLMError as e:
+                self.breaker.record_failure(e)
+                delay = self._backoff(e, attempt, policy, deadline - time.monotonic())
+                if not e.retryable or attempt >= policy.max_retries or delay is None:
+                    raise
+                RETRIES.inc(policy=name)
+                logger.info("retrying LLM call", extra={"policy": name, "attempt": attempt + 1, "delay": round(delay, 3), "error": str(e)})
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                self.breaker.abandon()
+                raise
+            self.breaker.record_success()
+            return result
+
+    async def stream(self, name: str, factory: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """Streaming counterpart of ``call``.
+
+        Retries only happen before the first delta has been yielded; once
+        output has reached the client a failure is raised as-is.
+        """
+        policy = self.policy(name)
+        deadline = time.monotonic() + policy.deadline
+        attempt = 0
+        while True:
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                SHORT_CIRCUITED.inc(policy=name)
+                raise
+            started = False
+            try:
+                async for delta in factory():
+                    started = True
+                    yield delta
+            except LLMError as e:
+                self.breaker.record_failure(e)
+                delay = self._backoff(e, attempt, policy, deadline - time.monotonic())
+                if started or not e.retryable or attempt >= policy.max_retries or delay is None:
+                    raise
+                RETRIES.inc(policy=name)
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                # Client went away mid-stream (GeneratorExit / cancellation)
+                self.breaker.abandon()
+                raise
+            self.breaker.record_success()
+            return
+
+
+async def hedge(
+    endpoint: str,
+    primary: Awaitable[T],
+    fallback: Callable[[], T],
+    delay: float,
+) -> T:
+    """Return ``primary``'s result if it arrives within ``delay`` seconds,
+    otherwise ``fallback()``.
+
+    A late primary keeps running in the background (so its completion still
+    lands in the response cache) and any error it raises is only logged.
+    """
+    task = asyncio.ensure_future(primary)
+    done, _ = await asyncio.wait({task}, timeout=delay)
+    if done:
+        return task.result()
+
+    def _finished(t: "asyncio.Task[Any]") -> None:
+        if not t.cancelled() and t.exception() is not None:
+            logger.info("hedged LLM call failed", extra={"endpoint": endpoint, "error": str(t.exception())})
+
+    task.add_done_callback(_finished)
+    HEDGED.inc(endpoint=endpoint)
+    return fallback()
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from cache import normalize_input
+from metrics import registry
+from resume_store import resume_fingerprint
+from storage import connect, data_path
+
+logger = logging.getLogger("app.results")
+
+RESULTS_STORED = registry.counter("results_stored_total", "Generated results saved to the history store.", ["type"])
+RESULTS_COMPACTED = registry.counter("results_compacted_total", "History rows removed by retention compaction.")
+
+RESULT_TYPES = ("analysis", "cover-letter", "interview")
+
+
+def job_fingerprint(job_description: str) -> str:
+    """Hash of a job description; whitespace differences don't change it."""
+    return hashlib.sha256(normalize_input(job_description).encode("utf-8")).hexdigest()[:32]
+
+
+class ResultStore:
+    """Persistent history of generated results, keyed by resume and job description.
+
+    Each (resume, job description, type) keeps only its latest result; the
+    resume key is the same fingerprint as ``resume_id``, and analyses have
+    an empty job key. Rows are listed newest first by an increasing ``id``,
+    which doubles as the pagination cursor. Every ``compact_every`` writes
+    (and on open) rows older than ``retention`` are dropped, each resume is
+    trimmed to ``max_per_resume`` rows and the table to ``max_rows``, and
+    the freed pages are returned to the filesystem.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        retention: float = 30 * 86400.0,
+        max_rows: int = 50000,
+        max_per_resume: int = 100,
+        compact_every: int = 500,
+    ):
+        self.path = path
+        self.retention = retention
+        self.max_rows = max_rows
+        self.max_per_resume = max_per_resume
+        self.compact_every = max(1, compact_every)
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = connect(path)
+        with self._lock:
+            # auto_vacuum only takes effect if set before the first table is created
+            self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, resume_hash TEXT NOT NULL, job_hash TEXT NOT NULL, "
+                "type TEXT NOT NULL, result TEXT NOT NULL, created_at REAL NOT NULL, "
+                "UNIQUE (resume_hash, type, job_hash))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS results_resume ON results (resume_hash, id)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS results_created ON results (created_at)")
+            self._conn.commit()
+        self.compact()
+
+    @classmethod
+    def from_env(cls) -> "ResultStore":
+        """Build using the RESULTS_* environment variables."""
+        return cls(
+            path=os.getenv("RESULTS_DB") or data_path("results.sqlite3"),
+            retention=float(os.getenv("RESULTS_RETENTION", str(30 * 86400))),
+            max_rows=int(os.getenv("RESULTS_MAX_ROWS", "50000")),
+            max_per_resume=int(os.getenv("RESULTS_MAX_PER_RESUME", "100")),
+            compact_every=int(os.getenv("RESULTS_COMPACT_EVERY", "500")),
+        )
+
+    def record(self, result_type: str, resume: str, job_description: str, result: Dict[str, Any]) -> int:
+        """Save ``result``, replacing the previous one for the same inputs; returns its id."""
+        now = time.time()
+        with self._lock:
+            # REPLACE deletes the old row, so the new one gets a fresh id and sorts first
+            cursor = self._conn.execute(
+                "INSERT OR REPLACE INTO results (resume_hash, job_hash, type, result, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    resume_fingerprint(resume),
+                    job_fingerprint(job_description) if job_description else "",
+                    result_type,
+                    json.dumps(result),
+                    now,
+                ),
+            )
+            self._conn.commit()
+            self._writes += 1
+            due = self._writes % self.compact_every == 0
+        RESULTS_STORED.inc(type=result_type)
+        if due:
+            self.compact()
+        return cursor.lastrowid
+
+    def history(
+        self,
+        resume_id: str,
+        result_type: Optional[str] = None,
+        job_hash: Optional[str] = None,
+        limit: int = 20,
+        before: Optional[int] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """One page of a resume's results, newest first, and the cursor for the next page."""
+        query = "SELECT id, type, job_hash, result, created_at FROM results WHERE resume_hash = ? AND created_at > ?"
+        params: List[Any] = [resume_id, time.time() - self.retention]
+        if result_type is not None:
+            query += " AND type = ?"
+            params.append(result_type)
+        if job_hash is not None:
+            query += " AND job_hash = ?"
+            params.append(job_hash)
+        if before is not None:
+            query += " AND id < ?"
+            params.append(before)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit + 1)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        items = [
+            {
+                "id": row_id,
+                "type": row_type,
+                "resume_id": resume_id,
+                "job_hash": row_job or None,
+                "created_at": round(created_at, 3),
+                "result": json.loads(result),
+            }
+            for row_id, row_type, row_job, result, created_at in rows[:limit]
+        ]
+        return items, (items[-1]["id"] if len(rows) > limit else None)
+
+    def compact(self) -> int:
+        """Apply retention and size limits; returns the number of rows removed."""
+        start = time.perf_counter()
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM results WHERE created_at <= ?", (time.time() - self.retention,)
+            ).rowcount
+            removed += self._conn.execute(
+                "DELETE FROM results WHERE id IN (SELECT id FROM ("
+                "SELECT id, ROW_NUMBER() OVER (PARTITION BY resume_hash ORDER BY id DESC) AS n FROM results"
+                ") WHERE n > ?)",
+                (self.max_per_resume,),
+            ).rowcount
+            removed += self._conn.execute(
+                "DELETE FROM results WHERE id <= (SELECT id FROM results ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (self.max_rows,),
+            ).rowcount
+            self._conn.commit()
+            if removed:
+                self._conn.execute("PRAGMA incremental_vacuum")
+                self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        if removed:
+            RESULTS_COMPACTED.inc(removed)
+            logger.info("compacted result history", extra={"removed": removed,
+                                                            "seconds": round(time.perf_counter() - start, 4)})
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT type, COUNT(*) FROM results GROUP BY type").fetchall())
+            resumes = self._conn.execute("SELECT COUNT(DISTINCT resume_hash) FROM results").fetchone()[0]
+        size = sum(os.path.getsize(p) for p in (self.path, self.path + "-wal") if os.path.exists(p))
+        return {"results": counts, "resumes": resumes, "bytes": size}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
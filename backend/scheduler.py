@@ -0,0 +1,262 @@
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from llm_client import LLMError
+from metrics import registry
+
+# Lower value = served first
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+QUEUE_WAIT = registry.histogram(
+    "llm_queue_wait_seconds", "Time LLM calls waited for rate-limit budget.", ["priority"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+QUEUE_TIMEOUTS = registry.counter(
+    "llm_queue_timeouts_total", "LLM calls that gave up waiting for rate-limit budget.", ["priority"],
+)
+
+
+class SchedulerTimeout(LLMError):
+    """Raised when a call can't get request/token budget before its deadline."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("LLM rate limit budget exhausted; try again shortly", retry_after=retry_after)
+
+    @property
+    def retryable(self) -> bool:
+        # Upstream is fine, we are just over quota; retrying only adds load
+        return False
+
+
+class TokenBucket:
+    """Continuously refilled budget of ``per_minute`` units, bursting up to one minute's worth.
+
+    The level may go negative when a call turns out to cost more than it
+    reserved; later calls then wait for the debt to refill.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until ``amount`` units are available (0 if they are now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, amount: float) -> None:
+        """Charge (positive) or refund (negative) ``amount`` after the fact."""
+        self._refill()
+        self.level = min(self.capacity, self.level - amount)
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "tokens", "event")
+
+    def __init__(self, priority: int, seq: int, tokens: int):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.event = asyncio.Event()
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class Slot:
+    """A granted call; report the real token count with ``usage`` to settle the reservation."""
+
+    def __init__(self, budget: "_ModelBudget", reserved: int):
+        self._budget = budget
+        self.reserved = reserved
+
+    def usage(self, tokens: int) -> None:
+        if self._budget.tokens is not None:
+            self._budget.tokens.adjust(tokens - self.reserved)
+        self.reserved = tokens
+
+
+class _ModelBudget:
+    """One model's buckets, waiting calls and 429 pause."""
+
+    def __init__(self, rpm: Optional[float], tpm: Optional[float]):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.queue: List[_Waiter] = []
+        self.paused_until = 0.0
+
+    def delay(self, tokens: int) -> float:
+        delay = max(0.0, self.paused_until - time.monotonic())
+        if self.requests is not None:
+            delay = max(delay, self.requests.delay(1))
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.delay(tokens))
+        return delay
+
+    def wake_head(self) -> None:
+        if self.queue:
+            self.queue[0].event.set()
+
+
+class RateLimitScheduler:
+    """Client-side requests-per-minute and tokens-per-minute limiter with priority classes.
+
+    Each model has its own budget, as upstream quotas are per model. Calls
+    for a model queue in priority order (interactive before batch, FIFO
+    within a class) and only the head of the queue may take budget, so a
+    stream of batch work can never starve interactive requests. A call
+    waits at most until its deadline and then raises ``SchedulerTimeout``
+    instead of sending a request that would come back as a 429. An
+    upstream 429 pauses dispatch to that model for its Retry-After.
+
+    Budgets are kept in memory, so they are per process: with several
+    server workers, divide the account's limits between them. Both limits
+    are off unless configured.
+    """
+
+    def __init__(self, rpm: Optional[float] = None, tpm: Optional[float] = None, max_wait: Optional[Dict[str, float]] = None):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_wait = {"interactive": 15.0, "batch": 300.0, **(max_wait or {})}
+        self._budgets: Dict[str, _ModelBudget] = {}
+        self._seq = itertools.count()
+        self.granted: Dict[str, int] = {name: 0 for name in PRIORITIES}
+        self.timeouts: Dict[str, int] = {name: 0 for name in PRIORITIES}
+        self.wait_seconds: Dict[str, float] = {name: 0.0 for name in PRIORITIES}
+
+    @classmethod
+    def from_env(cls) -> "RateLimitScheduler":
+        """Build using LLM_RPM / LLM_TPM (per model and process; 0, the default, disables a limit)
+        and LLM_QUEUE_*_MAX_WAIT."""
+        return cls(
+            rpm=float(os.getenv("LLM_RPM", "0")),
+            tpm=float(os.getenv("LLM_TPM", "0")),
+            max_wait={
+                "interactive": float(os.getenv("LLM_QUEUE_INTERACTIVE_MAX_WAIT", "15")),
+                "batch": float(os.getenv("LLM_QUEUE_BATCH_MAX_WAIT", "300")),
+            },
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.rpm or self.tpm)
+
+    def _budget(self, model: str) -> _ModelBudget:
+        budget = self._budgets.get(model)
+        if budget is None:
+            budget = self._budgets[model] = _ModelBudget(self.rpm, self.tpm)
+        return budget
+
+    def pause(self, model: str, seconds: float) -> None:
+        """Stop granting ``model`` budget for ``seconds`` (upstream said we're over quota)."""
+        budget = self._budget(model)
+        budget.paused_until = max(budget.paused_until, time.monotonic() + seconds)
+
+    async def acquire(self, model: str, tokens: int, priority: str = "interactive",
+                      deadline: Optional[float] = None) -> Slot:
+        """Wait for one request and ``tokens`` tokens of ``model``'s budget.
+
+        ``deadline`` is a ``time.monotonic()`` timestamp; the wait is also
+        capped by the priority class's maximum wait.
+        """
+        budget = self._budget(model)
+        start = time.monotonic()
+        limit = start + self.max_wait.get(priority, self.max_wait["interactive"])
+        if deadline is not None:
+            limit = min(limit, deadline)
+
+        waiter = _Waiter(PRIORITIES.get(priority, 0), next(self._seq), tokens)
+        heapq.heappush(budget.queue, waiter)
+        try:
+            while True:
+                now = time.monotonic()
+                delay = budget.delay(tokens) if budget.queue[0] is waiter else None
+                if delay == 0.0:
+                    heapq.heappop(budget.queue)
+                    break
+                if now >= limit or (delay is not None and now + delay > limit):
+                    self.timeouts[priority] = self.timeouts.get(priority, 0) + 1
+                    QUEUE_TIMEOUTS.inc(priority=priority)
+                    raise SchedulerTimeout(retry_after=max(1.0, delay or 1.0))
+                waiter.event.clear()
+                timeout = limit - now if delay is None else min(delay, limit - now)
+                try:
+                    await asyncio.wait_for(waiter.event.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            if waiter in budget.queue:
+                budget.queue.remove(waiter)
+                heapq.heapify(budget.queue)
+            budget.wake_head()
+            raise
+
+        if budget.requests is not None:
+            budget.requests.take(1)
+        if budget.tokens is not None:
+            budget.tokens.take(tokens)
+        waited = time.monotonic() - start
+        self.granted[priority] = self.granted.get(priority, 0) + 1
+        self.wait_seconds[priority] = self.wait_seconds.get(priority, 0.0) + waited
+        QUEUE_WAIT.observe(waited, priority=priority)
+        budget.wake_head()
+        return Slot(budget, tokens)
+
+    @asynccontextmanager
+    async def slot(self, model: str, tokens: int, priority: str = "interactive",
+                   deadline: Optional[float] = None) -> AsyncIterator[Slot]:
+        """``acquire`` as a context manager; an upstream 429 inside it pauses the model."""
+        granted = await self.acquire(model, tokens, priority, deadline)
+        try:
+            yield granted
+        except LLMError as e:
+            if e.status_code == 429:
+                self.pause(model, e.retry_after if e.retry_after is not None else 1.0)
+                self._budget(model).wake_head()
+            raise
+
+    def queue_depth(self) -> Dict[str, int]:
+        depth = {name: 0 for name in PRIORITIES}
+        for budget in self._budgets.values():
+            for waiter in budget.queue:
+                for name, value in PRIORITIES.items():
+                    if value == waiter.priority:
+                        depth[name] += 1
+        return depth
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "queue_depth": self.queue_depth(),
+            "granted": dict(self.granted),
+            "timeouts": dict(self.timeouts),
+            "avg_wait_seconds": {
+                name: round(self.wait_seconds[name] / count, 4) if count else 0.0
+                for name, count in self.granted.items()
+            },
+            "models": {
+                model: {
+                    "requests_available": round(budget.requests.level, 2) if budget.requests else None,
+                    "tokens_available": round(budget.tokens.level, 2) if budget.tokens else None,
+                    "paused_for": round(max(0.0, budget.paused_until - time.monotonic()), 3),
+                }
+                for model, budget in self._budgets.items()
+            },
+        }
@@ -0,0 +1,151 @@
+import json
+import os
+import re
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+DEFAULT_SCORES = {
+    "Format": 8,
+    "Content": 7,
+    "Skills": 8,
+    "Impact": 7,
+    "Overall": 7,
+}
+
+# Category -> keywords in priority order. A score is "<keyword> ... N/10" on
+# one line; the first keyword (in this order) with any such match wins.
+SCORE_KEYWORDS = {
+    "Format": ["format", "structure", "layout"],
+    "Content": ["content", "quality"],
+    "Skills": ["skills", "technical"],
+    "Impact": ["impact", "achievement"],
+    "Overall": ["overall", "total", "final"],
+}
+
+# Keyword groups for the local fallback analysis
+FALLBACK_KEYWORDS = {
+    "contact": ["email", "phone", "@", "linkedin"],
+    "experience": ["experience", "work", "job", "position"],
+    "education": ["education", "degree", "university", "college"],
+    "skills": ["skills", "programming", "software", "technical"],
+    "impact": ["achieved", "improved", "increased", "developed"],
+    "achievements": ["achieved", "improved", "increased"],
+}
+
+
+class ScoreExtractor:
+    """Finds every category score in a feedback text in one pass.
+
+    Equivalent to running ``re.search(keyword + r".*?(\\d+)/10", text,
+    re.IGNORECASE)`` for each keyword in priority order, without the repeated
+    lazy scans. Since ``.*?`` can't cross a line break, only lines containing
+    ``/10`` can hold a score; those are located with plain substring search
+    and tokenized once by a combined pattern of all keywords and ``N/10``
+    scores. Each keyword takes the first score after its earliest occurrence.
+    """
+
+    def __init__(self, score_keywords: Dict[str, List[str]] = SCORE_KEYWORDS, defaults: Dict[str, int] = DEFAULT_SCORES):
+        self.score_keywords = score_keywords
+        self.defaults = defaults
+        self.keywords = [kw for keywords in score_keywords.values() for kw in keywords]
+        # Keyword indexes per category, and the top-priority index of each
+        self._category_indexes: Dict[str, List[int]] = {}
+        start = 0
+        for category, keywords in score_keywords.items():
+            self._category_indexes[category] = list(range(start, start + len(keywords)))
+            start += len(keywords)
+        self._primary = {indexes[0] for indexes in self._category_indexes.values() if indexes}
+        # Each keyword is its own group inside a lookahead so overlapping
+        # occurrences are all seen; the score is the group after them.
+        self._score_group = len(self.keywords) + 1
+        self._pattern = re.compile(
+            "(?=" + "|".join(f"({re.escape(kw)})" for kw in self.keywords) + r")|(\d+)/10",
+            re.IGNORECASE,
+        )
+
+    def _scan_line(self, text: str, start: int, end: int, first_score: Dict[int, int]) -> None:
+        pending: List[int] = []
+        for match in self._pattern.finditer(text, start, end):
+            group = match.lastindex
+            if group < self._score_group:
+                if group - 1 not in first_score:
+                    pending.append(group - 1)
+            elif pending:
+                score = int(match.group(group))
+                for keyword in pending:
+                    first_score.setdefault(keyword, score)
+                pending.clear()
+
+    def extract(self, feedback: str) -> Dict[str, int]:
+        scores = dict(self.defaults)
+        first_score: Dict[int, int] = {}
+
+        marker = feedback.find("/10")
+        while marker != -1 and not self._primary.issubset(first_score):
+            start = feedback.rfind("\n", 0, marker) + 1
+            end = feedback.find("\n", marker)
+            if end == -1:
+                end = len(feedback)
+            self._scan_line(feedback, start, end, first_score)
+            marker = feedback.find("/10", end)
+
+        for category, indexes in self._category_indexes.items():
+            for index in indexes:
+                if index in first_score:
+                    scores[category] = first_score[index]
+                    break
+        return scores
+
+
+class KeywordMatcher:
+    """Keyword-group presence checks over a single lowercase copy of the text.
+
+    Keywords are deduplicated across groups and tested longest first, with
+    Aho-Corasick style output links: once a keyword is found, every group of
+    every keyword it contains is credited without scanning again. Groups
+    already satisfied are skipped, and each remaining test is one C-level
+    substring search.
+    """
+
+    def __init__(self, groups: Dict[str, Iterable[str]]):
+        self.groups = {name: [kw.lower() for kw in keywords] for name, keywords in groups.items()}
+        self._keywords = sorted({kw for kws in self.groups.values() for kw in kws}, key=len, reverse=True)
+        keyword_groups = {
+            kw: frozenset(name for name, kws in self.groups.items() if kw in kws) for kw in self._keywords
+        }
+        # Output links: a match of ``kw`` also proves every keyword it contains
+        self._outputs: Dict[str, FrozenSet[str]] = {
+            kw: frozenset().union(*(keyword_groups[other] for other in self._keywords if other in kw))
+            for kw in self._keywords
+        }
+
+    def groups_present(self, text: str) -> FrozenSet[str]:
+        """Names of the groups with at least one keyword occurring in ``text``."""
+        lowered = text.lower()
+        found = set()
+        for keyword in self._keywords:
+            if self._outputs[keyword] <= found:
+                continue
+            if keyword in lowered:
+                found |= self._outputs[keyword]
+                if len(found) == len(self.groups):
+                    break
+        return frozenset(found)
+
+
+def load_keyword_groups(path: Optional[str] = None) -> Dict[str, List[str]]:
+    """Fallback keyword groups, overridden per group by a JSON file if configured.
+
+    The file (``SCORING_KEYWORDS_FILE``) maps group names to keyword lists,
+    e.g. ``{"skills": ["skills", "python", "sql"]}``.
+    """
+    groups = {name: list(keywords) for name, keywords in FALLBACK_KEYWORDS.items()}
+    path = path or os.getenv("SCORING_KEYWORDS_FILE")
+    if path:
+        with open(path, encoding="utf-8") as f:
+            overrides = json.load(f)
+        groups.update({name: [str(kw) for kw in keywords] for name, keywords in overrides.items()})
+    return groups
+
+
+score_extractor = ScoreExtractor()
+fallback_keywords = KeywordMatcher(load_keyword_groups())
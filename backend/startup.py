@@ -0,0 +1,71 @@
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger("app.startup")
+
+
+def process_age() -> Optional[float]:
+    """Seconds since this process started (Linux only), covering interpreter and server imports."""
+    try:
+        with open("/proc/self/stat") as f:
+            # Field 22, counted after the parenthesised command name
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        return time.clock_gettime(time.CLOCK_BOOTTIME) - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class StartupTimer:
+    """Wall-clock breakdown of process startup, reported at ``GET /startup``.
+
+    Phases are back to back: each ``mark`` closes the phase that began at
+    the previous one, from the top of main.py until the app is ready to
+    serve. Pre-warm tasks run in the background after that and are timed
+    separately, since requests may already be served while they run.
+    """
+
+    def __init__(self, started: float):
+        self.started = started
+        self._last = started
+        # Time the process spent before main.py started importing
+        self.before_app = process_age()
+        if self.before_app is not None:
+            self.before_app = round(max(0.0, self.before_app - (time.perf_counter() - started)), 4)
+        self.phases: Dict[str, float] = {}
+        self.ready_seconds: Optional[float] = None
+        self.prewarm: Dict[str, Dict[str, Any]] = {}
+
+    def mark(self, phase: str) -> None:
+        """Close ``phase``; ignored once the app is ready (e.g. a second lifespan in tests)."""
+        if self.ready_seconds is not None:
+            return
+        now = time.perf_counter()
+        self.phases[phase] = round(now - self._last, 4)
+        self._last = now
+
+    def ready(self) -> None:
+        if self.ready_seconds is None:
+            self.ready_seconds = round(time.perf_counter() - self.started, 4)
+
+    async def warm(self, name: str, fn: Callable[[], Awaitable[Any]]) -> None:
+        """Run one pre-warm step, recording its duration and outcome; never raises."""
+        self.prewarm[name] = {"status": "running"}
+        start = time.perf_counter()
+        try:
+            await fn()
+        except Exception as e:
+            self.prewarm[name] = {"status": "failed", "seconds": round(time.perf_counter() - start, 4), "error": str(e)}
+            logger.warning("pre-warm failed", extra={"target": name, "error": str(e)})
+        else:
+            self.prewarm[name] = {"status": "done", "seconds": round(time.perf_counter() - start, 4)}
+            logger.info("pre-warm done", extra={"target": name, "seconds": self.prewarm[name]["seconds"]})
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "before_app_seconds": self.before_app,
+            "phases": dict(self.phases),
+            "ready_seconds": self.ready_seconds,
+            "prewarm": {name: dict(state) for name, state in self.prewarm.items()},
+        }
@@ -0,0 +1,16 @@
+import os
+import sqlite3
+
+# SQLite stores default to files here rather than in the server's working directory
+DATA_DIR = os.getenv("DATA_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+def data_path(filename: str) -> str:
+    """Default location of a store's database file, inside DATA_DIR."""
+    return os.path.join(DATA_DIR, filename)
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Open a store's SQLite database, creating its directory if needed."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    return sqlite3.connect(path, check_same_thread=False, timeout=5.0)
@@ -0,0 +1,199 @@
+import json
+import os
+import resource
+import sys
+import tempfile
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+
+from fastapi import UploadFile
+
+from metrics import registry
+
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_TMP_DIR = os.getenv("UPLOAD_TMP_DIR") or None
+UPLOAD_CHUNK_BYTES = 64 * 1024
+
+# Multipart framing and form fields on top of the file itself
+_MULTIPART_OVERHEAD = 64 * 1024
+
+# A PDF header may be preceded by junk, but must start within the first 1024 bytes
+PDF_MAGIC = b"%PDF-"
+_MAGIC_WINDOW = 1024
+
+PEAK_MEMORY = registry.histogram(
+    "request_peak_rss_growth_bytes", "Process RSS growth observed while handling an upload.", ["endpoint"],
+    buckets=(256 * 1024, 1024 ** 2, 4 * 1024 ** 2, 16 * 1024 ** 2, 64 * 1024 ** 2, 256 * 1024 ** 2),
+)
+REJECTED = registry.counter("uploads_rejected_total", "Uploads rejected before extraction.", ["reason"])
+
+
+class UploadError(Exception):
+    """An upload that is rejected before it reaches the PDF extractor."""
+
+    def __init__(self, message: str, status_code: int = 400, reason: str = "invalid"):
+        super().__init__(message)
+        self.status_code = status_code
+        REJECTED.inc(reason=reason)
+
+
+def _too_large(max_bytes: int) -> UploadError:
+    return UploadError(f"File exceeds the {max_bytes} byte upload limit", 413, "too_large")
+
+
+@asynccontextmanager
+async def spooled_pdf(file: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES) -> AsyncIterator[str]:
+    """Copy an uploaded PDF to a temporary file in fixed-size chunks and yield its path.
+
+    Only one chunk is held in memory at a time. The upload is rejected
+    (``UploadError``) as soon as it is known to exceed ``max_bytes`` or its
+    first bytes don't carry the PDF signature, whatever its filename says.
+    The temporary file is removed on exit.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise _too_large(max_bytes)
+
+    fd, path = tempfile.mkstemp(prefix="upload-", suffix=".pdf", dir=UPLOAD_TMP_DIR)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            total = 0
+            head = b""
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                total += len(chunk)
+                if total > max_bytes:
+                    raise _too_large(max_bytes)
+                if len(head) < _MAGIC_WINDOW:
+                    head += chunk[:_MAGIC_WINDOW]
+                    if len(head) >= _MAGIC_WINDOW and PDF_MAGIC not in head[:_MAGIC_WINDOW]:
+                        raise UploadError("Only PDF files are supported", 400, "not_pdf")
+                out.write(chunk)
+        if PDF_MAGIC not in head[:_MAGIC_WINDOW]:
+            raise UploadError("Only PDF files are supported", 400, "not_pdf" if total else "empty")
+        yield path
+    finally:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+class UploadLimitMiddleware:
+    """ASGI middleware that rejects oversized upload requests before they are parsed.
+
+    A ``Content-Length`` over the path's limit gets an immediate 413 without
+    reading the body; chunked bodies are counted as they arrive and cut off
+    with a 413 once they exceed it, whatever the app made of the truncated
+    body. Add it before CORSMiddleware so the 413 carries CORS headers.
+    """
+
+    def __init__(self, app: Any, limits: Dict[str, int]):
+        self.app = app
+        self.limits = {path: limit + _MULTIPART_OVERHEAD for path, limit in limits.items()}
+
+    async def _reject(self, send: Any, limit: int) -> None:
+        body = json.dumps({"detail": f"Request body exceeds {limit} bytes"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        try:
+            declared = int(headers.get(b"content-length", b"-1"))
+        except ValueError:
+            declared = -1
+        if declared > limit:
+            REJECTED.inc(reason="content_length")
+            await self._reject(send, limit)
+            return
+
+        received = 0
+        started = overflowed = False
+
+        async def limited_receive() -> Dict[str, Any]:
+            nonlocal received, overflowed
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    overflowed = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def tracking_send(message: Dict[str, Any]) -> None:
+            nonlocal started
+            # The app's answer to a cut-off body (e.g. the form parser's 400) is replaced by the 413
+            if overflowed and not started:
+                return
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except Exception:
+            if not overflowed:
+                raise
+        if overflowed:
+            REJECTED.inc(reason="body_length")
+            if not started:
+                await self._reject(send, limit)
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # No /proc (macOS): the lifetime peak is the best available figure
+        return process_peak_rss()
+
+
+class MemoryTracker:
+    """Samples process RSS at request checkpoints to report the peak growth.
+
+    PDF parsing happens in the worker pool, so this measures what the
+    request costs the server process itself (buffers, extracted text,
+    responses); concurrent requests share the process, so treat it as an
+    upper bound.
+    """
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.start = current_rss()
+        self.peak = self.start
+
+    def sample(self) -> None:
+        self.peak = max(self.peak, current_rss())
+
+    @property
+    def growth(self) -> int:
+        return self.peak - self.start
+
+    def report(self) -> int:
+        self.sample()
+        PEAK_MEMORY.observe(self.growth, endpoint=self.endpoint)
+        return self.growth
+
+
+def process_peak_rss() -> int:
+    """Lifetime peak RSS of this process in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux but in bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024